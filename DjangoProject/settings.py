@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +45,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'inventory.middleware.RequestTimingMiddleware',  # Outermost, so its latency covers the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,11 +55,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-view query count, DB, template and total time in a Server-Timing header and at
+# /inventory/api/stats/requests/; off unless INVENTORY_REQUEST_TIMING=1
+INVENTORY_REQUEST_TIMING = os.environ.get('INVENTORY_REQUEST_TIMING') == '1'
+
 ROOT_URLCONF = 'DjangoProject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's backend, with renders timed for RequestTimingMiddleware
+        'BACKEND': 'inventory.middleware.TimedDjangoTemplates',
         'DIRS': [],  # Ensure this points to any custom directories if needed
         'APP_DIRS': True,
         'OPTIONS': {
@@ -76,14 +85,106 @@ WSGI_APPLICATION = 'DjangoProject.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
-
-DATABASES = {
+# Configured from the environment: SQLite by default, PostgreSQL with DJANGO_DB_ENGINE=postgresql
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+# Seconds a connection is kept for the next request instead of reconnecting every time; 0 closes it per request.
+# Under ASGI set this to 0 and use the PostgreSQL pool instead
+DB_CONN_MAX_AGE = int(os.environ.get('DJANGO_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,  # Reused connections are checked before each request
+            'OPTIONS': {
+                # WAL lets reads carry on while an order is written; NORMAL only syncs at checkpoints,
+                # which cannot corrupt the database in WAL mode
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                # Seconds a writer waits for the lock before giving up with "database is locked"
+                'timeout': int(os.environ.get('DJANGO_SQLITE_TIMEOUT', 20)),
+                # Take the write lock when a transaction starts: two transactions that read and then write
+                # would otherwise deadlock on the upgrade, which SQLite fails at once without waiting
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # File-backed test database, so threaded tests get real connections instead of a shared in-memory cache
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+elif DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'inventory'),
+            'USER': os.environ.get('POSTGRES_USER', 'inventory'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DJANGO_DB_POOL') == '1':
+        # psycopg's connection pool (pip install "psycopg[pool]"), which replaces persistent connections
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DJANGO_DB_POOL_TIMEOUT', 10)),
+        }
+else:
+    raise ImproperlyConfigured(f"DJANGO_DB_ENGINE must be 'sqlite' or 'postgresql', not '{DB_ENGINE}'.")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Item snapshots and the inventory version, which the list's ETag, its cached fragments and the API's
+# ETags are keyed on, are cached here. A change only invalidates them in the cache of the process that
+# made it. LocMemCache is per process, so with it other workers keep their copies for up to
+# INVENTORY_LOCAL_CACHE_TIMEOUT seconds. Run several workers against a shared cache (Redis, Memcached, or a
+# FileBasedCache on one host), where nothing is capped and changes are seen at once
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventory',
     }
 }
 
+INVENTORY_SNAPSHOT_TIMEOUT = 300  # Seconds an item snapshot may live without being invalidated
+INVENTORY_FRAGMENT_TIMEOUT = 300  # Seconds a rendered inventory list fragment is kept for its inventory version
+INVENTORY_LOCAL_CACHE_TIMEOUT = 5  # Seconds a per-process cache keeps what another worker may have changed
+
+# Low-stock alerts
+# Orders queue alerts in the LowStockAlert outbox; `manage.py send_alerts` POSTs them as JSON to
+# the webhook below, or writes them to the inventory.alerts log while no webhook is set
+
+INVENTORY_ALERT_WEBHOOK_URL = None
+INVENTORY_ALERT_TIMEOUT = 5  # Seconds to wait for the webhook to answer
+INVENTORY_ALERT_COOLDOWN = 3600  # Seconds after a delivered alert before the same item alerts again
+INVENTORY_ALERT_MAX_ATTEMPTS = 5  # Failed deliveries are retried with backoff, then marked failed
+INVENTORY_ALERT_RETRY_DELAY = 30  # Seconds before the first retry; doubles with each attempt
+INVENTORY_ALERT_LEASE = 600  # Seconds a worker has to send the batch it claimed before others may retry it
+
+# Stock holds
+# A hold takes stock out of the available quantity for a checkout until it is confirmed as an order,
+# cancelled or expires; `manage.py expire_holds` sweeps the expired ones
+
+INVENTORY_HOLD_TTL = 600  # Seconds a hold lasts unless placed with its own ttl
+
+# Order queue
+# With INVENTORY_ORDER_QUEUE=1, create_order and the order API accept orders into the QueuedOrder spool
+# table and answer at once; `manage.py process_orders --loop` places them in batched transactions
+
+INVENTORY_ORDER_QUEUE = os.environ.get('INVENTORY_ORDER_QUEUE') == '1'
+INVENTORY_ORDER_QUEUE_BATCH_SIZE = 500  # Orders placed per transaction by process_orders
+INVENTORY_ORDER_QUEUE_INTERVAL = 0.5  # Seconds process_orders --loop waits when the queue is empty
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
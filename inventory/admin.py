@@ -1,10 +1,134 @@
-from django.contrib import admin
-from .models import Item, Order
+from django import forms
+from django.contrib import admin, messages
+from django.db.models import IntegerField, Value
+from django.db.models.functions import Greatest
+from django.http import HttpResponseRedirect
+from .models import Item, LowStockAlert, Order, QueuedOrder, StaleEdit, StockHold, StockMovement, Warehouse, WarehouseStock
+from .pagination import EstimatedCountPaginator
+from .search import search_item_ids
+
+# The most items an admin search matches, best first; narrow the search to see past them
+ADMIN_SEARCH_LIMIT = 1000
+
+class WarehouseStockInline(admin.TabularInline):
+    model = WarehouseStock
+    fields = ('warehouse', 'quantity', 'reorder_threshold')
+    # Quantities move with orders, restocks and imports, which keep Item.quantity in step
+    readonly_fields = ('warehouse', 'quantity')
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class ItemAdminForm(forms.ModelForm):
+    class Meta:
+        model = Item
+        fields = '__all__'
+        widgets = {'version': forms.HiddenInput}
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ('name', 'quantity')
+    form = ItemAdminForm
+    list_display = ('name', 'quantity', 'reorder_threshold')
+    inlines = [WarehouseStockInline]
+    # Moved by orders, and rebuilt by rebuild_order_counters
+    readonly_fields = ('ordered_units', 'order_count', 'last_ordered_at')
+    # Follows item_name_id_idx; searches go through the full-text index and counts stop early
+    ordering = ('name', 'id')
+    search_fields = ('name', 'description')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['restock', 'zero_stock']
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=search_item_ids(search_term, ADMIN_SEARCH_LIMIT)), False
+
+    @admin.action(description="Restock selected items up to their reorder threshold")
+    def restock(self, request, queryset):
+        changed = queryset.set_stock(Greatest('quantity', 'reorder_threshold', output_field=IntegerField()))
+        self.message_user(request, f"Restocked {changed} items.", messages.SUCCESS)
+
+    @admin.action(description="Set the stock of selected items to zero")
+    def zero_stock(self, request, queryset):
+        changed = queryset.set_stock(Value(0))
+        self.message_user(request, f"Zeroed the stock of {changed} items.", messages.SUCCESS)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Only the edited columns are written, and only if the item still has the version the form was loaded with
+        obj.save(update_fields=[name for name in form.changed_data if name != 'version'])
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except StaleEdit:
+            self.message_user(
+                request, "This item was changed by someone else while you were editing it. "
+                "Review the current values and save again.", messages.ERROR,
+            )
+            return HttpResponseRedirect(request.get_full_path())
+
+@admin.register(Warehouse)
+class WarehouseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'priority')
+    ordering = ('priority', 'name')
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('item', 'quantity', 'created_at')
+    list_display = ('item', 'warehouse', 'quantity', 'created_at')
+    list_select_related = ('item', 'warehouse')
+    # Follows order_created_at_id_idx, which also serves the date filters
+    ordering = ('-created_at', '-id')
+    date_hierarchy = 'created_at'
+    list_filter = ('created_at', 'warehouse')
+    search_fields = ('item__name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(item__in=search_item_ids(search_term, ADMIN_SEARCH_LIMIT)), False
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('item', 'kind', 'change', 'order', 'created_at')
+    list_select_related = ('item', 'order__item')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # The ledger is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(LowStockAlert)
+class LowStockAlertAdmin(admin.ModelAdmin):
+    list_display = ('item', 'quantity', 'status', 'attempts', 'created_at', 'delivered_at')
+    list_filter = ('status',)
+    list_select_related = ('item',)
+
+@admin.register(StockHold)
+class StockHoldAdmin(admin.ModelAdmin):
+    list_display = ('item', 'warehouse', 'quantity', 'status', 'expires_at', 'user')
+    list_filter = ('status', 'warehouse')
+    list_select_related = ('item', 'warehouse', 'user')
+
+@admin.register(QueuedOrder)
+class QueuedOrderAdmin(admin.ModelAdmin):
+    list_display = ('item', 'quantity', 'status', 'created_at', 'processed_at', 'order', 'user')
+    list_filter = ('status',)
+    list_select_related = ('item', 'order__item', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,75 @@
+import json
+import logging
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import LowStockAlert
+
+logger = logging.getLogger('inventory.alerts')
+
+# Fields written on every delivery attempt
+DELIVERY_FIELDS = ['status', 'attempts', 'last_error', 'next_attempt_at', 'delivered_at']
+
+
+def alert_payload(alert):
+    """The JSON body posted for an alert, with the item's stock as of delivery."""
+    return {
+        'alert': alert.pk,
+        'item': alert.item_id,
+        'name': alert.item.name,
+        'quantity': alert.item.quantity,
+        'reorder_threshold': alert.item.reorder_threshold,
+        'raised_at': alert.created_at.isoformat(),
+    }
+
+
+def send_webhook(payload):
+    """
+    POST one alert payload to INVENTORY_ALERT_WEBHOOK_URL, or log it when no webhook is set.
+
+    Raises OSError (urllib's URLError and HTTPError included) when the receiver cannot be reached or refuses it.
+    """
+    url = settings.INVENTORY_ALERT_WEBHOOK_URL
+    if not url:
+        logger.info(f"Alert: Stock for '{payload['name']}' is below {payload['reorder_threshold']}!")
+        return
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}, method='POST',
+    )
+    with urllib.request.urlopen(request, timeout=settings.INVENTORY_ALERT_TIMEOUT) as response:
+        response.read()
+
+
+def deliver_alerts(batch_size=100, send=send_webhook):
+    """
+    Deliver one batch of due alerts, oldest first, and return (delivered, failed).
+
+    The batch is claimed first, so concurrent workers never send the same alert, and no
+    transaction is held open while sending, so a slow receiver never holds up orders.
+    An alert that fails for any reason is retried after INVENTORY_ALERT_RETRY_DELAY seconds,
+    doubling each time, and marked failed after INVENTORY_ALERT_MAX_ATTEMPTS attempts.
+    """
+    alerts = LowStockAlert.objects.claim(batch_size)
+    delivered = failed = 0
+    for alert in alerts:
+        try:
+            send(alert_payload(alert))
+        except Exception as exc:
+            # Not only unreachable receivers: one bad alert must not lose the rest of the batch
+            failed += 1
+            alert.last_error = str(exc) or repr(exc)
+            if alert.attempts >= settings.INVENTORY_ALERT_MAX_ATTEMPTS:
+                alert.status = LowStockAlert.FAILED
+            else:
+                delay = settings.INVENTORY_ALERT_RETRY_DELAY * 2 ** (alert.attempts - 1)
+                alert.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        else:
+            delivered += 1
+            alert.status = LowStockAlert.SENT
+            alert.delivered_at = timezone.now()
+            alert.last_error = ''
+    LowStockAlert.objects.bulk_update(alerts, DELIVERY_FIELDS)
+    return delivered, failed
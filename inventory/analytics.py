@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache import get_item_snapshots
+from .forms import start_of_day
+from .models import DailyItemSales, Order, SalesRollup
+
+ROLLUP_BATCH_SIZE = 5000
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24  # Reports only change when a new day is rolled up
+
+
+def roll_up_sales(today=None):
+    """
+    Fold every complete day not yet in DailyItemSales into it, and return the last complete day.
+
+    Only the raw orders of the new days are aggregated, so a daily run costs one day of orders.
+    The last day folded in is kept in SalesRollup, days without orders included, and moves in
+    the same transaction as the rows. Re-running is harmless: rows are upserted on (item, day).
+    """
+    today = today or timezone.localdate()
+    last_complete_day = today - timedelta(days=1)
+
+    rolled_through = rolled_through_day()
+    if rolled_through is not None:
+        start_day = rolled_through + timedelta(days=1)
+    else:
+        first_order = Order.objects.aggregate(first=Min('created_at'))['first']
+        start_day = timezone.localtime(first_order).date() if first_order is not None else last_complete_day
+    if start_day > last_complete_day:
+        return rolled_through or last_complete_day
+
+    daily = (
+        Order.objects.filter(created_at__gte=start_of_day(start_day), created_at__lt=start_of_day(today))
+        .annotate(day=TruncDate('created_at'))
+        .values('item_id', 'day')
+        .annotate(units=Sum('quantity'), orders=Count('id'))
+    )
+    with transaction.atomic():
+        DailyItemSales.objects.bulk_create(
+            [DailyItemSales(item_id=row['item_id'], day=row['day'], units=row['units'], orders=row['orders'])
+             for row in daily.iterator(chunk_size=ROLLUP_BATCH_SIZE)],
+            batch_size=ROLLUP_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['item', 'day'],
+            update_fields=['units', 'orders'],
+        )
+        SalesRollup.objects.update_or_create(pk=1, defaults={'rolled_through': last_complete_day})
+    return last_complete_day
+
+
+def rolled_through_day():
+    """The last day roll_up_sales has folded in, or None before its first run."""
+    return SalesRollup.objects.filter(pk=1).values_list('rolled_through', flat=True).first()
+
+
+def top_movers(window_days, top):
+    """
+    The ``top`` best-selling items over the last ``window_days`` rolled-up days.
+
+    Each row has the item's units and orders in the window, its sales velocity (units per day)
+    and days of cover (current quantity / velocity). Only reads: the window ends at the last day
+    the rollup_sales command folded in, reported as ``through`` (None before its first run).
+    Units per window are computed from the daily rollups and cached until the next day is rolled
+    up; quantities come from the item snapshot cache, so days of cover stays current.
+    """
+    last_day = rolled_through_day()
+    if last_day is None:
+        return {'window_days': window_days, 'through': None, 'results': []}
+    key = f'inventory:analytics:top:{window_days}:{top}:{last_day.isoformat()}'
+    movers = cache.get(key)
+    if movers is None:
+        movers = list(
+            DailyItemSales.objects.filter(day__gt=last_day - timedelta(days=window_days), day__lte=last_day)
+            .values('item_id')
+            .annotate(units=Sum('units'), orders=Sum('orders'))
+            .order_by('-units', 'item_id')[:top]
+        )
+        cache.set(key, movers, REPORT_CACHE_TIMEOUT)
+
+    snapshots = get_item_snapshots([row['item_id'] for row in movers])
+    report = []
+    for row in movers:
+        snapshot = snapshots.get(row['item_id'])
+        if snapshot is None:  # Deleted since the report was cached
+            continue
+        velocity = row['units'] / window_days
+        report.append({
+            'item_id': row['item_id'],
+            'name': snapshot['name'],
+            'quantity': snapshot['quantity'],
+            'units': row['units'],
+            'orders': row['orders'],
+            'velocity': round(velocity, 3),
+            'days_of_cover': round(snapshot['quantity'] / velocity, 1),
+        })
+    return {'window_days': window_days, 'through': last_day, 'results': report}
+
@@ -0,0 +1,313 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import condition, require_POST
+
+from .analytics import top_movers
+from .cache import inventory_version
+from .forms import OrderFilterForm, OrderForm, SalesReportForm
+from .middleware import stats_summary
+from .models import HoldNotActive, InsufficientStock, Item, Order, QueuedOrder, StockHold, WarehouseStock
+from .pagination import akeyset_page
+from .views import INVENTORY_SORTS, is_admin
+
+# JSON endpoints; the reads are async views so they run natively under ASGI
+ITEM_FIELDS = ('id', 'name', 'quantity', 'reorder_threshold')
+# Read from the item's own counter columns, so ?fields= can add demand data at no extra query
+ITEM_DEMAND_FIELDS = ('ordered_units', 'order_count', 'last_ordered_at')
+ORDER_FIELDS = {'item_name': F('item__name')}
+ORDER_LIST_FIELDS = ('id', 'item_id', 'warehouse_id', 'quantity', 'created_at', 'item_name')
+API_PAGE_SIZE = 100
+API_BATCH_SIZE = 500
+
+
+class FieldError(ValueError):
+    """Raised for a ?fields= or ?ids= parameter the API cannot serve."""
+
+
+def requested_fields(request, allowed, default=None):
+    """The fields named in ?fields=a,b in the order given, or the default fields (all allowed ones) if there is none."""
+    fields = [field for field in request.GET.get('fields', '').split(',') if field]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise FieldError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(allowed)}.")
+    return tuple(fields) or default or allowed
+
+
+def requested_ids(request):
+    """The ids in ?ids=1,2,3, or None if there is no such parameter."""
+    if 'ids' not in request.GET:
+        return None
+    try:
+        ids = {int(pk) for pk in request.GET['ids'].split(',') if pk}
+    except ValueError:
+        raise FieldError("ids must be a comma-separated list of whole numbers.")
+    if len(ids) > API_BATCH_SIZE:
+        raise FieldError(f"At most {API_BATCH_SIZE} ids can be fetched at once.")
+    return ids
+
+
+def sparse_values(queryset, fields, required=(), expressions=None):
+    """
+    values() for just the fields asked for, plus any ``required`` for paging, and the keys to strip again.
+
+    Rows stay plain dicts, so no model instances are built. ``expressions`` maps computed field names to expressions.
+    """
+    expressions = expressions or {}
+    selected = list(dict.fromkeys(fields + tuple(required)))
+    queryset = queryset.values(
+        *[field for field in selected if field not in expressions],
+        **{field: expressions[field] for field in selected if field in expressions},
+    )
+    return queryset, [field for field in selected if field not in fields]
+
+
+def strip(rows, keys):
+    if keys:
+        for row in rows:
+            for key in keys:
+                del row[key]
+    return rows
+
+
+def order_json(order):
+    return {
+        'id': order.pk,
+        'item_id': order.item_id,
+        'warehouse_id': order.warehouse_id,
+        'quantity': order.quantity,
+        'created_at': order.created_at,
+    }
+
+
+def hold_json(hold):
+    return {
+        'id': hold.pk,
+        'item_id': hold.item_id,
+        'warehouse_id': hold.warehouse_id,
+        'quantity': hold.quantity,
+        'status': hold.status,
+        'expires_at': hold.expires_at,
+    }
+
+
+def queued_order_json(queued):
+    return {
+        'id': queued.pk,
+        'item_id': queued.item_id,
+        'quantity': queued.quantity,
+        'status': queued.status,
+        'error': queued.error,
+        'created_at': queued.created_at,
+        'processed_at': queued.processed_at,
+        'order': order_json(queued.order) if queued.order else None,
+    }
+
+
+def order_form(request):
+    """
+    Validate a JSON body of an item, a quantity and an optional warehouse with OrderForm.
+
+    Returns (form, None) for a valid body, or (None, error response): 409 when the cached
+    snapshot already shows too little stock, 400 for anything else.
+    """
+    try:
+        payload = json.loads(request.body)
+        data = {'item': payload['item'], 'quantity': payload['quantity'], 'warehouse': payload.get('warehouse')}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None, JsonResponse({'error': "Expected a JSON body with an item and a quantity."}, status=400)
+
+    form = OrderForm(data)
+    if not form.is_valid():
+        # Short on stock by the cached snapshot is a conflict, like a shortfall found by Order.save
+        status = 409 if form.has_error('quantity', 'insufficient_stock') else 400
+        return None, JsonResponse({'errors': form.errors}, status=status)
+    return form, None
+
+
+def user_holds(request):
+    """The holds a user may settle: their own, or any for admins."""
+    holds = StockHold.objects.all()
+    return holds if is_admin(request.user) else holds.filter(user=request.user)
+
+
+# Item data only changes with the inventory version, so clients can revalidate with If-None-Match
+def item_etag(request, *args, **kwargs):
+    key = f'{inventory_version()}:{request.path}:{request.GET.urlencode()}'
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+# Inventory list as JSON - accessible to all logged-in users.
+# ?fields= picks the columns, ?ids= fetches many items in one query, otherwise it pages with ?after=
+@login_required
+@condition(etag_func=item_etag)
+async def item_list(request):
+    try:
+        fields = requested_fields(request, ITEM_FIELDS + ITEM_DEMAND_FIELDS, ITEM_FIELDS)
+        ids = requested_ids(request)
+    except FieldError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    if ids is not None:
+        items, extra = sparse_values(Item.objects.filter(pk__in=ids).order_by('pk'), fields, ['id'])
+        items = [item async for item in items]
+        missing = sorted(ids - {item['id'] for item in items})
+        return JsonResponse({'results': strip(items, extra), 'missing': missing})
+
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', 'name')
+    if sort not in INVENTORY_SORTS:
+        sort = 'name'
+    field, descending = INVENTORY_SORTS[sort]
+
+    # The keyset needs the sort field and id, which are dropped again if they were not asked for
+    items, extra = sparse_values(Item.objects.all(), fields, ['id', field])
+    if query:
+        items = items.filter(name__icontains=query)
+    items, next_cursor = await akeyset_page(items, field, descending, request.GET.get('after'), API_PAGE_SIZE)
+    return JsonResponse({'results': strip(items, extra), 'next': next_cursor})
+
+# A single item as JSON
+@login_required
+@condition(etag_func=item_etag)
+async def item_detail(request, pk):
+    try:
+        fields = requested_fields(request, ITEM_FIELDS + ITEM_DEMAND_FIELDS, ITEM_FIELDS)
+    except FieldError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    try:
+        item = await Item.objects.values(*fields).aget(pk=pk)
+    except Item.DoesNotExist:
+        raise Http404("No item matches the given query.")
+    return JsonResponse(item)
+
+# Low-stock summary - how many items are below their reorder threshold, lowest first
+@login_required
+async def low_stock_summary(request):
+    low_stock = Item.objects.low_stock()
+    count = await low_stock.acount()
+    items = [item async for item in low_stock.order_by('quantity', 'pk').values(*ITEM_FIELDS)[:API_PAGE_SIZE].aiterator()]
+    return JsonResponse({'count': count, 'results': items})
+
+# Items below their threshold at one warehouse, lowest first - read from the partial stock_low_idx index
+@login_required
+async def warehouse_low_stock(request, pk):
+    low_stock = WarehouseStock.objects.low_stock().filter(warehouse_id=pk)
+    count = await low_stock.acount()
+    rows = low_stock.order_by('quantity', 'item_id').values(
+        'item_id', 'quantity', 'reorder_threshold', name=F('item__name'),
+    )[:API_PAGE_SIZE]
+    return JsonResponse({'count': count, 'results': [row async for row in rows.aiterator()]})
+
+# Order log as JSON - latest first, restricted to admins
+@login_required
+@user_passes_test(is_admin)
+async def order_list(request):
+    form = OrderFilterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    try:
+        fields = requested_fields(request, ORDER_LIST_FIELDS)
+    except FieldError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    orders, extra = sparse_values(form.filter(Order.objects.all()), fields, ['id', 'created_at'], ORDER_FIELDS)
+    orders, next_cursor = await akeyset_page(orders, 'created_at', True, request.GET.get('after'), API_PAGE_SIZE)
+    return JsonResponse({'results': strip(orders, extra), 'next': next_cursor})
+
+# Place an order from JSON, e.g. {"item": 1, "quantity": 3, "warehouse": 2} with the warehouse optional -
+# the same checks and stock reservation as create_order. With INVENTORY_ORDER_QUEUE on, it answers 202 with the
+# queued order and its status URL instead
+@login_required
+@require_POST
+def order_create(request):
+    form, error = order_form(request)
+    if error:
+        return error
+
+    if settings.INVENTORY_ORDER_QUEUE:
+        # Acknowledge at once; the client polls the queued order until the worker has placed or rejected it
+        queued = QueuedOrder.objects.create(
+            item=form.cleaned_data['item'], quantity=form.cleaned_data['quantity'],
+            warehouse=form.cleaned_data['warehouse'], user=request.user,
+        )
+        response = JsonResponse(queued_order_json(queued), status=202)
+        response['Location'] = reverse('api_queued_order', args=[queued.pk])
+        return response
+
+    order = Order(
+        item=form.cleaned_data['item'], quantity=form.cleaned_data['quantity'], warehouse=form.cleaned_data['warehouse'],
+    )
+    try:
+        order.save()
+    except InsufficientStock as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+    return JsonResponse(order_json(order), status=201)
+
+# The status of an order accepted into the queue: queued, placed with its order, or rejected with the reason
+@login_required
+def queued_order(request, pk):
+    orders = QueuedOrder.objects.select_related('order')
+    if not is_admin(request.user):
+        orders = orders.filter(user=request.user)
+    return JsonResponse(queued_order_json(get_object_or_404(orders, pk=pk)))
+
+# Hold stock for a checkout, with the same JSON body as order_create; it lasts INVENTORY_HOLD_TTL seconds
+@login_required
+@require_POST
+def hold_create(request):
+    form, error = order_form(request)
+    if error:
+        return error
+
+    warehouse = form.cleaned_data['warehouse']
+    try:
+        hold = StockHold.objects.place(
+            form.cleaned_data['item'].pk, form.cleaned_data['quantity'],
+            warehouse_id=warehouse.pk if warehouse else None, user=request.user,
+        )
+    except InsufficientStock as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+    return JsonResponse(hold_json(hold), status=201)
+
+# Turn an active hold into an order
+@login_required
+@require_POST
+def hold_confirm(request, pk):
+    hold = get_object_or_404(user_holds(request), pk=pk)
+    try:
+        order = hold.confirm()
+    except (HoldNotActive, InsufficientStock) as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+    return JsonResponse(order_json(order), status=201)
+
+# Release an active hold's stock
+@login_required
+@require_POST
+def hold_cancel(request, pk):
+    hold = get_object_or_404(user_holds(request), pk=pk)
+    if not hold.cancel():
+        return JsonResponse({'error': "This hold has expired or was already settled."}, status=409)
+    return JsonResponse(hold_json(hold))
+
+# Sales velocity, days of cover and top movers over a window of complete days, restricted to admins
+@login_required
+@user_passes_test(is_admin)
+def sales_report(request):
+    form = SalesReportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    return JsonResponse(top_movers(form.cleaned_data['window'], form.cleaned_data['top']))
+
+# Request timings per view since this process started, restricted to admins
+@login_required
+@user_passes_test(is_admin)
+def request_stats(request):
+    return JsonResponse({'views': stats_summary()})
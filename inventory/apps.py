@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from . import signals  # noqa: F401  Register the cache invalidation receivers
+        from .search import restore_search_triggers
+
+        # Migrations that rebuild the item table on SQLite drop its search triggers; put them back after each migrate
+        post_migrate.connect(restore_search_triggers, sender=self)
@@ -0,0 +1,126 @@
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Max
+
+# Fields kept in an item snapshot; enough to list an item and validate an order against it
+SNAPSHOT_FIELDS = ('id', 'name', 'quantity', 'reorder_threshold', 'ordered_units')
+
+# Hit/miss counters for this process, read by the cache benchmark
+stats = {'hits': 0, 'misses': 0}
+
+
+# Bumped on every item change; pages and fragments rendered from item data are cached under it
+INVENTORY_VERSION_KEY = 'inventory:version'
+
+
+def cache_timeout(timeout):
+    """
+    Return ``timeout``, capped at INVENTORY_LOCAL_CACHE_TIMEOUT while the cache is per process.
+
+    Invalidations only reach the cache of the process that made the write, so other workers must
+    let their copies expire to see it.
+    """
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return timeout
+    local = settings.INVENTORY_LOCAL_CACHE_TIMEOUT
+    return local if timeout is None else min(timeout, local)
+
+
+def snapshot_key(item_id):
+    return f'inventory:item:{item_id}'
+
+
+def get_item_snapshots(item_ids):
+    """
+    Return {pk: snapshot} for the given items, loading cache misses with one query.
+
+    A snapshot is a dict with pk, name, quantity, reorder_threshold, ordered_units, is_low_stock and
+    largest_stock, the most stock at any one warehouse. Items that do not exist are left out.
+    """
+    from .models import Item
+
+    keys = {snapshot_key(pk): pk for pk in item_ids}
+    snapshots = {keys[key]: snapshot for key, snapshot in cache.get_many(keys).items()}
+    missing = [pk for pk in keys.values() if pk not in snapshots]
+    stats['hits'] += len(snapshots)
+    stats['misses'] += len(missing)
+
+    if missing:
+        loaded = {}
+        rows = Item.objects.filter(pk__in=missing).values(*SNAPSHOT_FIELDS).annotate(
+            largest_stock=Max('stock_levels__quantity'),
+        )
+        for row in rows:
+            largest_stock = row.pop('largest_stock') or 0
+            item = Item(**row)
+            loaded[item.pk] = {
+                'pk': item.pk,
+                'name': item.name,
+                'quantity': item.quantity,
+                'reorder_threshold': item.reorder_threshold,
+                'ordered_units': item.ordered_units,
+                'is_low_stock': item.is_low_stock(),
+                'largest_stock': largest_stock,
+            }
+        cache.set_many({snapshot_key(pk): snapshot for pk, snapshot in loaded.items()},
+                       cache_timeout(settings.INVENTORY_SNAPSHOT_TIMEOUT))
+        snapshots.update(loaded)
+    return snapshots
+
+
+def get_item_snapshot(item_id):
+    """Return the snapshot of one item, or None if it does not exist."""
+    return get_item_snapshots([item_id]).get(item_id)
+
+
+def item_from_snapshot(snapshot):
+    """Build an Item, with largest_stock set, from a snapshot without a query; other fields are deferred."""
+    from .models import Item
+
+    item = Item.from_db('default', SNAPSHOT_FIELDS, [snapshot['pk'], snapshot['name'], snapshot['quantity'],
+                                                     snapshot['reorder_threshold'], snapshot['ordered_units']])
+    item.largest_stock = snapshot['largest_stock']
+    return item
+
+
+def invalidate_items(item_ids):
+    """
+    Drop the snapshots of items whose row has changed and bump the inventory version.
+
+    Both happen straight away and again once the surrounding transaction commits, so a
+    reader that re-cached the old row in between cannot keep it alive.
+    """
+    keys = [snapshot_key(pk) for pk in item_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    bump_inventory_version()
+
+    def on_commit():
+        cache.delete_many(keys)
+        bump_inventory_version()
+
+    transaction.on_commit(on_commit)
+
+
+def inventory_version():
+    """
+    Return the inventory version, the time in nanoseconds of the last change to any item.
+
+    If the cache has lost it, a new version is started, which retires everything cached under the old one.
+    """
+    version = cache.get(INVENTORY_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        # Another process may have started one first
+        if not cache.add(INVENTORY_VERSION_KEY, version, cache_timeout(None)):
+            version = cache.get(INVENTORY_VERSION_KEY, version)
+    return version
+
+
+def bump_inventory_version():
+    cache.set(INVENTORY_VERSION_KEY, time.time_ns(), cache_timeout(None))
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+
+EXPORT_COLUMNS = ('id', 'created_at', 'item_id', 'item_name', 'quantity')
+EXPORT_CHUNK_SIZE = 2000
+
+
+def order_export_rows(orders):
+    """Plain tuples for every order, read in chunks through a server-side cursor where the database has one."""
+    return (
+        orders.order_by('pk')
+        .values_list('pk', 'created_at', 'item_id', 'item__name', 'quantity')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def stream_csv(rows):
+    """Yield CSV text, one chunk per EXPORT_CHUNK_SIZE rows, starting with a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, (pk, created_at, item_id, item_name, quantity) in enumerate(rows, 1):
+        writer.writerow((pk, created_at.isoformat(), item_id, item_name, quantity))
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def stream_jsonl(rows):
+    """Yield newline-delimited JSON objects, one chunk per EXPORT_CHUNK_SIZE rows."""
+    buffer = io.StringIO()
+    for count, (pk, created_at, item_id, item_name, quantity) in enumerate(rows, 1):
+        record = dict(zip(EXPORT_COLUMNS, (pk, created_at.isoformat(), item_id, item_name, quantity)))
+        buffer.write(json.dumps(record))
+        buffer.write('\n')
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def _drain(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
@@ -1,34 +1,120 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
-from .models import Item, Order
+from django.utils import timezone
+from .cache import get_item_snapshot, item_from_snapshot
+from .models import Item, Order, Warehouse
 
 class ItemForm(forms.ModelForm):
+    # Optional, as before it was on the form; it is searched along with the name
+    description = forms.CharField(required=False, widget=forms.Textarea)
+
     class Meta:
         model = Item
-        fields = ['name', 'quantity']
+        fields = ['name', 'quantity', 'description']
+
+class CachedItemChoiceField(forms.ModelChoiceField):
+    """A ModelChoiceField that resolves the chosen item from its cached snapshot, querying only on a miss."""
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            snapshot = get_item_snapshot(int(value))
+        except (TypeError, ValueError):
+            snapshot = None
+        if snapshot is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value}
+            )
+        return item_from_snapshot(snapshot)
 
 class OrderForm(forms.Form):
-    item = forms.ModelChoiceField(queryset=Item.objects.all())
-    quantity = forms.IntegerField()
+    # Typed or picked by id with the item lookup endpoint, instead of a <select> of the whole catalog
+    item = CachedItemChoiceField(
+        queryset=Item.objects.all(),
+        widget=forms.TextInput(attrs={'list': 'item-options', 'autocomplete': 'off', 'placeholder': "Item ID or name"}),
+    )
+    quantity = forms.IntegerField(min_value=1)
+    warehouse = forms.ModelChoiceField(
+        queryset=Warehouse.objects.order_by('priority', 'name'), required=False, empty_label="Nearest with stock",
+    )
 
     def clean_quantity(self):
         quantity = self.cleaned_data['quantity']
-        item = self.cleaned_data['item']
+        item = self.cleaned_data.get('item')
 
-        if quantity > item.quantity:
-            raise forms.ValidationError("Quantity exceeds stock.")
+        # An early rejection against the cached snapshot; Order.save makes the authoritative check
+        if item is not None and quantity > item.quantity:
+            raise forms.ValidationError("Quantity exceeds stock.", code='insufficient_stock')
+        # The total counts every warehouse, but an order is filled from one of them
+        if item is not None and quantity > item.largest_stock:
+            raise forms.ValidationError(
+                f"Orders are filled from a single warehouse; at most {item.largest_stock} can be ordered at once.",
+                code='insufficient_stock',
+            )
         return quantity
 from django import forms
 from .models import Item
 
+def validate_stock_quantity(quantity):
+    """The stock rule shared by UpdateStockForm and the import_stock command."""
+    if quantity < 0:  # Reject negative quantity
+        raise forms.ValidationError("Quantity cannot be negative.")
+
 class UpdateStockForm(forms.ModelForm):
+    # The version the form was rendered with, so the save is rejected if the item changed meanwhile.
+    # Clients that leave it out save over the item's current version.
+    version = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Item
-        fields = ['quantity']
+        fields = ['quantity', 'version']
 
     def clean_quantity(self):
         quantity = self.cleaned_data.get('quantity')
+        validate_stock_quantity(quantity)
+        return quantity
 
-        if quantity < 0:  # Reject negative quantity
-            raise forms.ValidationError("Quantity cannot be negative.")
+class OrderFilterForm(forms.Form):
+    item = forms.IntegerField(required=False, min_value=1)
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
 
-        return quantity
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start')
+        end = cleaned_data.get('end')
+
+        if start and end and start > end:
+            raise forms.ValidationError("Start date must be on or before end date.")
+
+        return cleaned_data
+
+    def filter(self, orders):
+        """Narrow an Order queryset to the item and the inclusive date range of a valid form."""
+        item = self.cleaned_data.get('item')
+        start = self.cleaned_data.get('start')
+        end = self.cleaned_data.get('end')
+
+        if item:
+            orders = orders.filter(item_id=item)
+        # Compare against datetimes rather than created_at__date, so an index on created_at can be used
+        if start:
+            orders = orders.filter(created_at__gte=start_of_day(start))
+        if end:
+            orders = orders.filter(created_at__lt=start_of_day(end + timedelta(days=1)))
+        return orders
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+class SalesReportForm(forms.Form):
+    window = forms.IntegerField(required=False, min_value=1, max_value=365)
+    top = forms.IntegerField(required=False, min_value=1, max_value=100)
+
+    def clean_window(self):
+        return self.cleaned_data.get('window') or 30
+
+    def clean_top(self):
+        return self.cleaned_data.get('top') or 10
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.models import StockHold
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark stock holds past their expiry as expired, in batches. Runs once by default; "
+        "pass --loop to keep sweeping as a background worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Holds expired per UPDATE.")
+        parser.add_argument('--loop', action='store_true', help="Keep sweeping until interrupted.")
+        parser.add_argument('--interval', type=float, default=30, help="Seconds to sleep between sweeps with --loop.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        while True:
+            # Expired holds stopped counting against availability already; this settles their status
+            expired = StockHold.objects.expire(batch_size)
+            if expired or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Expired {expired} holds."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
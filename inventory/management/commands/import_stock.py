@@ -0,0 +1,178 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from inventory.forms import validate_stock_quantity
+from inventory.models import Item, StockMovement, Warehouse, WarehouseStock
+
+
+class Command(BaseCommand):
+    help = (
+        "Set item stock at one warehouse from a CSV or JSON lines file with id and quantity columns, "
+        "plus name and description for items that do not exist yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file to import.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="File format; guessed from the file extension when omitted.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows upserted per transaction.")
+        parser.add_argument('--warehouse', help="Name of the warehouse the quantities are for; the nearest when omitted.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or ('jsonl' if path.suffix in ('.jsonl', '.ndjson') else 'csv')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+        if options['warehouse']:
+            try:
+                self.warehouse = Warehouse.objects.get(name=options['warehouse'])
+            except Warehouse.DoesNotExist:
+                raise CommandError(f"Warehouse {options['warehouse']!r} does not exist.")
+        else:
+            self.warehouse = Warehouse.objects.default()
+
+        totals = {'upserted': 0, 'created': 0, 'rejected': 0}
+        started = time.perf_counter()
+        with path.open(newline='', encoding='utf-8') as handle:
+            rows = read_csv(handle) if file_format == 'csv' else read_jsonl(handle)
+            for number, batch in enumerate(iter(lambda: list(islice(rows, batch_size)), []), 1):
+                self.import_batch(number, batch, totals)
+
+        if totals['created']:
+            # Explicit ids do not advance the id sequence on databases that have one
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Item]):
+                    cursor.execute(sql)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['upserted']} rows ({totals['created']} new items), "
+            f"rejected {totals['rejected']} in {elapsed:.2f}s."
+        ))
+
+    def import_batch(self, number, batch, totals):
+        started = time.perf_counter()
+        valid = {}
+        rejected = 0
+        for line, row, error in batch:
+            if error is None:
+                try:
+                    row = clean_row(row)
+                except ValidationError as exc:
+                    error = '; '.join(exc.messages)
+            if error is not None:
+                self.stderr.write(f"Line {line}: {error}")
+                rejected += 1
+                continue
+            valid[row['id']] = (line, row)  # A later row for the same id wins
+
+        with transaction.atomic():
+            # Lock the rows so the ledger records exactly the change this import makes
+            locked = Item.objects.select_for_update().filter(pk__in=valid).order_by('pk')
+            existing = {
+                pk: (quantity, version, threshold)
+                for pk, quantity, version, threshold in locked.values_list('pk', 'quantity', 'version', 'reorder_threshold')
+            }
+            located = dict(
+                WarehouseStock.objects.select_for_update().filter(item_id__in=valid, warehouse=self.warehouse)
+                .order_by('item_id').values_list('item_id', 'quantity')
+            )
+            items = []
+            changes = {}
+            for item_id, (line, row) in valid.items():
+                if item_id not in existing and not row['name']:
+                    self.stderr.write(f"Line {line}: item {item_id} does not exist and no name was given.")
+                    rejected += 1
+                    continue
+                # The file sets this warehouse's quantity; the item total moves by the same amount
+                changes[item_id] = row['quantity'] - located.get(item_id, 0)
+                quantity, version, _ = existing.get(item_id, (0, 0, None))
+                items.append(Item(
+                    pk=item_id, name=row['name'], quantity=quantity + changes[item_id], description=row['description'],
+                    version=version + 1,
+                ))
+
+            # Existing rows only get their quantity replaced and their version bumped, so open edit forms
+            # go stale; name and description are used for new items
+            Item.objects.bulk_create(
+                items, update_conflicts=True, unique_fields=['id'], update_fields=['quantity', 'version'],
+            )
+            WarehouseStock.objects.bulk_create(
+                # New locations take the item's reorder threshold; existing ones keep theirs
+                [WarehouseStock(item_id=item.pk, warehouse=self.warehouse, quantity=valid[item.pk][1]['quantity'],
+                                reorder_threshold=existing.get(item.pk, (0, 0, item.reorder_threshold))[2])
+                 for item in items],
+                update_conflicts=True, unique_fields=['item', 'warehouse'], update_fields=['quantity'],
+            )
+            StockMovement.objects.bulk_create([
+                StockMovement(item_id=item.pk, kind=StockMovement.RESTOCK if change > 0 else StockMovement.CORRECTION,
+                              change=change)
+                for item in items
+                for change in [changes[item.pk]]
+                if change
+            ])
+
+        created = sum(1 for item in items if item.pk not in existing)
+        totals['upserted'] += len(items)
+        totals['created'] += created
+        totals['rejected'] += rejected
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Batch {number}: {len(items)} upserted ({created} new), {rejected} rejected "
+            f"in {elapsed:.2f}s ({len(batch) / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+
+
+def read_csv(handle):
+    """Yield (line number, row dict, error) for each data line of a CSV file with a header."""
+    reader = csv.DictReader(handle)
+    for row in reader:
+        yield reader.line_num, row, None
+
+
+def read_jsonl(handle):
+    """Yield (line number, row dict, error) for each non-blank line of a JSON lines file."""
+    for line, text in enumerate(handle, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            yield line, None, "Not valid JSON."
+            continue
+        if not isinstance(row, dict):
+            yield line, None, "Expected a JSON object."
+            continue
+        yield line, row, None
+
+
+def clean_row(row):
+    """Coerce a raw row to id, quantity, name and description, raising ValidationError if it is unusable."""
+    try:
+        item_id = int(row.get('id'))
+        quantity = int(row.get('quantity'))
+    except (TypeError, ValueError):
+        raise ValidationError("id and quantity must be whole numbers.")
+    if item_id < 1:
+        raise ValidationError("id must be positive.")
+    validate_stock_quantity(quantity)
+    name = (row.get('name') or '').strip()
+    if len(name) > Item._meta.get_field('name').max_length:
+        raise ValidationError("name is too long.")
+    return {
+        'id': item_id,
+        'quantity': quantity,
+        'name': name,
+        'description': row.get('description') or '',
+    }
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.models import QueuedOrder
+
+
+class Command(BaseCommand):
+    help = (
+        "Place the orders accepted into the order queue, in batched transactions. Runs once by default; "
+        "pass --loop to keep draining the queue as a background worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.INVENTORY_ORDER_QUEUE_BATCH_SIZE,
+            help="Orders placed per transaction.",
+        )
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new orders until interrupted.")
+        parser.add_argument(
+            '--interval', type=float, default=settings.INVENTORY_ORDER_QUEUE_INTERVAL,
+            help="Seconds to sleep between polls with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        while True:
+            placed = rejected = 0
+            # Drain everything that is queued, one batch at a time
+            while True:
+                batch_placed, batch_rejected = QueuedOrder.objects.process(batch_size)
+                placed += batch_placed
+                rejected += batch_rejected
+                if batch_placed + batch_rejected < batch_size:
+                    break
+            if placed or rejected or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Placed {placed} orders, {rejected} rejected."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
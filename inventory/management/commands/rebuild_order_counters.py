@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from inventory.models import Item, Order
+
+COUNTER_FIELDS = ['ordered_units', 'order_count', 'last_ordered_at']
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every item's order counters from its orders and report the items whose counters "
+        "have drifted. With --fix, the recomputed counters are written back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Overwrite drifted counters with the recomputed ones.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Items checked per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        checked = 0
+        drifted = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Locked, so no order moves a counter between the recount and the write
+                items = list(
+                    Item.objects.select_for_update().filter(pk__gt=last_pk).order_by('pk')
+                    .only('name', 'version', *COUNTER_FIELDS)[:batch_size]
+                )
+                if not items:
+                    break
+                last_pk = items[-1].pk
+                # One grouped pass over the batch's orders, along order_item_created_at_idx
+                totals = {
+                    row['item_id']: row for row in Order.objects.filter(item__in=items).values('item_id').annotate(
+                        ordered_units=Sum('quantity'), order_count=Count('pk'), last_ordered_at=Max('created_at'),
+                    ).order_by()
+                }
+
+                stale = []
+                for item in items:
+                    counted = totals.get(item.pk, {'ordered_units': 0, 'order_count': 0, 'last_ordered_at': None})
+                    recorded = {field: getattr(item, field) for field in COUNTER_FIELDS}
+                    if any(recorded[field] != counted[field] for field in COUNTER_FIELDS):
+                        self.stdout.write(
+                            f"{item.name} (#{item.pk}): {recorded['ordered_units']} units in {recorded['order_count']} "
+                            f"orders, counted {counted['ordered_units']} in {counted['order_count']}"
+                        )
+                        for field in COUNTER_FIELDS:
+                            setattr(item, field, counted[field])
+                        item.version += 1
+                        stale.append(item)
+                if stale and options['fix']:
+                    Item.objects.bulk_update(stale, [*COUNTER_FIELDS, 'version'])
+            checked += len(items)
+            drifted += len(stale)
+
+        if drifted and not options['fix']:
+            raise CommandError(f"{drifted} of {checked} items have drifted order counters.")
+        verb = "Fixed" if drifted else "Found"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} items. {verb} {drifted} drifted."))
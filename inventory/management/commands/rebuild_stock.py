@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+
+from inventory.models import Item, StockMovement, WarehouseStock
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every item's quantity from the stock ledger and report the items whose "
+        "quantity does not match. With --fix, the ledger totals are written back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Overwrite mismatched quantities with the ledger total.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Items checked per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        checked = 0
+        mismatched = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                items = list(
+                    Item.objects.select_for_update().filter(pk__gt=last_pk).order_by('pk')
+                    .only('name', 'quantity', 'version')[:batch_size]
+                )
+                if not items:
+                    break
+                last_pk = items[-1].pk
+                totals = dict(
+                    StockMovement.objects.filter(item__in=items).values('item_id')
+                    .annotate(total=Sum('change')).values_list('item_id', 'total')
+                )
+
+                drifted = []
+                for item in items:
+                    ledger = totals.get(item.pk, 0)
+                    if item.quantity != ledger:
+                        self.stdout.write(f"{item.name} (#{item.pk}): quantity {item.quantity}, ledger {ledger}")
+                        drifted.append((item, ledger - item.quantity))
+                        item.quantity = ledger
+                        item.version += 1
+                if drifted and options['fix']:
+                    Item.objects.bulk_update([item for item, _ in drifted], ['quantity', 'version'])
+                    # Move the warehouse rows by the same amount, so they still add up to the total
+                    for item, change in drifted:
+                        WarehouseStock.objects.adjust_locations(item.pk, change)
+            checked += len(items)
+            mismatched += len(drifted)
+
+        if mismatched and not options['fix']:
+            raise CommandError(f"{mismatched} of {checked} items do not match the ledger.")
+        verb = "Fixed" if mismatched else "Found"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} items. {verb} {mismatched} mismatches."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from inventory.analytics import roll_up_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the orders of every complete day not yet rolled up into the daily sales table. "
+        "Run daily, e.g. from cron; the sales report only reads what this has rolled up."
+    )
+
+    def handle(self, *args, **options):
+        last_day = roll_up_sales()
+        self.stdout.write(self.style.SUCCESS(f"Daily sales rolled up through {last_day.isoformat()}."))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.alerts import deliver_alerts
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued low-stock alerts to the alert webhook in batches. Runs once by default; "
+        "pass --loop to keep polling the outbox as a background worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Alerts delivered per batch.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new alerts until interrupted.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        while True:
+            delivered = failed = 0
+            # Drain everything that is due, one batch at a time
+            while True:
+                batch_delivered, batch_failed = deliver_alerts(batch_size)
+                delivered += batch_delivered
+                failed += batch_failed
+                if batch_delivered + batch_failed < batch_size:
+                    break
+            if delivered or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} alerts, {failed} failed."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
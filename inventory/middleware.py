@@ -0,0 +1,177 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Upper bounds in milliseconds of the latency histogram buckets; one more bucket catches everything slower
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Per-view totals for this process, keyed by URL name, read by the request stats endpoint
+view_stats = {}
+_stats_lock = threading.Lock()
+
+# Timings of the request being handled, if timing is on
+_current_timings = ContextVar('inventory_request_timings', default=None)
+
+
+class RequestTimings:
+    """Query count and seconds spent in the database and in templates for one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+    # Installed with connection.execute_wrapper, so it sees every query the request runs
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - started
+
+
+class TimedTemplate(Template):
+    """A template that adds its render time to the current request's timings, when timing is on."""
+
+    def render(self, context=None, request=None):
+        timings = _current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, handing out TimedTemplate so views' renders are timed.
+
+    Includes and extends are rendered inside the outer template, so each response is counted once.
+    Costs one context variable lookup per render while timing is off.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def record(view_name, timings, total):
+    """Add one request's timings, in seconds, to the per-view totals and latency histogram."""
+    total_ms = total * 1000
+    with _stats_lock:
+        stats = view_stats.setdefault(view_name, {
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'db_ms': 0.0,
+            'template_ms': 0.0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+        })
+        stats['requests'] += 1
+        stats['queries'] += timings.queries
+        stats['max_queries'] = max(stats['max_queries'], timings.queries)
+        stats['db_ms'] += timings.db * 1000
+        stats['template_ms'] += timings.template * 1000
+        stats['total_ms'] += total_ms
+        stats['max_ms'] = max(stats['max_ms'], total_ms)
+        stats['buckets'][bisect_left(LATENCY_BUCKETS, total_ms)] += 1
+
+
+def stats_summary():
+    """Averages and the latency histogram for every view timed so far."""
+    with _stats_lock:
+        summary = {}
+        for view_name, stats in sorted(view_stats.items()):
+            requests = stats['requests']
+            summary[view_name] = {
+                'requests': requests,
+                'avg_queries': round(stats['queries'] / requests, 2),
+                'max_queries': stats['max_queries'],
+                'avg_db_ms': round(stats['db_ms'] / requests, 2),
+                'avg_template_ms': round(stats['template_ms'] / requests, 2),
+                'avg_total_ms': round(stats['total_ms'] / requests, 2),
+                'max_total_ms': round(stats['max_ms'], 2),
+                'latency_ms': [
+                    {'le': bound, 'count': count}
+                    for bound, count in zip(LATENCY_BUCKETS + (None,), stats['buckets'])
+                ],
+            }
+        return summary
+
+
+class RequestTimingMiddleware:
+    """
+    Time every request: SQL query count, database time, template render time and total latency.
+
+    Opt in with INVENTORY_REQUEST_TIMING. The timings are sent back in a Server-Timing header and
+    added to the per-view totals behind the request stats endpoint. When the setting is off the
+    middleware removes itself at startup, so it costs nothing.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INVENTORY_REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Stay async under ASGI, so the async API views are not pushed through sync_to_async
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timings):
+                response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        # Async views query through sync_to_async, on the request's own thread and connection, so the
+        # wrapper is installed there rather than on the event loop's connection
+        wrapper = ExitStack()
+        await sync_to_async(lambda: wrapper.enter_context(connection.execute_wrapper(timings)))()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrapper.close)()
+            _current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    def finish(self, request, response, timings, total):
+        if request.resolver_match is not None:
+            record(request.resolver_match.view_name, timings, total)
+        response['Server-Timing'] = (
+            f'db;desc="{timings.queries} queries";dur={timings.db * 1000:.2f}, '
+            f'template;dur={timings.template * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        return response
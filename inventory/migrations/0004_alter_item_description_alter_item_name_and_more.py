@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_item_description'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='item',
+            name='description',
+            field=models.TextField(),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='quantity',
+            field=models.IntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['name', 'id'], name='item_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['quantity', 'id'], name='item_quantity_id_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_alter_item_description_alter_item_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='reorder_threshold',
+            field=models.PositiveIntegerField(default=15),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('quantity__lt', models.F('reorder_threshold'))), fields=['quantity'], name='item_low_stock_idx'),
+        ),
+    ]
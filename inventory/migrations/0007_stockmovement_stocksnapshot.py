@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """Give every existing item an opening movement, so its ledger adds up to its current quantity."""
+    Item = apps.get_model('inventory', 'Item')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    batch = []
+    for item_id, quantity in Item.objects.exclude(quantity=0).values_list('pk', 'quantity').iterator(chunk_size=5000):
+        batch.append(StockMovement(item_id=item_id, kind='correction', change=quantity))
+        if len(batch) == 5000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_order_order_created_at_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('order', 'Order'), ('restock', 'Restock'), ('correction', 'Correction')], max_length=16)),
+                ('change', models.IntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory.item')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'id'], name='movement_item_id_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('last_movement_id', models.BigIntegerField(default=0)),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'taken_at'], name='snapshot_item_taken_at_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stockmovement_stocksnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyItemSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('units', models.PositiveIntegerField()),
+                ('orders', models.PositiveIntegerField()),
+                ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='inventory.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'item'], name='daily_sales_day_item_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'day'), name='daily_sales_item_day_unique')],
+            },
+        ),
+    ]
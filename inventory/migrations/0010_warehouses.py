@@ -0,0 +1,62 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def stock_main_warehouse(apps, schema_editor):
+    """Put every existing item's stock in a Main warehouse, so the locations add up to each item's quantity."""
+    Item = apps.get_model('inventory', 'Item')
+    Warehouse = apps.get_model('inventory', 'Warehouse')
+    WarehouseStock = apps.get_model('inventory', 'WarehouseStock')
+    if not Item.objects.exists():
+        return
+    warehouse = Warehouse.objects.create(name='Main')
+    batch = []
+    rows = Item.objects.values_list('pk', 'quantity', 'reorder_threshold').iterator(chunk_size=5000)
+    for item_id, quantity, reorder_threshold in rows:
+        batch.append(WarehouseStock(
+            item_id=item_id, warehouse=warehouse, quantity=quantity, reorder_threshold=reorder_threshold,
+        ))
+        if len(batch) == 5000:
+            WarehouseStock.objects.bulk_create(batch)
+            batch = []
+    WarehouseStock.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_lowstockalert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Warehouse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('priority', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='warehouse',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='inventory.warehouse'),
+        ),
+        migrations.CreateModel(
+            name='WarehouseStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0)),
+                ('reorder_threshold', models.PositiveIntegerField(default=15)),
+                ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stock_levels', to='inventory.item')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_levels', to='inventory.warehouse')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('quantity__lt', models.F('reorder_threshold'))), fields=['warehouse', 'quantity'], name='stock_low_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'warehouse'), name='stock_item_warehouse_unique')],
+            },
+        ),
+        migrations.RunPython(stock_main_warehouse, migrations.RunPython.noop),
+    ]
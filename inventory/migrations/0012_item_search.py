@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# The SQL is frozen here, so later changes to inventory.search cannot change what this migration did
+
+# SQLite: an FTS5 index over the item table, with name and description kept in step by triggers,
+# so bulk inserts and raw UPDATEs are indexed as well as Item.save(). Prefix indexes on 2 and 3
+# characters keep typeahead queries on short prefixes off a full token scan.
+SQLITE_SEARCH_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS inventory_item_fts USING fts5(
+        name, description, content='inventory_item', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_item_fts_insert AFTER INSERT ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_item_fts_delete AFTER DELETE ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts (inventory_item_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_item_fts_update AFTER UPDATE OF name, description ON inventory_item
+    WHEN old.name IS NOT new.name OR old.description IS NOT new.description BEGIN
+        INSERT INTO inventory_item_fts (inventory_item_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO inventory_item_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO inventory_item_fts (inventory_item_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP_SEARCH_SQL = [
+    'DROP TRIGGER IF EXISTS inventory_item_fts_insert',
+    'DROP TRIGGER IF EXISTS inventory_item_fts_delete',
+    'DROP TRIGGER IF EXISTS inventory_item_fts_update',
+    'DROP TABLE IF EXISTS inventory_item_fts',
+]
+
+# PostgreSQL: a GIN index on the weighted document
+POSTGRES_SEARCH_SQL = [
+    "CREATE INDEX IF NOT EXISTS item_search_idx ON inventory_item USING gin (("
+    "setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', description), 'B')))"
+]
+POSTGRES_DROP_SEARCH_SQL = ['DROP INDEX IF EXISTS item_search_idx']
+
+
+def create_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE_SEARCH_SQL, 'postgresql': POSTGRES_SEARCH_SQL}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE_DROP_SEARCH_SQL, 'postgresql': POSTGRES_DROP_SEARCH_SQL}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_stockhold'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
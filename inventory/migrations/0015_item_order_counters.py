@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-18 22:00
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_orders(apps, schema_editor):
+    """Fill the counters from the existing orders."""
+    Item = apps.get_model('inventory', 'Item')
+    Order = apps.get_model('inventory', 'Order')
+    orders = Order.objects.filter(item=OuterRef('pk')).order_by().values('item')
+    Item.objects.update(
+        ordered_units=Coalesce(Subquery(orders.annotate(total=Sum('quantity')).values('total')), 0),
+        order_count=Coalesce(Subquery(orders.annotate(count=Count('pk')).values('count')), 0),
+        last_ordered_at=Subquery(orders.annotate(last=Max('created_at')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_queuedorder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='last_ordered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='ordered_units',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # Only the Python-side default changes, so skip the table rebuild SQLite would do for it
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='order',
+                name='created_at',
+                field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+            ),
+        ]),
+        migrations.RunPython(count_orders, migrations.RunPython.noop),
+    ]
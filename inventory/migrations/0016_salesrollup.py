@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 23:45
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def start_from_last_sale(apps, schema_editor):
+    """The last day with sales is the best known lower bound; the next rollup re-folds any days after it."""
+    DailyItemSales = apps.get_model('inventory', 'DailyItemSales')
+    SalesRollup = apps.get_model('inventory', 'SalesRollup')
+    last = DailyItemSales.objects.aggregate(last=Max('day'))['last']
+    if last is not None:
+        SalesRollup.objects.create(pk=1, rolled_through=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_item_order_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rolled_through', models.DateField()),
+            ],
+        ),
+        migrations.RunPython(start_from_last_sale, migrations.RunPython.noop),
+    ]
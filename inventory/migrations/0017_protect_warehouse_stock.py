@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 23:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_salesrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='warehousestock',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_levels', to='inventory.warehouse'),
+        ),
+    ]
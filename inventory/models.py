@@ -1,23 +1,229 @@
-import logging
-from django.db import models
-from django.db.models import F
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, Func, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .cache import invalidate_items
+
+
+class InsufficientStock(ValueError):
+    """Raised when an order asks for more than the item has in stock."""
+
+
+class StaleEdit(ValueError):
+    """Raised when saving an item that someone else changed after it was read."""
+
+
+class HoldNotActive(ValueError):
+    """Raised when confirming a hold that has expired, or was already confirmed or cancelled."""
+
+
+# The low-stock rule: an item is low once its quantity drops below its own reorder threshold
+LOW_STOCK = Q(quantity__lt=F('reorder_threshold'))
+
+
+class ItemQuerySet(models.QuerySet):
+    def low_stock(self):
+        """Items below their reorder threshold, served from the partial item_low_stock_idx index."""
+        return self.filter(LOW_STOCK)
+
+    def reserve(self, item_id, quantity, warehouse_id=None, ordered_at=None):
+        """
+        Deduct stock for an item from one warehouse, or from the nearest one with enough stock.
+
+        Pass the order's time as ``ordered_at`` to count the deduction in the item's order counters.
+        Returns the id of the warehouse the stock was taken from, or None if no single location had enough.
+        """
+        return WarehouseStock.objects.draw(item_id, quantity, warehouse_id, ordered_at)
+
+    def set_stock(self, quantity):
+        """
+        Set every item's stock to ``quantity``, an expression over its own fields, in one UPDATE.
+
+        Each changed item gets a ledger entry and a version bump. Increases land at the default
+        warehouse, items set to zero are emptied everywhere, and other decreases drain the nearest
+        locations first. Returns the number of items whose stock changed.
+        """
+        with transaction.atomic():
+            changed = list(
+                self.select_for_update().annotate(target=quantity).exclude(quantity=F('target'))
+                .values_list('pk', 'quantity', 'target')
+            )
+            if not changed:
+                return 0
+            ids = [pk for pk, _, _ in changed]
+            Item.objects.filter(pk__in=ids).update(quantity=quantity, version=F('version') + 1)
+            StockMovement.objects.bulk_create([
+                StockMovement(
+                    item_id=pk, kind=StockMovement.RESTOCK if target > previous else StockMovement.CORRECTION,
+                    change=target - previous,
+                )
+                for pk, previous, target in changed
+            ])
+
+            raised = {pk: target - previous for pk, previous, target in changed if target > previous}
+            emptied = [pk for pk, previous, target in changed if target == 0]
+            if raised:
+                WarehouseStock.objects.add_to_default(raised)
+            if emptied:
+                WarehouseStock.objects.filter(item_id__in=emptied).update(quantity=0)
+            for pk, previous, target in changed:
+                if 0 < target < previous:
+                    WarehouseStock.objects.adjust_locations(pk, target - previous)
+            invalidate_items(ids)
+        return len(changed)
+
+    # Bulk writes skip Item.save and its signals, so they drop the cached snapshots themselves
+    def bulk_create(self, objs, *args, **kwargs):
+        if kwargs.get('update_conflicts'):
+            # Upserts cannot tell inserts from updates, so their callers record the movements
+            objs = super().bulk_create(objs, *args, **kwargs)
+        else:
+            # Plain inserts open each new item's ledger and stock it at the default warehouse
+            with transaction.atomic():
+                objs = super().bulk_create(objs, *args, **kwargs)
+                stocked = [obj for obj in objs if obj.quantity]
+                StockMovement.objects.bulk_create([
+                    StockMovement(item=obj, kind=StockMovement.RESTOCK, change=obj.quantity) for obj in stocked
+                ])
+                if stocked:
+                    warehouse = Warehouse.objects.default()
+                    WarehouseStock.objects.bulk_create([
+                        WarehouseStock(
+                            item=obj, warehouse=warehouse, quantity=obj.quantity,
+                            reorder_threshold=obj.reorder_threshold,
+                        )
+                        for obj in stocked
+                    ])
+        invalidate_items([obj.pk for obj in objs if obj.pk is not None])
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        updated = super().bulk_update(objs, *args, **kwargs)
+        invalidate_items([obj.pk for obj in objs])
+        return updated
 
-logger = logging.getLogger('inventory.models')  # Ensure logger is defined here
 
 class Item(models.Model):
     name = models.CharField(max_length=255)
+    # The total over all warehouses, kept in step with the WarehouseStock rows in the same transaction
     quantity = models.IntegerField()
     description = models.TextField()
+    reorder_threshold = models.PositiveIntegerField(default=15)
+    # Bumped by every write, so a save can check that nothing changed the row since it was read
+    version = models.PositiveIntegerField(default=1)
+    # Demand counters, moved in the same UPDATE that takes an order's stock; rebuild_order_counters checks them
+    ordered_units = models.PositiveIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    last_ordered_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Back the keyset-paginated inventory list, which orders by (name, id) or (quantity, id)
+            models.Index(fields=['name', 'id'], name='item_name_id_idx'),
+            models.Index(fields=['quantity', 'id'], name='item_quantity_id_idx'),
+            # Only holds the rows below their threshold, so low_stock() costs O(low items), not O(catalog)
+            models.Index(fields=['quantity'], condition=LOW_STOCK, name='item_low_stock_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Insert the item, or update it if it still has the version it was read with.
+
+        Updates are a compare-and-swap on the version rather than a row lock: StaleEdit is raised if
+        another write got there first. Pass update_fields to send only the changed columns.
+        """
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self._record_change(self.quantity)
+            return
+
+        expected = self.version
+        update_fields = kwargs.get('update_fields')
+        writes_quantity = update_fields is None or 'quantity' in update_fields
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        with transaction.atomic():
+            if writes_quantity:
+                # Every stock write bumps the version, so if the row still has ours, this is the quantity we replace
+                previous = Item.objects.filter(pk=self.pk, version=expected).values_list('quantity', flat=True).first()
+                if previous is None:
+                    raise StaleEdit("This item was changed by someone else.")
+            self._expected_version = expected
+            self.version = expected + 1
+            try:
+                super().save(*args, **kwargs)
+            except Exception:
+                self.version = expected
+                raise
+            finally:
+                del self._expected_version
+            if writes_quantity:
+                self._record_change(self.quantity - previous)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        # UPDATE ... WHERE id = %s AND version = %s, in case a write landed since the check in save()
+        if not super()._do_update(base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update):
+            raise StaleEdit("This item was changed by someone else.")
+        return True
+
+    def _record_change(self, change):
+        """Record a stock change made by save() in the ledger and the warehouse rows."""
+        if change:
+            kind = StockMovement.RESTOCK if change > 0 else StockMovement.CORRECTION
+            StockMovement.objects.create(item=self, kind=kind, change=change)
+            WarehouseStock.objects.adjust_locations(self.pk, change)
+
+    def _record_orders(self, quantity, ordered_at, count=1):
+        """
+        Apply to this instance what drawing stock for ``count`` orders did to its row.
+
+        Fields that were never loaded stay deferred, so they are read fresh if used.
+        """
+        deferred = self.get_deferred_fields()
+        if 'quantity' not in deferred:
+            self.quantity -= quantity
+        if 'version' not in deferred:
+            self.version += 1
+        if 'ordered_units' not in deferred:
+            self.ordered_units += quantity
+        if 'order_count' not in deferred:
+            self.order_count += count
+        if 'last_ordered_at' not in deferred and (self.last_ordered_at is None or self.last_ordered_at < ordered_at):
+            self.last_ordered_at = ordered_at
+
+    def stock_at(self, when):
+        """
+        Return the quantity this item had at ``when``, according to the ledger.
+
+        Starts from the latest snapshot taken by then and replays only the movements recorded after it.
+        """
+        snapshot = self.snapshots.filter(taken_at__lte=when).order_by('-taken_at', '-pk').first()
+        movements = self.movements.filter(created_at__lte=when)
+        quantity = 0
+        if snapshot is not None:
+            quantity = snapshot.quantity
+            movements = movements.filter(pk__gt=snapshot.last_movement_id)
+        return quantity + (movements.aggregate(total=Sum('change'))['total'] or 0)
 
     def check_low_stock(self):
-        """Checks if the stock is below 15."""
-        if self.quantity < 15:
+        """Checks if the stock is below the reorder threshold, the in-memory twin of Item.objects.low_stock()."""
+        if self.quantity < self.reorder_threshold:
             return True
         return False
 
     # Optionally, you can define an is_low_stock method as well
     def is_low_stock(self):
-        """Checks if the stock is below 15 using the check_low_stock method."""
+        """Checks if the stock is below the reorder threshold using the check_low_stock method."""
         return self.check_low_stock()
 
     def __str__(self):
@@ -26,23 +232,570 @@ class Item(models.Model):
 
 class Order(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='orders')
+    # Where the stock was taken from; set it before saving to order from a particular warehouse
+    warehouse = models.ForeignKey('Warehouse', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
     quantity = models.PositiveIntegerField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the order is built rather than when it is inserted, so the item's last_ordered_at can match it
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Back the keyset-paginated order log, newest first, optionally narrowed to one item
+            models.Index(fields=['created_at', 'id'], name='order_created_at_id_idx'),
+            models.Index(fields=['item', 'created_at'], name='order_item_created_at_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        # Check if there is enough stock to fulfill the order
-        if self.item.quantity < self.quantity:
-            raise ValueError("Not enough stock to fulfill the order.")
+        # Stock is only deducted when the order is first created
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
 
-        # Deduct the stock atomically
-        self.item.quantity -= self.quantity  # Subtract the ordered quantity
-        self.item.save(update_fields=['quantity'])  # Ensure atomicity
+        with transaction.atomic():
+            # Check and deduct the stock in one statement per location, so concurrent orders cannot oversell
+            warehouse_id = Item.objects.reserve(self.item_id, self.quantity, self.warehouse_id, self.created_at)
+            if warehouse_id is None:
+                raise InsufficientStock("Not enough stock to fulfill the order.")
+            self.warehouse_id = warehouse_id
+            super().save(*args, **kwargs)
+            StockMovement.objects.create(item_id=self.item_id, kind=StockMovement.ORDER, change=-self.quantity, order=self)
 
-        # Check for low stock
-        if self.item.check_low_stock():
-            logger.info(f"Alert: Stock for '{self.item.name}' is below 15!")
+        # Keep an item loaded before the draw in step with the row we just updated; one loaded now already is
+        if Order.item.is_cached(self):
+            self.item._record_orders(self.quantity, self.created_at)
+        item = self.item
 
-        super().save(*args, **kwargs)
+        # Queue a low-stock alert once the order commits; the send_alerts worker delivers it
+        if item.check_low_stock():
+            transaction.on_commit(lambda: LowStockAlert.objects.enqueue([item]))
 
     def __str__(self):
         return f"Order of {self.quantity} {self.item.name}(s)"
+
+
+class WarehouseQuerySet(models.QuerySet):
+    def default(self):
+        """The nearest warehouse, which takes restocks that do not name one; created on first use."""
+        warehouse = self.order_by('priority', 'pk').first()
+        if warehouse is None:
+            warehouse, _ = self.get_or_create(name='Main')
+        return warehouse
+
+
+class Warehouse(models.Model):
+    """A stock location. Orders that do not name one draw from the nearest with enough stock."""
+    name = models.CharField(max_length=255, unique=True)
+    priority = models.PositiveIntegerField(default=0)  # Lower is nearer
+
+    objects = WarehouseQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
+
+class WarehouseStockQuerySet(models.QuerySet):
+    def low_stock(self):
+        """Locations below their reorder threshold, served from the partial stock_low_idx index."""
+        return self.filter(LOW_STOCK)
+
+    def available(self, item_id, quantity, now=None):
+        """An item's locations with at least ``quantity`` on hand that is not under an active hold."""
+        return self.filter(item_id=item_id, quantity__gte=HeldStock(now) + quantity)
+
+    def draw(self, item_id, quantity, warehouse_id=None, ordered_at=None):
+        """
+        Take stock of an item from one location and the item's total, with conditional UPDATEs.
+
+        Tries the given warehouse only, or else every location with enough stock, nearest first.
+        Stock under an active hold is not available. With ``ordered_at``, the item's order counters
+        move in the same UPDATE as its total. Returns the id of the warehouse drawn from, or None if
+        no single location had enough.
+        """
+        if warehouse_id is not None:
+            candidates = [warehouse_id]
+        else:
+            candidates = self.available(item_id, quantity).order_by(
+                'warehouse__priority', 'warehouse_id'
+            ).values_list('warehouse_id', flat=True)
+        for candidate in candidates:
+            # Re-checked in the UPDATE itself, in case a concurrent order or hold got there first
+            if self.available(item_id, quantity).filter(warehouse_id=candidate).update(
+                quantity=F('quantity') - quantity
+            ):
+                counters = {}
+                if ordered_at is not None:
+                    counters = {
+                        'ordered_units': F('ordered_units') + quantity,
+                        'order_count': F('order_count') + 1,
+                        # Concurrent orders can draw out of order, so keep the later time
+                        'last_ordered_at': Greatest(Coalesce('last_ordered_at', Value(ordered_at)), Value(ordered_at)),
+                    }
+                Item.objects.filter(pk=item_id).update(
+                    quantity=F('quantity') - quantity, version=F('version') + 1, **counters,
+                )
+                invalidate_items([item_id])
+                return candidate
+        return None
+
+    def adjust_locations(self, item_id, change):
+        """
+        Spread a change to an item's total over its locations; the caller updates the total itself.
+
+        Increases land at the default warehouse, in a row opened with the item's reorder threshold
+        if it has none there yet. Decreases are taken from the nearest locations first.
+        """
+        if change > 0:
+            warehouse = Warehouse.objects.default()
+            stock, created = self.get_or_create(item_id=item_id, warehouse=warehouse, defaults={
+                'quantity': change,
+                'reorder_threshold': lambda: Item.objects.values_list('reorder_threshold', flat=True).get(pk=item_id),
+            })
+            if not created:
+                self.filter(pk=stock.pk).update(quantity=F('quantity') + change)
+            return
+        remaining = -change
+        drained = []
+        locations = self.select_for_update(of=('self',)).filter(item_id=item_id, quantity__gt=0).order_by(
+            'warehouse__priority', 'warehouse_id'
+        )
+        for stock in locations:
+            taken = min(stock.quantity, remaining)
+            stock.quantity -= taken
+            drained.append(stock)
+            remaining -= taken
+            if not remaining:
+                break
+        self.bulk_update(drained, ['quantity'])
+
+    def add_to_default(self, changes):
+        """
+        Add stock for many items at the default warehouse, from a dict of item id to units.
+
+        Items without a row there yet get one with the item's reorder threshold.
+        """
+        warehouse = Warehouse.objects.default()
+        existing = dict(
+            self.filter(warehouse=warehouse, item_id__in=changes).values_list('item_id', 'pk')
+        )
+        if existing:
+            self.filter(pk__in=existing.values()).update(quantity=F('quantity') + Case(
+                *[When(pk=pk, then=Value(changes[item_id])) for item_id, pk in existing.items()]
+            ))
+        new = [item_id for item_id in changes if item_id not in existing]
+        if new:
+            thresholds = dict(Item.objects.filter(pk__in=new).values_list('pk', 'reorder_threshold'))
+            self.bulk_create([
+                WarehouseStock(
+                    item_id=item_id, warehouse=warehouse, quantity=changes[item_id],
+                    reorder_threshold=thresholds[item_id],
+                )
+                for item_id in new
+            ])
+
+
+class HeldStock(Func):
+    """
+    Units under active, unexpired holds at the outer WarehouseStock row's item and warehouse.
+
+    A correlated SUM over the hold_active_item_idx index, so availability is on-hand stock minus
+    this in one query. Holds count until they expire, whether or not the sweeper has run.
+    Compiled here rather than built as a Subquery, which cost more per order than the queries it
+    ran; the outer columns resolve like any F(), so they follow the outer query's table alias.
+    """
+    output_field = models.IntegerField()
+
+    def __init__(self, now=None):
+        super().__init__(F('item_id'), F('warehouse_id'))
+        self.now = now or timezone.now()
+
+    def as_sql(self, compiler, connection):
+        item, item_params = compiler.compile(self.source_expressions[0])
+        warehouse, warehouse_params = compiler.compile(self.source_expressions[1])
+        qn = connection.ops.quote_name
+        hold_item, hold_warehouse, quantity, status, expires_at = [
+            f'{qn("held")}.{qn(StockHold._meta.get_field(name).column)}'
+            for name in ('item', 'warehouse', 'quantity', 'status', 'expires_at')
+        ]
+        sql = (
+            f'(SELECT COALESCE(SUM({quantity}), 0) FROM {qn(StockHold._meta.db_table)} {qn("held")} '
+            f'WHERE {hold_item} = {item} AND {hold_warehouse} = {warehouse} AND {status} = %s AND {expires_at} > %s)'
+        )
+        now = connection.ops.adapt_datetimefield_value(self.now)
+        return sql, (*item_params, *warehouse_params, StockHold.ACTIVE, now)
+
+
+class WarehouseStock(models.Model):
+    """One item's stock at one warehouse. Item.quantity is the sum of these rows."""
+    # Indexed by the unique constraint below, which leads with the item
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='stock_levels', db_index=False)
+    # Deleting a warehouse would drop stock the item totals still count, so its rows must be emptied and moved first
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT, related_name='stock_levels')
+    quantity = models.IntegerField(default=0)
+    reorder_threshold = models.PositiveIntegerField(default=15)
+
+    objects = WarehouseStockQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Also serves "stock of an item across all locations"
+            models.UniqueConstraint(fields=['item', 'warehouse'], name='stock_item_warehouse_unique'),
+        ]
+        indexes = [
+            # Only holds the locations below their threshold, so "low items at warehouse W" costs O(low rows)
+            models.Index(fields=['warehouse', 'quantity'], condition=LOW_STOCK, name='stock_low_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item.name} at {self.warehouse.name}: {self.quantity}"
+
+
+class StockMovement(models.Model):
+    """One immutable ledger row per change to an item's quantity."""
+    ORDER = 'order'
+    RESTOCK = 'restock'
+    CORRECTION = 'correction'
+    KIND_CHOICES = [
+        (ORDER, 'Order'),
+        (RESTOCK, 'Restock'),
+        (CORRECTION, 'Correction'),
+    ]
+
+    # Indexed together with id below, which is the order stock_at replays movements in
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='movements', db_index=False)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    change = models.IntegerField()
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='movements')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'id'], name='movement_item_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Stock movements cannot be changed once recorded.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.change:+d} {self.item.name} ({self.get_kind_display()})"
+
+
+class StockSnapshot(models.Model):
+    """An item's quantity at a point in time, covering every movement up to last_movement_id."""
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='snapshots', db_index=False)
+    quantity = models.IntegerField()
+    last_movement_id = models.BigIntegerField(default=0)
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'taken_at'], name='snapshot_item_taken_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item.name}: {self.quantity} at {self.taken_at}"
+
+
+class DailyItemSales(models.Model):
+    """Units and orders per item per day, rolled up from Order once the day is over."""
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='daily_sales', db_index=False)
+    day = models.DateField()
+    units = models.PositiveIntegerField()
+    orders = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'day'], name='daily_sales_item_day_unique'),
+        ]
+        indexes = [
+            # Window reports scan a range of days across all items
+            models.Index(fields=['day', 'item'], name='daily_sales_day_item_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.units} {self.item.name} on {self.day}"
+
+
+class SalesRollup(models.Model):
+    """The last day folded into DailyItemSales, whether or not it had orders. A single row, written with that day's rows."""
+    rolled_through = models.DateField()
+
+    def __str__(self):
+        return f"Sales rolled up through {self.rolled_through}"
+
+
+class StockHoldQuerySet(models.QuerySet):
+    def active(self, now=None):
+        """Holds that still take stock out of the available quantity."""
+        return self.filter(status=StockHold.ACTIVE, expires_at__gt=now or timezone.now())
+
+    def place(self, item_id, quantity, warehouse_id=None, ttl=None, user=None):
+        """
+        Hold stock of an item at one warehouse, or at the nearest with enough available, for ``ttl`` seconds.
+
+        The stock stays on hand but is no longer available to other orders and holds. Raises
+        InsufficientStock if no single location has enough available.
+        """
+        ttl = settings.INVENTORY_HOLD_TTL if ttl is None else ttl
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock the chosen location, so a concurrent hold cannot count the same units as available
+            locations = WarehouseStock.objects.select_for_update(of=('self',)).available(item_id, quantity, now)
+            if warehouse_id is not None:
+                locations = locations.filter(warehouse_id=warehouse_id)
+            location = locations.order_by('warehouse__priority', 'warehouse_id').values_list(
+                'warehouse_id', flat=True
+            ).first()
+            if location is None:
+                raise InsufficientStock("Not enough stock to hold.")
+            return self.create(
+                item_id=item_id, warehouse_id=location, quantity=quantity, user=user,
+                expires_at=now + timedelta(seconds=ttl),
+            )
+
+    def expire(self, batch_size=1000, now=None):
+        """
+        Mark the active holds that are past their expiry as expired, one batch at a time.
+
+        Each batch is read from the hold_active_expiry_idx index, oldest first. Returns the number expired.
+        """
+        now = now or timezone.now()
+        expired = 0
+        while True:
+            batch = list(
+                self.filter(status=StockHold.ACTIVE, expires_at__lte=now).order_by('expires_at')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if batch:
+                # A hold confirmed or cancelled since the read keeps its status
+                expired += self.filter(pk__in=batch, status=StockHold.ACTIVE).update(status=StockHold.EXPIRED)
+            if len(batch) < batch_size:
+                return expired
+
+
+class StockHold(models.Model):
+    """Stock held at one warehouse for a checkout: on hand, but unavailable until it is confirmed or lapses."""
+    ACTIVE = 'active'
+    CONFIRMED = 'confirmed'
+    CANCELLED = 'cancelled'
+    EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (ACTIVE, 'Active'),
+        (CONFIRMED, 'Confirmed'),
+        (CANCELLED, 'Cancelled'),
+        (EXPIRED, 'Expired'),
+    ]
+
+    # Indexed by hold_active_item_idx below while the hold is active, the only time it is looked up by item
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='holds', db_index=False)
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='holds')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=ACTIVE)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+    order = models.OneToOneField(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='hold')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_holds',
+    )
+
+    objects = StockHoldQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Only active holds: the availability sum per location, and the sweeper's expiry queue
+            models.Index(
+                fields=['item', 'warehouse', 'expires_at'], condition=Q(status='active'), name='hold_active_item_idx',
+            ),
+            models.Index(fields=['expires_at'], condition=Q(status='active'), name='hold_active_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.item.name} at {self.warehouse.name} ({self.get_status_display()})"
+
+    def confirm(self):
+        """
+        Turn the hold into an Order for its stock at its warehouse, and return the order.
+
+        Raises HoldNotActive if the hold has expired or was settled already, and InsufficientStock
+        if the held stock was removed in the meantime, e.g. by a stock correction.
+        """
+        with transaction.atomic():
+            # Releasing the hold first makes its units available to the order that takes them
+            released = StockHold.objects.active().filter(pk=self.pk).update(status=StockHold.CONFIRMED)
+            if not released:
+                raise HoldNotActive("This hold has expired or was already settled.")
+            # The hold's item, if loaded, goes to the order, which keeps it in step with the draw
+            item = {'item': self.item} if StockHold.item.is_cached(self) else {'item_id': self.item_id}
+            order = Order.objects.create(warehouse_id=self.warehouse_id, quantity=self.quantity, **item)
+            StockHold.objects.filter(pk=self.pk).update(order=order)
+        self.status = StockHold.CONFIRMED
+        self.order = order
+        return order
+
+    def cancel(self):
+        """Release the hold's stock. Returns False if it was no longer active."""
+        cancelled = StockHold.objects.filter(pk=self.pk, status=StockHold.ACTIVE).update(status=StockHold.CANCELLED)
+        if cancelled:
+            self.status = StockHold.CANCELLED
+        return bool(cancelled)
+
+
+class LowStockAlertQuerySet(models.QuerySet):
+    def due(self, now=None):
+        """Pending alerts whose next delivery attempt is due, oldest first."""
+        return self.filter(status=LowStockAlert.PENDING, next_attempt_at__lte=now or timezone.now()).order_by('next_attempt_at', 'pk')
+
+    def claim(self, batch_size=100):
+        """
+        Take up to ``batch_size`` due alerts for one worker to send, oldest first, with their items.
+
+        Each claimed alert counts an attempt and is leased for INVENTORY_ALERT_LEASE seconds, so other
+        workers pass over it while it is sent, and an alert whose worker died is retried once the lease
+        runs out. Concurrent workers skip the rows another worker is claiming, where the database can.
+        """
+        now = timezone.now()
+        lease = now + timedelta(seconds=settings.INVENTORY_ALERT_LEASE)
+        with transaction.atomic():
+            alerts = list(
+                self.select_for_update(skip_locked=True, of=('self',)).due(now).select_related('item')[:batch_size]
+            )
+            self.filter(pk__in=[alert.pk for alert in alerts]).update(next_attempt_at=lease, attempts=F('attempts') + 1)
+        for alert in alerts:
+            alert.next_attempt_at = lease
+            alert.attempts += 1
+        return alerts
+
+    def enqueue(self, items):
+        """
+        Queue a low-stock alert for each item that has not been alerted about recently.
+
+        Items with an undelivered alert, or one delivered in the last INVENTORY_ALERT_COOLDOWN
+        seconds, are skipped, so a run of orders on a low item raises a single alert.
+        """
+        items = {item.pk: item for item in items}
+        if not items:
+            return []
+        since = timezone.now() - timedelta(seconds=settings.INVENTORY_ALERT_COOLDOWN)
+        alerted = set(
+            self.filter(item_id__in=items).filter(Q(status=LowStockAlert.PENDING) | Q(delivered_at__gte=since))
+            .values_list('item_id', flat=True)
+        )
+        # The pending-alert unique index turns away a duplicate queued by a concurrent request
+        return self.bulk_create(
+            [LowStockAlert(item=item, quantity=item.quantity) for pk, item in items.items() if pk not in alerted],
+            ignore_conflicts=True,
+        )
+
+
+class LowStockAlert(models.Model):
+    """Outbox row for one low-stock notification, written on commit and delivered by the send_alerts worker."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    quantity = models.IntegerField()  # The quantity that raised the alert
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LowStockAlertQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # At most one undelivered alert per item
+            models.UniqueConstraint(fields=['item'], condition=Q(status='pending'), name='alert_pending_item_unique'),
+        ]
+        indexes = [
+            # The worker's queue: only undelivered alerts, in delivery order
+            models.Index(fields=['next_attempt_at', 'id'], condition=Q(status='pending'), name='alert_pending_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item.name} below {self.item.reorder_threshold} ({self.get_status_display()})"
+
+
+class QueuedOrderQuerySet(models.QuerySet):
+    def process(self, batch_size=500):
+        """
+        Place one batch of queued orders, oldest first, in a single transaction; return (placed, rejected).
+
+        Each order goes through Order.save, so it gets the same stock checks and warehouse choice
+        as one placed directly. An order there is no stock for is rejected without failing the batch.
+        Concurrent workers skip the rows another worker has locked, where the database can.
+        """
+        with transaction.atomic():
+            batch = list(
+                self.select_for_update(skip_locked=True, of=('self',)).filter(status=QueuedOrder.QUEUED)
+                .select_related('item').order_by('pk')[:batch_size]
+            )
+            # Orders for the same item share one instance, so each low-stock check sees the orders before it
+            items = {}
+            placed = rejected = 0
+            now = timezone.now()
+            for queued in batch:
+                queued.item = items.setdefault(queued.item_id, queued.item)
+                order = Order(item=queued.item, warehouse_id=queued.warehouse_id, quantity=queued.quantity)
+                try:
+                    with transaction.atomic():
+                        order.save()
+                except InsufficientStock as exc:
+                    queued.status = QueuedOrder.REJECTED
+                    queued.error = str(exc)
+                    rejected += 1
+                else:
+                    queued.status = QueuedOrder.PLACED
+                    queued.order = order
+                    placed += 1
+                queued.processed_at = now
+            self.bulk_update(batch, ['status', 'error', 'order', 'processed_at'])
+        return placed, rejected
+
+
+class QueuedOrder(models.Model):
+    """
+    An order accepted while INVENTORY_ORDER_QUEUE is on, waiting in the spool table for the process_orders worker.
+
+    Accepting one is a single INSERT, so requests at peak load hold the database write lock only briefly;
+    the worker places the queued orders in large batched transactions.
+    """
+    QUEUED = 'queued'
+    PLACED = 'placed'
+    REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (PLACED, 'Placed'),
+        (REJECTED, 'Rejected'),
+    ]
+
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='queued_orders')
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.SET_NULL, null=True, blank=True, related_name='queued_orders')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    error = models.CharField(max_length=255, blank=True)  # Why the order was rejected
+    # When the order was accepted; the placed Order carries the time it was placed, as direct orders do
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    order = models.OneToOneField(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='queued_as')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='queued_orders',
+    )
+
+    objects = QueuedOrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The worker's queue: only the orders still waiting, in the order they were accepted
+            models.Index(fields=['id'], condition=Q(status='queued'), name='queued_order_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"Queued order of {self.quantity} {self.item.name}(s) ({self.get_status_display()})"
@@ -0,0 +1,122 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def encode_cursor(value, pk):
+    """Encode the sort value and pk of the last row on a page into an opaque, URL-safe cursor."""
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (value, pk) pair stored in a cursor, or None if the cursor is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if not isinstance(pk, int):
+        return None
+    return value, pk
+
+
+def keyset_page(queryset, field, descending=False, cursor=None, per_page=50):
+    """
+    Return one page of ``queryset`` ordered by ``(field, pk)`` and the cursor of the next page.
+
+    Pages are located with a WHERE clause on the last seen (value, pk) instead of OFFSET,
+    so every page costs the same however deep it is, given an index on ``(field, id)``.
+    The next cursor is None on the last page. Rows may be model instances or values() dicts
+    that include ``field`` and ``id``.
+    """
+    rows = list(_keyset_queryset(queryset, field, descending, cursor)[:per_page + 1])
+    return _split_page(rows, field, per_page)
+
+
+async def akeyset_page(queryset, field, descending=False, cursor=None, per_page=50):
+    """The async twin of keyset_page, for async views."""
+    rows = [row async for row in _keyset_queryset(queryset, field, descending, cursor)[:per_page + 1]]
+    return _split_page(rows, field, per_page)
+
+
+def _keyset_queryset(queryset, field, descending, cursor):
+    if descending:
+        queryset = queryset.order_by(f'-{field}', '-pk')
+        lookup = 'lt'
+    else:
+        queryset = queryset.order_by(field, 'pk')
+        lookup = 'gt'
+
+    position = decode_cursor(cursor)
+    if position is not None:
+        value, pk = position
+        try:
+            value = queryset.model._meta.get_field(field).to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            value = None
+        # A value the sort field cannot hold, e.g. from a cursor of another sort, is malformed: start over
+        if value is None:
+            return queryset
+        queryset = queryset.filter(Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk}))
+    return queryset
+
+
+def _split_page(rows, field, per_page):
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last[field], last['id'])
+        else:
+            next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Paginator that stops counting past ``exact_count_limit`` rows and estimates the rest.
+
+    Counts up to the limit are exact and read at most that many rows. Beyond it, PostgreSQL's
+    planner estimate is used, or on other databases the highest id of an unfiltered table, so
+    large changelists never run a full COUNT(*).
+    """
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        counted = queryset.order_by()[:self.exact_count_limit + 1].count()
+        if counted <= self.exact_count_limit:
+            return counted
+        return max(estimate_count(queryset) or 0, counted)
+
+
+def estimate_count(queryset):
+    """A cheap estimate of the rows in ``queryset``, or None if the database cannot give one."""
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    if not queryset.query.where:
+        # Read off the primary key index; deleted rows make it an overestimate
+        return queryset.order_by('-pk').values_list('pk', flat=True).first()
+    return None
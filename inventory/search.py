@@ -0,0 +1,105 @@
+import re
+from functools import reduce
+from operator import and_
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Q
+
+from .models import Item
+
+# The words of a search, as both full-text tokenizers split them; at most MAX_SEARCH_TERMS are used
+SEARCH_WORD = re.compile(r'\w+')
+MAX_SEARCH_TERMS = 8
+
+# SQLite: an FTS5 index over the item table (created by migration 0012), with name and description kept in
+# step by triggers, so bulk inserts and raw UPDATEs are indexed as well as Item.save(). SQLite adds and drops
+# item columns by rebuilding the table, which drops the triggers with it; restore_search_triggers puts them back.
+SQLITE_SEARCH_TRIGGERS = {
+    'inventory_item_fts_insert': """
+    CREATE TRIGGER IF NOT EXISTS inventory_item_fts_insert AFTER INSERT ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    'inventory_item_fts_delete': """
+    CREATE TRIGGER IF NOT EXISTS inventory_item_fts_delete AFTER DELETE ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts (inventory_item_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    # Stock changes rewrite the whole row through save(), so only reindex when the text changed
+    'inventory_item_fts_update': """
+    CREATE TRIGGER IF NOT EXISTS inventory_item_fts_update AFTER UPDATE OF name, description ON inventory_item
+    WHEN old.name IS NOT new.name OR old.description IS NOT new.description BEGIN
+        INSERT INTO inventory_item_fts (inventory_item_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO inventory_item_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+}
+
+# PostgreSQL: a GIN index on the weighted document (created by migration 0012); searches must repeat
+# this exact expression to use it
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', description), 'B')"
+)
+
+
+def restore_search_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Put back any SQLite search trigger a table rebuild dropped, and reindex the rows written without it.
+
+    Connected to post_migrate, so it runs after migrating in either direction. Does nothing on other
+    databases, or while the search index does not exist, e.g. after migrating back past it.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    names = ['inventory_item_fts', *SQLITE_SEARCH_TRIGGERS]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", names,
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SQLITE_SEARCH_TRIGGERS if name not in existing]
+        if 'inventory_item_fts' not in existing or not missing:
+            return
+        for name in missing:
+            cursor.execute(SQLITE_SEARCH_TRIGGERS[name])
+        cursor.execute("INSERT INTO inventory_item_fts (inventory_item_fts) VALUES ('rebuild')")
+
+
+def search_terms(query):
+    return SEARCH_WORD.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_item_ids(query, limit):
+    """
+    Ids of at most ``limit`` items matching every word of ``query``, best match first.
+
+    Each word matches as a prefix, for typeahead, in the name or the description; name matches
+    rank higher and ties are broken by name. Uses the full-text index on SQLite and PostgreSQL,
+    and falls back to a contains scan on other databases.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        # Each term is quoted, so FTS5 operators typed by the user are searched for as plain words
+        sql = (
+            'SELECT rowid FROM inventory_item_fts WHERE inventory_item_fts MATCH %s '
+            'ORDER BY bm25(inventory_item_fts, 10.0, 1.0), name LIMIT %s'
+        )
+        params = [' '.join(f'"{term}"*' for term in terms), limit]
+    elif connection.vendor == 'postgresql':
+        sql = (
+            f"SELECT id FROM inventory_item WHERE ({POSTGRES_DOCUMENT}) @@ to_tsquery('simple', %s) "
+            f"ORDER BY ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', %s)) DESC, name LIMIT %s"
+        )
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        params = [tsquery, tsquery, limit]
+    else:
+        matches = reduce(and_, [Q(name__icontains=term) | Q(description__icontains=term) for term in terms])
+        return list(Item.objects.filter(matches).order_by('name', 'pk').values_list('pk', flat=True)[:limit])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,129 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Func, IntegerField, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .cache import invalidate_items
+from .models import HeldStock, InsufficientStock, Item, LowStockAlert, Order, StockMovement, WarehouseStock
+
+
+# Items per UPDATE in create_bulk_order, which keeps each statement under SQLite's 999 parameters
+BULK_ORDER_CHUNK = 100
+
+
+class AmountsByPk(Func):
+    """
+    A CASE giving each row its amount from a {pk: amount} dict, for UPDATEs that move rows by different amounts.
+
+    Compiled here because resolving a Case(When(...)) per row cost more than the UPDATEs themselves on
+    large orders; the pk resolves like any F(), so it is qualified with the query's table or alias.
+    """
+    output_field = IntegerField()
+
+    def __init__(self, amounts):
+        super().__init__(F('pk'))
+        self.amounts = amounts
+
+    def as_sql(self, compiler, connection):
+        pk, params = compiler.compile(self.source_expressions[0])
+        whens = ' '.join(['WHEN %s THEN %s'] * len(self.amounts))
+        return f'CASE {pk} {whens} END', (*params, *[value for pair in self.amounts.items() for value in pair])
+
+
+def chunked(amounts):
+    """Split a {pk: amount} dict into dicts of at most BULK_ORDER_CHUNK entries, in pk order."""
+    pks = sorted(amounts)
+    for start in range(0, len(pks), BULK_ORDER_CHUNK):
+        yield {pk: amounts[pk] for pk in pks[start:start + BULK_ORDER_CHUNK]}
+
+
+def create_bulk_order(lines):
+    """
+    Create one Order per (item_id, quantity) line, reserving all the stock in one transaction.
+
+    Lines for the same item are merged when reserving, and filled from the nearest warehouse
+    that has the whole merged quantity. Either every line is ordered or
+    nothing changes: InsufficientStock is raised if any item is short on stock, and
+    ValueError for malformed lines or unknown items.
+    The statement count does not grow with the number of lines, ledger rows included; it only
+    grows with every BULK_ORDER_CHUNK distinct items.
+    """
+    lines = [(item_id, quantity) for item_id, quantity in lines]
+    # Exactly int: int() would truncate 2.5 to 2, and True is an int too
+    if any(type(item_id) is not int or type(quantity) is not int for item_id, quantity in lines):
+        raise ValueError("Item ids and quantities must be whole numbers.")
+    if not lines:
+        raise ValueError("An order needs at least one line.")
+    if any(quantity < 1 for _, quantity in lines):
+        raise ValueError("Quantities must be at least 1.")
+
+    wanted = Counter()
+    line_counts = Counter()
+    for item_id, quantity in lines:
+        wanted[item_id] += quantity
+        line_counts[item_id] += 1
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Lock the rows in pk order, so overlapping bulk orders cannot deadlock
+        items = {item.pk: item for item in Item.objects.select_for_update().filter(pk__in=wanted).order_by('pk')}
+
+        missing = sorted(set(wanted) - set(items))
+        if missing:
+            raise ValueError(f"Unknown item ids: {', '.join(map(str, missing))}.")
+
+        # Lock the items' locations too, and take each item from the nearest one that covers the whole quantity
+        # with stock that is not under an active hold
+        sources = {}
+        locations = WarehouseStock.objects.select_for_update(of=('self',)).filter(item_id__in=wanted).order_by(
+            'item_id', 'warehouse__priority', 'warehouse_id'
+        ).values_list('pk', 'item_id', 'warehouse_id', F('quantity') - HeldStock())
+        for pk, item_id, warehouse_id, available in locations:
+            if item_id not in sources and available >= wanted[item_id]:
+                sources[item_id] = (pk, warehouse_id)
+
+        short = [items[item_id].name for item_id in wanted if item_id not in sources]
+        if short:
+            raise InsufficientStock(f"Not enough stock to fulfill the order for: {', '.join(short)}.")
+
+        # One UPDATE per chunk of locations; each row is only touched if it still has enough stock
+        taken = {sources[item_id][0]: quantity for item_id, quantity in wanted.items()}
+        updated = 0
+        for chunk in chunked(taken):
+            updated += WarehouseStock.objects.filter(pk__in=chunk, quantity__gte=AmountsByPk(chunk)).update(
+                quantity=F('quantity') - AmountsByPk(chunk),
+            )
+        if updated != len(wanted):
+            raise InsufficientStock("Not enough stock to fulfill the order.")
+        # And one per chunk for the item totals, which cover their locations, and the items' order counters
+        for chunk in chunked(wanted):
+            Item.objects.filter(pk__in=chunk).update(
+                quantity=F('quantity') - AmountsByPk(chunk),
+                ordered_units=F('ordered_units') + AmountsByPk(chunk),
+                order_count=F('order_count') + AmountsByPk({item_id: line_counts[item_id] for item_id in chunk}),
+                last_ordered_at=Greatest(Coalesce('last_ordered_at', Value(now)), Value(now)),
+                version=F('version') + 1,
+            )
+        invalidate_items(wanted)
+
+        orders = Order.objects.bulk_create([
+            Order(item=items[item_id], warehouse_id=sources[item_id][1], quantity=quantity, created_at=now)
+            for item_id, quantity in lines
+        ])
+        StockMovement.objects.bulk_create([
+            StockMovement(item_id=order.item_id, kind=StockMovement.ORDER, change=-order.quantity, order=order)
+            for order in orders
+        ])
+
+    # Keep the in-memory items in step with the rows we just updated
+    for item_id, quantity in wanted.items():
+        items[item_id]._record_orders(quantity, now, count=line_counts[item_id])
+
+    # Queue low-stock alerts once the order commits; the send_alerts worker delivers them
+    low = [items[item_id] for item_id in wanted if items[item_id].check_low_stock()]
+    if low:
+        transaction.on_commit(lambda: LowStockAlert.objects.enqueue(low))
+
+    return orders
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_items
+from .models import Item
+
+
+# Saves through forms and the admin go through Item.save, so their snapshots are dropped here
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def invalidate_item_snapshot(sender, instance, **kwargs):
+    invalidate_items([instance.pk])
@@ -1,7 +1,14 @@
+from unittest.mock import patch
+
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Sum
 from django.urls import reverse
-from inventory.models import Item, Order
+from django.utils import timezone
+from inventory.models import Item, Order, StockMovement, Warehouse, WarehouseStock
+from inventory.pagination import EstimatedCountPaginator
 
 class AdminTests(TestCase):
     def setUp(self):
@@ -22,3 +29,77 @@ class AdminTests(TestCase):
         response = self.client.get(reverse('admin:inventory_order_changelist'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Order of 5 Test Item(s)')
+
+class AdminChangelistPerformanceTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(username='admin', password='password', email='admin@example.com')
+        self.client.force_login(self.user)
+        self.items = [Item.objects.create(name=f"Item {i}", quantity=10, description="Bolt") for i in range(4)]
+
+    def changelist_queries(self, name, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'admin:inventory_{name}_changelist'), params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_order_changelist_queries_do_not_grow_with_rows(self):
+        """Test that listing orders does not run a query per row for the item or warehouse."""
+        Order.objects.create(item=self.items[0], quantity=1)
+        few = self.changelist_queries('order')
+        for item in self.items:
+            Order.objects.create(item=item, quantity=1)
+        self.assertEqual(self.changelist_queries('order'), few)
+
+    def test_counts_stop_at_the_limit(self):
+        """Test that counts past the limit are estimated instead of counted in full."""
+        with patch.object(EstimatedCountPaginator, 'exact_count_limit', 2):
+            paginator = EstimatedCountPaginator(Item.objects.order_by('pk'), 1)
+            self.assertEqual(paginator.count, self.items[-1].pk)
+            paginator = EstimatedCountPaginator(Item.objects.filter(name__startswith="Item").order_by('pk'), 1)
+            self.assertEqual(paginator.count, 3)
+        self.assertEqual(EstimatedCountPaginator(Item.objects.order_by('pk'), 1).count, 4)
+
+    def test_search_and_date_filter(self):
+        """Test that the admin searches items and orders through the full-text index and filters orders by date."""
+        Item.objects.create(name="Washer", quantity=5, description="Steel")
+        response = self.client.get(reverse('admin:inventory_item_changelist'), {'q': 'stee'})
+        self.assertContains(response, "Washer")
+        self.assertNotContains(response, "Item 0")
+
+        Order.objects.create(item=self.items[1], quantity=2)
+        today = timezone.localdate()
+        response = self.client.get(reverse('admin:inventory_order_changelist'), {
+            'q': 'item 1', 'created_at__year': today.year, 'created_at__month': today.month,
+        })
+        self.assertContains(response, "Order of 2 Item 1(s)")
+
+    def test_bulk_actions_write_stock_in_one_update(self):
+        """Test that restocking and zeroing selected items updates them together and keeps the ledger."""
+        first, second, third, untouched = self.items
+        Item.objects.filter(pk=first.pk).update(reorder_threshold=25)
+        Item.objects.filter(pk=third.pk).update(reorder_threshold=5)
+        WarehouseStock.objects.create(item=second, warehouse=Warehouse.objects.create(name="Far", priority=5), quantity=3)
+        Item.objects.filter(pk=second.pk).update(quantity=13)
+        selected = [first.pk, second.pk, third.pk]
+        url = reverse('admin:inventory_item_changelist')
+
+        self.client.post(url, {'action': 'restock', '_selected_action': selected})
+        self.assertEqual(
+            dict(Item.objects.filter(pk__in=selected).values_list('pk', 'quantity')),
+            {first.pk: 25, second.pk: 15, third.pk: 10},
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {'action': 'zero_stock', '_selected_action': selected})
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE "inventory_item"')]), 1)
+        items = Item.objects.filter(pk__in=selected).annotate(located=Sum('stock_levels__quantity'))
+        self.assertEqual(
+            {item.pk: (item.quantity, item.located, item.version) for item in items},
+            {first.pk: (0, 0, 3), second.pk: (0, 0, 3), third.pk: (0, 0, 2)},
+        )
+        # The 3 units stocked at Far above bypassed the ledger
+        ledger = StockMovement.objects.filter(item__in=selected).values('item').annotate(total=Sum('change'))
+        self.assertEqual(
+            {row['item']: row['total'] for row in ledger}, {first.pk: 0, second.pk: -3, third.pk: 0}
+        )
+        self.assertEqual(Item.objects.get(pk=untouched.pk).quantity, 10)
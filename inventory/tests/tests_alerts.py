@@ -0,0 +1,195 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from inventory.alerts import deliver_alerts
+from inventory.models import Item, LowStockAlert, Order
+from inventory.services import create_bulk_order
+
+
+class WebhookReceiver:
+    """A local stand-in for the alert webhook that records what it is sent."""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.received = []
+        self.release = threading.Event()
+        self.release.set()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.release.wait(5)
+                receiver.received.append(json.loads(body))
+                self.send_response(receiver.status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/alerts'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class AlertQueueTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=20, description="Fruit")
+
+    def test_alert_is_queued_on_commit(self):
+        """Test that an order taking an item below its threshold queues an alert only once it commits."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            Order.objects.create(item=self.item, quantity=10)
+            self.assertFalse(LowStockAlert.objects.exists())
+        for callback in callbacks:
+            callback()
+        alert = LowStockAlert.objects.get()
+        self.assertEqual((alert.item, alert.quantity), (self.item, 10))
+
+    def test_no_alert_when_order_rolls_back(self):
+        """Test that an order rolled back by its caller leaves no alert behind."""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    Order.objects.create(item=self.item, quantity=10)
+                    raise RuntimeError
+        self.assertFalse(LowStockAlert.objects.exists())
+
+    def test_repeated_orders_raise_one_alert(self):
+        """Test that further orders on a low item do not queue a second alert while one is pending or recent."""
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(item=self.item, quantity=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(item=self.item, quantity=1)
+        self.assertEqual(LowStockAlert.objects.count(), 1)
+
+        LowStockAlert.objects.update(status=LowStockAlert.SENT, delivered_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(item=self.item, quantity=1)
+        self.assertEqual(LowStockAlert.objects.count(), 1)
+
+        with override_settings(INVENTORY_ALERT_COOLDOWN=0):
+            with self.captureOnCommitCallbacks(execute=True):
+                Order.objects.create(item=self.item, quantity=1)
+        self.assertEqual(LowStockAlert.objects.filter(status=LowStockAlert.PENDING).count(), 1)
+
+    def test_bulk_order_queues_alerts_for_low_items(self):
+        """Test that a bulk order queues one alert per item it took below the threshold."""
+        with self.captureOnCommitCallbacks(execute=True):
+            create_bulk_order([(self.item.pk, 8), (self.item.pk, 2), (self.pear.pk, 1)])
+        self.assertEqual(list(LowStockAlert.objects.values_list('item_id', 'quantity')), [(self.item.pk, 10)])
+
+
+class AlertDeliveryTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(item=self.item, quantity=12)
+        self.alert = LowStockAlert.objects.get()
+
+    def test_worker_posts_alerts_to_the_webhook(self):
+        """Test that the worker posts each due alert and marks it sent."""
+        with WebhookReceiver() as receiver, override_settings(INVENTORY_ALERT_WEBHOOK_URL=receiver.url):
+            self.assertEqual(deliver_alerts(), (1, 0))
+        self.assertEqual(receiver.received, [{
+            'alert': self.alert.pk,
+            'item': self.item.pk,
+            'name': "Apple",
+            'quantity': 8,
+            'reorder_threshold': 15,
+            'raised_at': self.alert.created_at.isoformat(),
+        }])
+        self.alert.refresh_from_db()
+        self.assertEqual((self.alert.status, self.alert.attempts), (LowStockAlert.SENT, 1))
+        self.assertIsNotNone(self.alert.delivered_at)
+        self.assertEqual(deliver_alerts(), (0, 0))
+
+    def test_orders_do_not_wait_for_the_webhook(self):
+        """Test that orders complete while the webhook is stuck, and the alert waits in the outbox."""
+        with WebhookReceiver() as receiver, override_settings(INVENTORY_ALERT_WEBHOOK_URL=receiver.url):
+            receiver.release.clear()
+            with self.captureOnCommitCallbacks(execute=True):
+                Order.objects.create(item=self.item, quantity=1)
+            self.assertEqual(receiver.received, [])
+            self.assertEqual(LowStockAlert.objects.get().status, LowStockAlert.PENDING)
+
+    @override_settings(INVENTORY_ALERT_MAX_ATTEMPTS=2, INVENTORY_ALERT_RETRY_DELAY=60)
+    def test_failed_delivery_is_retried_then_given_up(self):
+        """Test that a refused alert is retried after a backoff and marked failed after the last attempt."""
+        with WebhookReceiver(status=500) as receiver, override_settings(INVENTORY_ALERT_WEBHOOK_URL=receiver.url):
+            self.assertEqual(deliver_alerts(), (0, 1))
+            self.alert.refresh_from_db()
+            self.assertEqual((self.alert.status, self.alert.attempts), (LowStockAlert.PENDING, 1))
+            self.assertIn("500", self.alert.last_error)
+            self.assertGreater(self.alert.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            self.assertEqual(deliver_alerts(), (0, 0))
+
+            LowStockAlert.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(deliver_alerts(), (0, 1))
+        self.alert.refresh_from_db()
+        self.assertEqual((self.alert.status, self.alert.attempts), (LowStockAlert.FAILED, 2))
+        self.assertEqual(len(receiver.received), 2)
+
+    def test_any_send_error_fails_only_its_alert(self):
+        """Test that an unexpected error sending one alert is recorded for retry and the rest are still sent."""
+        pear = Item.objects.create(name="Pear", quantity=1, description="Fruit")
+        LowStockAlert.objects.enqueue([pear])
+        sent = []
+
+        def send(payload):
+            if payload['name'] == "Apple":
+                raise ValueError("Bad payload")
+            sent.append(payload['name'])
+
+        self.assertEqual(deliver_alerts(send=send), (1, 1))
+        self.assertEqual(sent, ["Pear"])
+        self.alert.refresh_from_db()
+        self.assertEqual((self.alert.status, self.alert.attempts, self.alert.last_error),
+                         (LowStockAlert.PENDING, 1, "Bad payload"))
+
+    def test_claimed_alerts_are_not_sent_by_another_worker(self):
+        """Test that an alert claimed by one worker is skipped by others until its lease runs out."""
+        claimed, = LowStockAlert.objects.claim()
+        self.assertEqual(claimed, self.alert)
+        self.assertEqual(deliver_alerts(send=lambda payload: None), (0, 0))
+
+        # The first worker died without reporting back; once the lease is over the alert is retried
+        LowStockAlert.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_alerts(send=lambda payload: None), (1, 0))
+        self.alert.refresh_from_db()
+        self.assertEqual((self.alert.status, self.alert.attempts), (LowStockAlert.SENT, 2))
+
+    def test_alerts_are_logged_without_a_webhook(self):
+        """Test that alerts are written to the log when no webhook is configured."""
+        with self.assertLogs('inventory.alerts', 'INFO') as logs:
+            self.assertEqual(deliver_alerts(), (1, 0))
+        self.assertEqual(logs.records[0].getMessage(), "Alert: Stock for 'Apple' is below 15!")
+
+    def test_send_alerts_command(self):
+        """Test that the command drains the outbox in batches and reports the outcome."""
+        for number in range(4):
+            item = Item.objects.create(name=f"Item {number}", quantity=1, description="Low")
+            LowStockAlert.objects.enqueue([item])
+        out = StringIO()
+        with self.assertLogs('inventory.alerts', 'INFO'):
+            call_command('send_alerts', '--batch-size', '2', stdout=out)
+        self.assertIn("Delivered 5 alerts, 0 failed.", out.getvalue())
+        self.assertFalse(LowStockAlert.objects.due().exists())
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.analytics import roll_up_sales, top_movers
+from inventory.models import DailyItemSales, Item, Order
+
+
+class SalesAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.apple = Item.objects.create(name="Apple", quantity=1000, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=1000, description="Fruit")
+        self.today = date(2024, 3, 10)
+
+    def order(self, item, quantity, day):
+        order = Order.objects.create(item=item, quantity=quantity)
+        Order.objects.filter(pk=order.pk).update(created_at=datetime.combine(day, datetime.min.time(), timezone.utc) + timedelta(hours=12))
+        return order
+
+    def test_roll_up_folds_complete_days_only(self):
+        """Test that complete days are rolled up per item and today is left alone."""
+        self.order(self.apple, 3, self.today - timedelta(days=2))
+        self.order(self.apple, 4, self.today - timedelta(days=2))
+        self.order(self.pear, 1, self.today - timedelta(days=1))
+        self.order(self.pear, 9, self.today)
+
+        self.assertEqual(roll_up_sales(self.today), self.today - timedelta(days=1))
+        rows = set(DailyItemSales.objects.values_list('item_id', 'day', 'units', 'orders'))
+        self.assertEqual(rows, {
+            (self.apple.pk, self.today - timedelta(days=2), 7, 2),
+            (self.pear.pk, self.today - timedelta(days=1), 1, 1),
+        })
+
+    def test_roll_up_is_incremental(self):
+        """Test that later runs only aggregate the new days."""
+        self.order(self.apple, 3, self.today - timedelta(days=1))
+        roll_up_sales(self.today)
+        # Rolled-up days are never re-read from the raw orders
+        Order.objects.all().delete()
+        with self.assertNumQueries(1):
+            roll_up_sales(self.today)
+
+        self.order(self.apple, 5, self.today)
+        roll_up_sales(self.today + timedelta(days=1))
+        self.assertEqual(
+            list(DailyItemSales.objects.order_by('day').values_list('units', flat=True)), [3, 5]
+        )
+
+    def test_days_without_orders_are_rolled_up_too(self):
+        """Test that quiet days move the rollup on, so they are not rescanned and the report window ends at yesterday."""
+        self.order(self.apple, 100, self.today - timedelta(days=25))
+        roll_up_sales(self.today - timedelta(days=20))
+        with self.assertNumQueries(1):
+            roll_up_sales(self.today - timedelta(days=20))
+
+        # An item that last sold 25 days ago is not a top mover of the past week
+        roll_up_sales(self.today)
+        self.assertEqual(top_movers(7, 5), {'window_days': 7, 'through': self.today - timedelta(days=1), 'results': []})
+
+    def test_top_movers(self):
+        """Test that movers are ranked by units with velocity and days of cover."""
+        for days_ago in range(1, 11):
+            self.order(self.apple, 2, self.today - timedelta(days=days_ago))
+        self.order(self.pear, 5, self.today - timedelta(days=3))
+        self.order(self.pear, 50, self.today - timedelta(days=40))  # Outside the window
+
+        roll_up_sales(self.today)
+        report = top_movers(10, 5)
+        self.assertEqual(report['through'], self.today - timedelta(days=1))
+        apple, pear = report['results']
+        self.assertEqual((apple['name'], apple['units'], apple['orders']), ("Apple", 20, 10))
+        self.assertEqual(apple['velocity'], 2.0)
+        self.assertEqual(apple['days_of_cover'], round(980 / 2.0, 1))
+        self.assertEqual((pear['units'], pear['velocity']), (5, 0.5))
+
+        self.assertEqual(len(top_movers(10, 1)['results']), 1)
+
+    def test_top_movers_is_cached_per_window(self):
+        """Test that a repeated report skips the aggregation, while days of cover follows the stock."""
+        self.order(self.apple, 10, self.today - timedelta(days=1))
+        roll_up_sales(self.today)
+        top_movers(7, 10)
+        with self.assertNumQueries(1):  # Only the last rolled-up day, which keys the cache
+            report = top_movers(7, 10)
+        self.assertEqual(report['results'][0]['units'], 10)
+
+        Order.objects.create(item=self.apple, quantity=90)
+        report = top_movers(7, 10)
+        self.assertEqual(report['results'][0]['quantity'], 900)
+
+    def test_top_movers_only_reads(self):
+        """Test that the report does not roll up days itself, and covers the days rolled up so far."""
+        self.order(self.apple, 4, self.today - timedelta(days=1))
+        self.assertEqual(top_movers(7, 10), {'window_days': 7, 'through': None, 'results': []})
+        self.assertFalse(DailyItemSales.objects.exists())
+
+        roll_up_sales(self.today)
+        report = top_movers(7, 10)
+        self.assertEqual(report['through'], self.today - timedelta(days=1))
+        self.assertEqual(report['results'][0]['units'], 4)
+
+    def test_sales_report_endpoint(self):
+        """Test that admins get the report and bad parameters are rejected."""
+        get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.login(username='admin', password='password')
+        response = self.client.get(reverse('api_sales_report'), {'window': 7, 'top': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['window_days'], 7)
+        self.assertEqual(self.client.get(reverse('api_sales_report'), {'window': 0}).status_code, 400)
+
+    def test_rollup_command(self):
+        """Test that the command reports the last rolled-up day."""
+        out = StringIO()
+        call_command('rollup_sales', stdout=out)
+        self.assertIn("Daily sales rolled up through", out.getvalue())
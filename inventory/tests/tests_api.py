@@ -0,0 +1,177 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory import api
+from inventory.cache import get_item_snapshot
+from inventory.models import Item, Order, WarehouseStock
+
+
+class AsyncReadApiTests(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.regular_user = get_user_model().objects.create_user(username='regularuser', password='password')
+        self.async_client.force_login(self.admin_user)
+        self.apple = Item.objects.create(name="Apple", quantity=3, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=40, description="Fruit")
+        Item.objects.bulk_create([Item(name=f"Widget {i:03d}", quantity=100 + i, description="Widget") for i in range(120)])
+
+    async def test_item_list_pages(self):
+        """Test that the item list is returned a page at a time with a cursor."""
+        response = await self.async_client.get(reverse('api_item_list'))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(len(body['results']), api.API_PAGE_SIZE)
+        self.assertEqual(body['results'][0], {'id': self.apple.pk, 'name': "Apple", 'quantity': 3, 'reorder_threshold': 15})
+
+        response = await self.async_client.get(reverse('api_item_list'), {'after': body['next']})
+        body = response.json()
+        self.assertEqual(len(body['results']), 22)
+        self.assertIsNone(body['next'])
+
+    async def test_item_list_search_and_sort(self):
+        """Test that the item list takes the same search and sort parameters as the HTML list."""
+        response = await self.async_client.get(reverse('api_item_list'), {'q': 'pea'})
+        self.assertEqual([item['name'] for item in response.json()['results']], ["Pear"])
+        response = await self.async_client.get(reverse('api_item_list'), {'sort': '-quantity'})
+        self.assertEqual(response.json()['results'][0]['name'], "Widget 119")
+
+    async def test_item_detail(self):
+        """Test that a single item is fetched, and unknown ids are a 404."""
+        response = await self.async_client.get(reverse('api_item_detail', args=[self.pear.pk]))
+        self.assertEqual(response.json()['quantity'], 40)
+        response = await self.async_client.get(reverse('api_item_detail', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_low_stock_summary(self):
+        """Test that the summary counts and lists the items below their threshold."""
+        response = await self.async_client.get(reverse('api_low_stock'))
+        self.assertEqual(response.json(), {
+            'count': 1,
+            'results': [{'id': self.apple.pk, 'name': "Apple", 'quantity': 3, 'reorder_threshold': 15}],
+        })
+
+    async def test_order_list(self):
+        """Test that the order log is returned newest first and can be filtered."""
+        older = await Order.objects.acreate(item=self.pear, quantity=1)
+        await Order.objects.filter(pk=older.pk).aupdate(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        newer = await Order.objects.acreate(item=self.pear, quantity=2)
+
+        response = await self.async_client.get(reverse('api_order_list'))
+        results = response.json()['results']
+        self.assertEqual([order['id'] for order in results], [newer.pk, older.pk])
+        self.assertEqual(results[0]['item_name'], "Pear")
+
+        response = await self.async_client.get(reverse('api_order_list'), {'end': '2024-01-01'})
+        self.assertEqual([order['id'] for order in response.json()['results']], [older.pk])
+        response = await self.async_client.get(reverse('api_order_list'), {'start': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_order_list_admin_only(self):
+        """Test that a regular user cannot read the order log."""
+        await self.async_client.aforce_login(self.regular_user)
+        response = await self.async_client.get(reverse('api_order_list'))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_login_required(self):
+        """Test that anonymous requests are sent to the login page."""
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse('api_item_list'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_sync_client_still_works(self):
+        """Test that the async views also serve the WSGI test client."""
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse('api_low_stock'))
+        self.assertEqual(response.json()['count'], 1)
+
+
+class JsonApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='clerk', password='password')
+        self.client.force_login(self.user)
+        self.apple = Item.objects.create(name="Apple", quantity=3, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=40, description="Fruit")
+        Item.objects.bulk_create([Item(name=f"Widget {i:03d}", quantity=100 + i, description="Widget") for i in range(120)])
+
+    def test_sparse_fields(self):
+        """Test that ?fields= returns only the named fields, while paging keeps working."""
+        body = self.client.get(reverse('api_item_list'), {'fields': 'name', 'sort': '-quantity'}).json()
+        self.assertEqual(body['results'][0], {'name': "Widget 119"})
+        self.assertEqual(len(body['results']), api.API_PAGE_SIZE)
+        body = self.client.get(reverse('api_item_list'), {'fields': 'name', 'sort': '-quantity', 'after': body['next']}).json()
+        self.assertEqual(body['results'][-1], {'name': "Apple"})
+
+        response = self.client.get(reverse('api_item_detail', args=[self.pear.pk]), {'fields': 'quantity,id'})
+        self.assertEqual(response.json(), {'quantity': 40, 'id': self.pear.pk})
+        response = self.client.get(reverse('api_item_list'), {'fields': 'name,description'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("description", response.json()['error'])
+
+    def test_batch_fetch_by_ids(self):
+        """Test that many items are fetched by id in one query, reporting the ids that do not exist."""
+        with self.assertNumQueries(3):  # Session, user, items
+            response = self.client.get(reverse('api_item_list'), {'ids': f'{self.pear.pk},{self.apple.pk},999999', 'fields': 'name'})
+        self.assertEqual(response.json(), {'results': [{'name': "Apple"}, {'name': "Pear"}], 'missing': [999999]})
+
+        response = self.client.get(reverse('api_item_list'), {'ids': '1,two'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('api_item_list'), {'ids': ','.join(map(str, range(1, api.API_BATCH_SIZE + 2)))})
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self):
+        """Test that unchanged item reads return 304 until the inventory changes."""
+        url = reverse('api_item_detail', args=[self.apple.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        list_etag = self.client.get(reverse('api_item_list'))['ETag']
+        self.assertNotEqual(list_etag, etag)
+
+        Order.objects.create(item=self.pear, quantity=1)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_list_sparse_fields(self):
+        """Test that the order log also takes ?fields=."""
+        order = Order.objects.create(item=self.pear, quantity=2)
+        self.client.force_login(get_user_model().objects.create_user(username='admin', password='password', is_staff=True))
+        response = self.client.get(reverse('api_order_list'), {'fields': 'item_name,quantity'})
+        self.assertEqual(response.json()['results'], [{'item_name': "Pear", 'quantity': 2}])
+        response = self.client.get(reverse('api_order_list'), {'fields': 'id'})
+        self.assertEqual(response.json()['results'], [{'id': order.pk}])
+
+    def post_order(self, payload):
+        return self.client.post(reverse('api_order_create'), json.dumps(payload), content_type='application/json')
+
+    def test_order_create(self):
+        """Test that an order placed through the API reserves stock like the order form."""
+        response = self.post_order({'item': self.pear.pk, 'quantity': 5})
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.json()['id'])
+        self.assertEqual((order.item, order.quantity), (self.pear, 5))
+        self.pear.refresh_from_db()
+        self.assertEqual(self.pear.quantity, 35)
+
+    def test_order_create_errors(self):
+        """Test that shortfalls are a 409 and malformed orders a 400, leaving stock untouched."""
+        self.assertEqual(self.post_order({'item': self.apple.pk, 'quantity': 4}).status_code, 409)
+        self.assertEqual(self.post_order({'item': 999999, 'quantity': 1}).status_code, 400)
+        self.assertEqual(self.post_order({'item': self.apple.pk, 'quantity': 0}).status_code, 400)
+        self.assertEqual(self.post_order({'quantity': 1}).status_code, 400)
+        self.apple.refresh_from_db()
+        self.assertEqual(self.apple.quantity, 3)
+        self.assertFalse(Order.objects.exists())
+
+    def test_order_create_checks_database_stock(self):
+        """Test that a stale cached snapshot cannot oversell; the reservation is the final check."""
+        get_item_snapshot(self.apple.pk)
+        Item.objects.filter(pk=self.apple.pk).update(quantity=0)  # Skips invalidation, leaving 3 in the cache
+        WarehouseStock.objects.filter(item=self.apple).update(quantity=0)
+        response = self.post_order({'item': self.apple.pk, 'quantity': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error'], "Not enough stock to fulfill the order.")
+        self.assertFalse(Order.objects.exists())
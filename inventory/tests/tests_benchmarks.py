@@ -0,0 +1,554 @@
+"""
+Benchmarks, skipped unless INVENTORY_BENCHMARKS=1 is set:
+
+    INVENTORY_BENCHMARKS=1 python manage.py test inventory.tests.tests_benchmarks
+
+INVENTORY_BENCHMARK_ITEMS and INVENTORY_BENCHMARK_ORDERS set the size of the synthetic catalog and
+order history (default 10000 and 200000; anything from 10^3 to 10^6 works).
+
+RouteBenchmark, BulkPathBenchmark and SearchBenchmark compare their results with benchmark_baseline.json. They fail
+when a view runs more queries than before, or when a timing or rate is worse than the baseline by
+more than INVENTORY_BENCHMARK_TOLERANCE (default 0.25, i.e. 25% slower). p99 latencies hang on a handful
+of samples and swing far more from run to run, so they get INVENTORY_BENCHMARK_TAIL_TOLERANCE (default 0.5).
+Timings may always grow by NOISE_FLOOR_MS (1 ms), as sub-millisecond timings move by more than 25% between runs.
+
+After an intended change, re-record the baseline with INVENTORY_BENCHMARK_UPDATE_BASELINE=1 and say why in
+INVENTORY_BENCHMARK_BASELINE_REASON; the reason is stored next to the results, so a moved baseline explains
+itself in review. Each run recorded with the same reason is kept and the baseline is their per-metric median,
+so record at least three runs, and only of the benchmark the change affects.
+"""
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from itertools import cycle
+from pathlib import Path
+import time
+import unittest
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.db.models import F, Q, Sum
+from django.test import AsyncClient, Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from inventory import cache as item_cache
+from inventory import middleware
+from inventory.analytics import roll_up_sales, top_movers
+from inventory.api import API_PAGE_SIZE
+from inventory.exports import order_export_rows, stream_csv
+from inventory.forms import OrderForm
+from inventory.models import Item, Order, QueuedOrder
+from inventory.search import search_item_ids, search_terms
+from inventory.services import create_bulk_order
+from inventory.views import ITEMS_PER_PAGE
+
+RUN_BENCHMARKS = os.environ.get('INVENTORY_BENCHMARKS') == '1'
+BENCHMARK_ITEMS = int(os.environ.get('INVENTORY_BENCHMARK_ITEMS', 10000))
+BENCHMARK_ORDERS = int(os.environ.get('INVENTORY_BENCHMARK_ORDERS', 200000))
+BENCHMARK_THREADS = int(os.environ.get('INVENTORY_BENCHMARK_THREADS', 4))
+UNCACHED = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+UPDATE_BASELINE = os.environ.get('INVENTORY_BENCHMARK_UPDATE_BASELINE') == '1'
+BASELINE_REASON = os.environ.get('INVENTORY_BENCHMARK_BASELINE_REASON', '').strip()
+TOLERANCE = float(os.environ.get('INVENTORY_BENCHMARK_TOLERANCE', 0.25))
+TAIL_TOLERANCE = float(os.environ.get('INVENTORY_BENCHMARK_TAIL_TOLERANCE', 0.5))
+NOISE_FLOOR_MS = 1.0
+
+
+def seed_items(count, quantity=None):
+    """
+    Bulk-create count items named "Item 000000" onwards and return their ids.
+
+    Quantities cycle through 0-499 unless a fixed quantity is given.
+    """
+    for offset in range(0, count, 10000):
+        Item.objects.bulk_create([
+            Item(name=f"Item {i:06d}", quantity=i % 500 if quantity is None else quantity, description="Benchmark item")
+            for i in range(offset, min(offset + 10000, count))
+        ])
+    return list(Item.objects.order_by('pk').values_list('pk', flat=True))
+
+
+def seed_orders(count, item_ids, days=90, seed=42):
+    """
+    Insert count orders for random items, spread over the past days.
+
+    Raw inserts, so created_at can be set in the past instead of stamped with now(). Stock and
+    the ledger are left alone, as if the orders had been placed against earlier restocks.
+    """
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    with connection.cursor() as cursor:
+        for offset in range(0, count, 50000):
+            cursor.executemany(
+                'INSERT INTO inventory_order (item_id, quantity, created_at) VALUES (%s, %s, %s)',
+                [(rng.choice(item_ids), rng.randint(1, 5), start + timedelta(seconds=rng.randrange(days * 86400)))
+                 for _ in range(min(50000, count - offset))],
+            )
+
+
+def timed(func, repeat):
+    """Run func repeat times, returning the per-call latencies in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(latencies, fraction):
+    return sorted(latencies)[max(int(len(latencies) * fraction) - 1, 0)]
+
+
+def report(label, latencies):
+    print(f"{label:<40} median {statistics.median(latencies):7.2f} ms   "
+          f"p99 {percentile(latencies, 0.99):7.2f} ms")
+
+
+def check_baseline(testcase, name, results):
+    """
+    Compare results with the stored baseline for name and fail on any regression.
+
+    Metrics ending in _ms may grow and those ending in _per_s may shrink by TOLERANCE, p99 latencies
+    by TAIL_TOLERANCE, and any timing by at least NOISE_FLOOR_MS; those ending in _queries may not
+    grow at all. Baselines recorded at another data size are not compared. With
+    INVENTORY_BENCHMARK_UPDATE_BASELINE=1 the results are recorded as a run of the baseline instead,
+    which needs INVENTORY_BENCHMARK_BASELINE_REASON.
+    """
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    size = {'items': BENCHMARK_ITEMS, 'orders': BENCHMARK_ORDERS}
+    if UPDATE_BASELINE:
+        if not BASELINE_REASON:
+            testcase.fail("Say why the baseline moves in INVENTORY_BENCHMARK_BASELINE_REASON before re-recording it.")
+        previous = baselines.get(name, {})
+        runs = previous.get('runs', []) if previous.get('reason') == BASELINE_REASON and previous['size'] == size else []
+        runs.append(results)
+        baselines[name] = {
+            'size': size,
+            'reason': BASELINE_REASON,
+            'runs': runs,
+            'results': {metric: round(statistics.median(run[metric] for run in runs), 2) for metric in results},
+        }
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+        print(f"Recorded run {len(runs)} of the {name} baseline in {BASELINE_PATH.name}")
+        return
+    baseline = baselines.get(name)
+    if baseline is None or baseline['size'] != size:
+        print(f"No {name} baseline for {size}; record one with INVENTORY_BENCHMARK_UPDATE_BASELINE=1")
+        return
+
+    regressions = []
+    for metric, expected in baseline['results'].items():
+        actual = results.get(metric)
+        if actual is None:
+            continue
+        if metric.endswith('_queries'):
+            regressed = actual > expected
+        elif metric.endswith('_p99_ms'):
+            regressed = actual > max(expected * (1 + TAIL_TOLERANCE), expected + NOISE_FLOOR_MS)
+        elif metric.endswith('_ms'):
+            regressed = actual > max(expected * (1 + TOLERANCE), expected + NOISE_FLOOR_MS)
+        else:
+            regressed = actual < expected / (1 + TOLERANCE)
+        if regressed:
+            regressions.append(f"{metric}: {actual:g} against a baseline of {expected:g}")
+    if regressions:
+        testcase.fail(f"{name} regressed beyond the baseline:\n  " + "\n  ".join(regressions))
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class StockCacheBenchmark(TestCase):
+    repeat = 200
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.create_user(username='bench', password='password')
+        seed_items(5000)
+        # Orders keep coming back to the same popular items
+        cls.popular_ids = list(Item.objects.values_list('pk', flat=True)[:50])
+
+    def setUp(self):
+        self.client.login(username='bench', password='password')
+
+    def run_paths(self, label):
+        item_cache.stats.update(hits=0, misses=0)
+        list_latencies = timed(lambda: self.client.get(reverse('inventory_list')), self.repeat)
+        ids = cycle(self.popular_ids)
+        form_latencies = timed(lambda: OrderForm(data={'item': next(ids), 'quantity': 1}).is_valid(), self.repeat)
+        total = item_cache.stats['hits'] + item_cache.stats['misses']
+        print(f"\n{label}: snapshot hit rate {item_cache.stats['hits'] / total:.1%} over {total} lookups")
+        report(f"{label} inventory_list", list_latencies)
+        report(f"{label} OrderForm validation", form_latencies)
+
+    def test_cached_vs_uncached(self):
+        cache.clear()
+        self.run_paths("cached")
+        with override_settings(CACHES=UNCACHED):
+            self.run_paths("uncached")
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class AsyncReadBenchmark(TestCase):
+    """
+    Requests/sec for the JSON read endpoints through Django's ASGI handler (AsyncClient, many
+    requests in flight) against its WSGI handler (Client, one request at a time).
+
+    For numbers under real servers, run e.g. ``uvicorn DjangoProject.asgi:application`` and
+    ``gunicorn DjangoProject.wsgi`` side by side and point a load generator at /inventory/api/items/.
+    """
+    requests = 300
+    concurrency = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='bench', password='password', is_staff=True)
+        seed_items(5000)
+        cls.urls = [reverse('api_item_list'), reverse('api_low_stock'), reverse('api_order_list')]
+
+    def test_asgi_vs_wsgi(self):
+        client = Client()
+        client.force_login(self.user)
+        started = time.perf_counter()
+        for i in range(self.requests):
+            client.get(self.urls[i % len(self.urls)])
+        wsgi_rate = self.requests / (time.perf_counter() - started)
+
+        async_client = AsyncClient()
+        async_client.force_login(self.user)
+
+        async def drive():
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(url):
+                async with semaphore:
+                    await async_client.get(url)
+
+            await asyncio.gather(*(fetch(self.urls[i % len(self.urls)]) for i in range(self.requests)))
+            # The ORM ran in asgiref's worker thread; close its connection so later benchmarks own the database
+            await sync_to_async(connections.close_all)()
+
+        started = time.perf_counter()
+        asyncio.run(drive())
+        asgi_rate = self.requests / (time.perf_counter() - started)
+
+        print(f"\nWSGI {wsgi_rate:8.1f} req/s   ASGI ({self.concurrency} in flight) {asgi_rate:8.1f} req/s")
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class SerializationBenchmark(TestCase):
+    """Cost per item of a JSON API page against rendering the same items in the HTML table, both uncached."""
+    repeat = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='bench', password='password')
+        seed_items(5000)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    @override_settings(CACHES=UNCACHED)
+    def test_json_vs_html(self):
+        print()
+        pages = [
+            ("HTML table", reverse('inventory_list'), {}, ITEMS_PER_PAGE),
+            ("JSON, all fields", reverse('api_item_list'), {}, API_PAGE_SIZE),
+            ("JSON, ?fields=id,quantity", reverse('api_item_list'), {'fields': 'id,quantity'}, API_PAGE_SIZE),
+        ]
+        for label, url, params, rows in pages:
+            latencies = timed(lambda: self.client.get(url, params), self.repeat)
+            print(f"{label:<28} {statistics.median(latencies) * 1000 / rows:7.1f} us per item "
+                  f"({rows} items, median {statistics.median(latencies):.2f} ms)")
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class SalesAnalyticsBenchmark(TestCase):
+    """Top movers over 30 days from raw orders against the daily rollups, on a synthetic order history."""
+    items = 2000
+    days = 90
+
+    @classmethod
+    def setUpTestData(cls):
+        item_ids = seed_items(cls.items, quantity=10000)
+        cls.today = datetime.now(timezone.utc).date()
+        seed_orders(BENCHMARK_ORDERS, item_ids, cls.days)
+
+    def test_rollups_vs_raw_orders(self):
+        window_start = datetime.now(timezone.utc) - timedelta(days=30)
+
+        def raw():
+            return list(
+                Order.objects.filter(created_at__gte=window_start).values('item_id')
+                .annotate(units=Sum('quantity')).order_by('-units')[:10]
+            )
+
+        raw_latencies = timed(raw, 5)
+        started = time.perf_counter()
+        roll_up_sales(self.today)
+        initial_rollup = (time.perf_counter() - started) * 1000
+        incremental_latencies = timed(lambda: roll_up_sales(self.today), 5)
+
+        def cold():
+            cache.clear()
+            top_movers(30, 10)
+
+        cold_latencies = timed(cold, 5)
+        warm_latencies = timed(lambda: top_movers(30, 10), 50)
+
+        print(f"\n{BENCHMARK_ORDERS} orders over {self.days} days, {self.items} items")
+        print(f"{'initial rollup of every past day':<40} {initial_rollup:9.2f} ms")
+        report("rollup with nothing new", incremental_latencies)
+        report("top 10 from raw orders", raw_latencies)
+        report("top 10 from rollups (uncached)", cold_latencies)
+        report("top 10 from rollups (cached)", warm_latencies)
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class SQLiteConcurrencyBenchmark(TransactionTestCase):
+    """
+    Order throughput and "database is locked" errors with threads ordering, restocking and
+    listing at once, under SQLite's stock settings against the tuned profile in settings.py.
+    """
+    items = 500
+    writers = 8
+    restockers = 2
+    readers = 4
+    operations = 100
+
+    def run_workload(self, label, journal_mode, options):
+        settings_dict = connection.settings_dict
+        saved_options = settings_dict['OPTIONS']
+        # Threads open their own connections from these settings
+        settings_dict['OPTIONS'] = options
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        item_ids = seed_items(self.items, quantity=100000)
+        counts = {'orders': 0, 'restocks': 0, 'reads': 0, 'locked': 0}
+        lock = threading.Lock()
+
+        def count(key):
+            with lock:
+                counts[key] += 1
+
+        def order():
+            Order.objects.create(item=Item.objects.get(pk=random.choice(item_ids)), quantity=1)
+            return 'orders'
+
+        def restock():
+            # One UPDATE relative to the stored stock, as the admin restock action does, so racing restocks never raise StaleEdit
+            Item.objects.filter(pk=random.choice(item_ids)).set_stock(F('quantity') + 10)
+            return 'restocks'
+
+        def read():
+            list(Item.objects.order_by('name').values('name', 'quantity')[:self.items])
+            return 'reads'
+
+        def worker(operation):
+            try:
+                for _ in range(self.operations):
+                    try:
+                        count(operation())
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        count('locked')
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(operation,)) for operation in
+                   [order] * self.writers + [restock] * self.restockers + [read] * self.readers]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        settings_dict['OPTIONS'] = saved_options
+        Item.objects.all().delete()
+
+        print(f"{label:<8} {counts['orders'] / elapsed:8.1f} orders/s  {counts['restocks']:4d} restocks  "
+              f"{counts['reads']:4d} reads  {counts['locked']:4d} locked errors  in {elapsed:.2f}s")
+
+    def test_stock_vs_tuned(self):
+        print(f"\n{self.writers} order, {self.restockers} restock and {self.readers} read threads, "
+              f"{self.operations} operations each")
+        # Stock Django on SQLite: rollback journal, deferred transactions, sqlite3's 5 second timeout
+        self.run_workload("stock", 'delete', {})
+        self.run_workload("tuned", 'wal', connection.settings_dict['OPTIONS'])
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class RouteBenchmark(TransactionTestCase):
+    """
+    Latency, throughput and queries per request for the main pages, driven through the real URL
+    routes by BENCHMARK_THREADS threads, each with its own test client and connection.
+    """
+    requests_per_thread = 50
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='bench', password='password', is_staff=True)
+        self.item_ids = seed_items(BENCHMARK_ITEMS, quantity=10 ** 6)
+        seed_orders(BENCHMARK_ORDERS, self.item_ids)
+        cache.clear()
+        middleware.view_stats.clear()
+
+    def drive(self, view_name, send):
+        """Run send(client, rng) from every thread and return the latencies and requests per second."""
+        latencies = []
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            client = Client()
+            client.force_login(self.user)
+            try:
+                for _ in range(self.requests_per_thread):
+                    started = time.perf_counter()
+                    response = send(client, rng)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    self.assertLess(response.status_code, 400, view_name)
+                    with lock:
+                        latencies.append(elapsed)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(BENCHMARK_THREADS)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, len(latencies) / (time.perf_counter() - started)
+
+    @override_settings(INVENTORY_REQUEST_TIMING=True)
+    def test_routes(self):
+        routes = {
+            'inventory_list': lambda client, rng: client.get(reverse('inventory_list'), {'q': f"Item {rng.randrange(100):02d}"}),
+            'create_order': lambda client, rng: client.post(
+                reverse('create_order'), {'item': rng.choice(self.item_ids), 'quantity': 1}),
+            'update_stock': lambda client, rng: client.post(
+                reverse('update_stock', kwargs={'pk': rng.choice(self.item_ids)}), {'quantity': rng.randrange(1000, 10 ** 6)}),
+            'order_log': lambda client, rng: client.get(reverse('order_log'), {'item': rng.choice(self.item_ids)}),
+        }
+        print(f"\n{BENCHMARK_ITEMS} items, {BENCHMARK_ORDERS} orders, {BENCHMARK_THREADS} threads")
+        results = {}
+        for view_name, send in routes.items():
+            latencies, rate = self.drive(view_name, send)
+            max_queries = middleware.view_stats[view_name]['max_queries']
+            print(f"{view_name:<16} p50 {percentile(latencies, 0.5):7.2f} ms   p99 {percentile(latencies, 0.99):7.2f} ms   "
+                  f"{rate:7.1f} req/s   {max_queries} queries")
+            results.update({
+                f'{view_name}_p50_ms': round(percentile(latencies, 0.5), 2),
+                f'{view_name}_p99_ms': round(percentile(latencies, 0.99), 2),
+                f'{view_name}_per_s': round(rate, 1),
+                f'{view_name}_queries': max_queries,
+            })
+        check_baseline(self, 'routes', results)
+
+    def test_order_queue(self):
+        """Accepted orders per second placed directly against accepted into the queue, and the worker's drain rate."""
+        def send(client, rng):
+            return client.post(reverse('create_order'), {'item': rng.choice(self.item_ids), 'quantity': 1})
+
+        print(f"\n{BENCHMARK_ITEMS} items, {BENCHMARK_ORDERS} orders, {BENCHMARK_THREADS} threads")
+        results = {}
+        for label, queued in [('direct', False), ('queued', True)]:
+            with override_settings(INVENTORY_ORDER_QUEUE=queued):
+                latencies, rate = self.drive('create_order', send)
+            print(f"{label:<8} p50 {percentile(latencies, 0.5):7.2f} ms   p99 {percentile(latencies, 0.99):7.2f} ms   "
+                  f"{rate:7.1f} accepted/s")
+            results.update({f'{label}_p99_ms': round(percentile(latencies, 0.99), 2), f'{label}_per_s': round(rate, 1)})
+
+        pending = QueuedOrder.objects.filter(status=QueuedOrder.QUEUED).count()
+        started = time.perf_counter()
+        call_command('process_orders', stdout=io.StringIO())
+        results['drain_per_s'] = round(pending / (time.perf_counter() - started), 1)
+        print(f"drain    {pending} queued orders at {results['drain_per_s']:.1f} placed/s")
+        self.assertFalse(QueuedOrder.objects.filter(status=QueuedOrder.QUEUED).exists())
+        check_baseline(self, 'order_queue', results)
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class BulkPathBenchmark(TestCase):
+    """Rows per second through the bulk paths: stock import, order export and bulk orders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.item_ids = seed_items(BENCHMARK_ITEMS, quantity=10 ** 6)
+        seed_orders(BENCHMARK_ORDERS, cls.item_ids)
+
+    def test_bulk_paths(self):
+        results = {}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'stock.csv'
+            path.write_text("id,quantity\n" + "".join(f"{pk},{1000 + pk % 1000}\n" for pk in self.item_ids))
+            started = time.perf_counter()
+            call_command('import_stock', str(path), stdout=io.StringIO(), stderr=io.StringIO())
+            results['import_rows_per_s'] = round(len(self.item_ids) / (time.perf_counter() - started))
+
+        started = time.perf_counter()
+        exported = sum(chunk.count('\n') for chunk in stream_csv(order_export_rows(Order.objects.all()))) - 1
+        results['export_rows_per_s'] = round(exported / (time.perf_counter() - started))
+
+        rng = random.Random(42)
+        batches = 20
+        started = time.perf_counter()
+        for _ in range(batches):
+            create_bulk_order([(rng.choice(self.item_ids), 1) for _ in range(100)])
+        results['bulk_order_lines_per_s'] = round(batches * 100 / (time.perf_counter() - started))
+
+        print(f"\n{BENCHMARK_ITEMS} items, {BENCHMARK_ORDERS} orders")
+        for metric, value in results.items():
+            print(f"{metric:<40} {value:>10}")
+        check_baseline(self, 'bulk_paths', results)
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set INVENTORY_BENCHMARKS=1 to run benchmarks.")
+class SearchBenchmark(TestCase):
+    """Typeahead searches through the full-text index against the icontains scans they replace."""
+    repeat = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        # A catalog vocabulary of a few thousand made-up words, so most words are as selective as real part names
+        rng = random.Random(42)
+        syllables = [consonant + vowel for consonant in 'bcdfghklmnprstvz' for vowel in 'aeiou']
+        words = sorted({''.join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(5000)})
+        for offset in range(0, BENCHMARK_ITEMS, 10000):
+            Item.objects.bulk_create([
+                Item(name=f"{' '.join(rng.sample(words, 3)).title()} {i}", quantity=i % 500,
+                     description=' '.join(rng.sample(words, 8)))
+                for i in range(offset, min(offset + 10000, BENCHMARK_ITEMS))
+            ])
+        # Typeahead as it is typed: a short prefix, a word and a prefix, and whole words
+        cls.queries = [words[5][:3], f"{words[7]} {words[9][:2]}", words[11][:4], f"{words[13]} {words[15]}"]
+
+    def contains_scan(self, query, limit):
+        items = Item.objects.all()
+        for term in search_terms(query):
+            items = items.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return list(items.order_by('name', 'pk').values_list('pk', flat=True)[:limit])
+
+    def test_search(self):
+        print(f"\n{BENCHMARK_ITEMS} items, {connection.vendor}")
+        results = {}
+        for label, search in [('fts', search_item_ids), ('icontains', self.contains_scan)]:
+            latencies = []
+            for query in self.queries:
+                latencies += timed(lambda: search(query, 20), self.repeat)
+            report(f"{label} search, 20 results", latencies)
+            results[f'search_{label}_p50_ms'] = round(statistics.median(latencies), 2)
+            results[f'search_{label}_p99_ms'] = round(percentile(latencies, 0.99), 2)
+        check_baseline(self, 'search', results)
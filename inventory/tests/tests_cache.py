@@ -0,0 +1,163 @@
+import tempfile
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage import default_storage
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from inventory.cache import cache_timeout, get_item_snapshot, get_item_snapshots, snapshot_key
+from inventory.forms import OrderForm, UpdateStockForm
+from inventory.models import Item, Order
+from inventory.services import create_bulk_order
+from inventory.views import inventory_list_etag, inventory_list_last_modified
+
+
+class ItemSnapshotCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def test_snapshot_is_cached_after_first_read(self):
+        """Test that a second read is served without a query."""
+        with self.assertNumQueries(1):
+            snapshot = get_item_snapshot(self.item.pk)
+        self.assertEqual(snapshot['name'], "Apple")
+        self.assertEqual(snapshot['quantity'], 20)
+        self.assertFalse(snapshot['is_low_stock'])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_item_snapshot(self.item.pk), snapshot)
+
+    def test_many_snapshots_load_misses_in_one_query(self):
+        """Test that misses for many items are loaded together and unknown ids are skipped."""
+        other = Item.objects.create(name="Pear", quantity=3, description="Fruit")
+        get_item_snapshot(self.item.pk)
+        with self.assertNumQueries(1):
+            snapshots = get_item_snapshots([self.item.pk, other.pk, 999999])
+        self.assertEqual(set(snapshots), {self.item.pk, other.pk})
+        self.assertTrue(snapshots[other.pk]['is_low_stock'])
+
+    def test_order_invalidates_snapshot(self):
+        """Test that placing an order drops the cached quantity."""
+        get_item_snapshot(self.item.pk)
+        Order.objects.create(item=self.item, quantity=5)
+        self.assertIsNone(cache.get(snapshot_key(self.item.pk)))
+        self.assertEqual(get_item_snapshot(self.item.pk)['quantity'], 15)
+
+    def test_bulk_order_invalidates_snapshots(self):
+        """Test that a bulk order drops the cached quantities of every item it touches."""
+        get_item_snapshot(self.item.pk)
+        create_bulk_order([(self.item.pk, 4)])
+        self.assertEqual(get_item_snapshot(self.item.pk)['quantity'], 16)
+
+    def test_stock_update_invalidates_snapshot(self):
+        """Test that saving the stock form drops the cached quantity."""
+        get_item_snapshot(self.item.pk)
+        form = UpdateStockForm(data={'quantity': 3}, instance=self.item)
+        self.assertTrue(form.is_valid())
+        form.save()
+        snapshot = get_item_snapshot(self.item.pk)
+        self.assertEqual(snapshot['quantity'], 3)
+        self.assertTrue(snapshot['is_low_stock'])
+
+    def test_admin_edit_invalidates_snapshot(self):
+        """Test that editing an item in the admin drops the cached snapshot."""
+        get_user_model().objects.create_superuser(username='admin', password='password', email='admin@example.com')
+        self.client.login(username='admin', password='password')
+        get_item_snapshot(self.item.pk)
+        response = self.client.post(reverse('admin:inventory_item_change', args=[self.item.pk]), {
+            'name': "Green Apple", 'quantity': 7, 'description': "Fruit", 'reorder_threshold': 15,
+            'version': self.item.version, 'stock_levels-TOTAL_FORMS': 0, 'stock_levels-INITIAL_FORMS': 0,
+        })
+        self.assertEqual(response.status_code, 302)
+        snapshot = get_item_snapshot(self.item.pk)
+        self.assertEqual((snapshot['name'], snapshot['quantity']), ("Green Apple", 7))
+
+    def test_order_form_uses_snapshot(self):
+        """Test that validating an order against a cached item needs no query."""
+        get_item_snapshot(self.item.pk)
+        with self.assertNumQueries(0):
+            form = OrderForm(data={'item': self.item.pk, 'quantity': 5})
+            self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['item'], self.item)
+        self.assertFalse(OrderForm(data={'item': self.item.pk, 'quantity': 25}).is_valid())
+        self.assertFalse(OrderForm(data={'item': 999999, 'quantity': 1}).is_valid())
+
+
+class InventoryListCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.login(username='admin', password='password')
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+        self.low = Item.objects.create(name="Pear", quantity=3, description="Fruit")
+
+    def test_fragments_are_reused_until_the_version_changes(self):
+        """Test that a repeat render reads no items, and an order re-renders the table and banner."""
+        self.client.get(reverse('inventory_list'))
+        with self.assertNumQueries(2):  # Session and user only
+            response = self.client.get(reverse('inventory_list'))
+        self.assertContains(response, "Pear (3 left)")
+
+        Order.objects.create(item=self.low, quantity=1)
+        response = self.client.get(reverse('inventory_list'))
+        self.assertContains(response, "Pear (2 left)")
+        self.assertContains(response, "<td>2</td>", html=True)
+
+    def test_stock_update_and_new_items_change_the_page(self):
+        """Test that update_stock and add_item bump the version the page is cached under."""
+        self.client.get(reverse('inventory_list'))
+        self.client.post(reverse('update_stock', kwargs={'pk': self.item.pk}), {'quantity': 77})
+        self.client.post(reverse('add_item'), {'name': "Plum", 'quantity': 9, 'description': "Fruit"})
+        response = self.client.get(reverse('inventory_list'))
+        self.assertContains(response, "<td>77</td>", html=True)
+        self.assertContains(response, "Plum (9 left)")
+
+    def test_unchanged_page_is_not_modified(self):
+        """Test that revalidating an unchanged page returns 304 without rendering, until stock changes."""
+        response = self.client.get(reverse('inventory_list'))
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(reverse('inventory_list'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'inventory/inventory_list.html')
+
+        response = self.client.get(reverse('inventory_list'), {'q': 'pe'}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        Order.objects.create(item=self.item, quantity=1)
+        response = self.client.get(reverse('inventory_list'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_new_login_gets_a_new_etag(self):
+        """Test that a page cached before logging in again is re-rendered, so its CSRF token is current."""
+        etag = self.client.get(reverse('inventory_list'))['ETag']
+        self.client.post(reverse('logout'))
+        self.client.login(username='admin', password='password')
+        response = self.client.get(reverse('inventory_list'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_page_with_messages_is_never_not_modified(self):
+        """Test that no ETag or Last-Modified is given while the request has flash messages to show."""
+        request = RequestFactory().get(reverse('inventory_list'))
+        request.user, request.session = self.user, self.client.session
+        request._messages = default_storage(request)
+        self.assertIsNotNone(inventory_list_etag(request))
+        messages.success(request, "Saved")
+        self.assertIsNone(inventory_list_etag(request))
+        self.assertIsNone(inventory_list_last_modified(request))
+
+class CacheTimeoutTests(TestCase):
+    def test_per_process_cache_keeps_entries_briefly(self):
+        """Test that a per-process cache caps how long other workers can miss a change, and a shared one does not."""
+        with self.settings(INVENTORY_LOCAL_CACHE_TIMEOUT=5):
+            self.assertEqual((cache_timeout(None), cache_timeout(300), cache_timeout(2)), (5, 5, 2))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmpdir}}
+            with self.settings(CACHES=shared):
+                self.assertEqual((cache_timeout(None), cache_timeout(300)), (None, 300))
@@ -0,0 +1,99 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from inventory.models import Item
+
+
+class ImportStockCommandTests(TestCase):
+    def setUp(self):
+        self.apple = Item.objects.create(name="Apple", quantity=10, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=10, description="Fruit")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, text):
+        path = Path(self.tmpdir.name) / name
+        path.write_text(text)
+        return str(path)
+
+    def run_import(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_stock', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv_updates_and_creates_items(self):
+        """Test that existing items get their quantity set and new ids are created."""
+        path = self.write('stock.csv', (
+            "id,quantity,name,description\n"
+            f"{self.apple.pk},42,,\n"
+            f"{self.pear.pk},0,Renamed Pear,\n"
+            "5000,7,Plum,Stone fruit\n"
+        ))
+        out, err = self.run_import(path)
+        self.apple.refresh_from_db()
+        self.pear.refresh_from_db()
+        self.assertEqual(self.apple.quantity, 42)
+        self.assertEqual((self.pear.name, self.pear.quantity), ("Pear", 0))
+        plum = Item.objects.get(pk=5000)
+        self.assertEqual((plum.name, plum.quantity, plum.description), ("Plum", 7, "Stone fruit"))
+        self.assertIn("Imported 3 rows (1 new items), rejected 0", out)
+        self.assertEqual(err, "")
+
+    def test_import_rejects_invalid_rows(self):
+        """Test that negative, malformed and unknown rows are reported and skipped."""
+        path = self.write('stock.csv', (
+            "id,quantity\n"
+            f"{self.apple.pk},-1\n"
+            f"{self.pear.pk},lots\n"
+            "6000,3\n"
+            f"{self.pear.pk},8\n"
+        ))
+        out, err = self.run_import(path)
+        self.assertIn("Line 2: Quantity cannot be negative.", err)
+        self.assertIn("Line 3: id and quantity must be whole numbers.", err)
+        self.assertIn("Line 4: item 6000 does not exist and no name was given.", err)
+        self.assertIn("Imported 1 rows (0 new items), rejected 3", out)
+        self.apple.refresh_from_db()
+        self.pear.refresh_from_db()
+        self.assertEqual(self.apple.quantity, 10)
+        self.assertEqual(self.pear.quantity, 8)
+        self.assertFalse(Item.objects.filter(pk=6000).exists())
+
+    def test_import_jsonl_in_batches(self):
+        """Test that JSON lines are imported in batches with a report per batch."""
+        lines = [json.dumps({'id': 100 + i, 'quantity': i, 'name': f"Bulk {i}"}) for i in range(25)]
+        lines.insert(3, "{broken")
+        path = self.write('stock.jsonl', "\n".join(lines) + "\n")
+        out, err = self.run_import(path, '--batch-size', '10')
+        self.assertEqual(Item.objects.filter(name__startswith="Bulk").count(), 25)
+        self.assertEqual(out.count("Batch "), 3)
+        self.assertIn("Line 4: Not valid JSON.", err)
+        self.assertIn("rows/s", out)
+
+    def test_import_query_count_per_batch(self):
+        """Test that a batch costs a fixed number of queries, not one per row."""
+        path = self.write('stock.csv', "id,quantity,name\n" + "".join(f"{200 + i},{i},Item {i}\n" for i in range(150)))
+        # The default warehouse, then SAVEPOINT, SELECT items and locations FOR UPDATE, INSERT ... ON CONFLICT
+        # for each, INSERT movements, RELEASE SAVEPOINT. SQLite splits inserts at its bound-parameter limit,
+        # which 150 nine-column item rows cross, so the items take two INSERTs
+        with self.assertNumQueries(9):
+            self.run_import(path, '--batch-size', '1000')
+
+    def test_import_missing_file(self):
+        """Test that a missing file is a command error."""
+        with self.assertRaises(CommandError):
+            self.run_import(str(Path(self.tmpdir.name) / 'missing.csv'))
+
+    def test_import_records_ledger_movements(self):
+        """Test that the import records the change it makes to each item."""
+        path = self.write('stock.csv', f"id,quantity,name\n{self.apple.pk},4,\n{self.pear.pk},10,\n7000,6,Plum\n")
+        self.run_import(path)
+        self.assertEqual(self.apple.movements.latest('pk').change, -6)
+        self.assertEqual(self.pear.movements.count(), 1)  # Unchanged, so only its opening movement
+        self.assertEqual(Item.objects.get(pk=7000).movements.get().change, 6)
@@ -0,0 +1,22 @@
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "SQLite tuning only applies to SQLite.")
+class SQLiteTuningTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connections_use_wal_and_normal_sync(self):
+        """Test that new connections run in WAL mode with synchronous=NORMAL and a busy timeout."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertGreaterEqual(self.pragma('busy_timeout'), 1000)
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        """Test that atomic blocks begin with BEGIN IMMEDIATE."""
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
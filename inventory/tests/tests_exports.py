@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import Item, Order
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.login(username='admin', password='password')
+        self.apple = Item.objects.create(name="Apple", quantity=100, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=100, description="Fruit")
+        self.old_order = Order.objects.create(item=self.apple, quantity=1)
+        Order.objects.filter(pk=self.old_order.pk).update(created_at=datetime(2024, 1, 10, 12, tzinfo=timezone.utc))
+        self.new_order = Order.objects.create(item=self.pear, quantity=2)
+        Order.objects.filter(pk=self.new_order.pk).update(created_at=datetime(2024, 2, 1, 23, 59, tzinfo=timezone.utc))
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_orders'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        """Test that the CSV export has a header and one line per order."""
+        rows = list(csv.reader(io.StringIO(self.export(format='csv'))))
+        self.assertEqual(rows[0], ['id', 'created_at', 'item_id', 'item_name', 'quantity'])
+        self.assertEqual(rows[1], [str(self.old_order.pk), '2024-01-10T12:00:00+00:00', str(self.apple.pk), 'Apple', '1'])
+        self.assertEqual(len(rows), 3)
+
+    def test_jsonl_export(self):
+        """Test that the JSON lines export has one object per order."""
+        records = [json.loads(line) for line in self.export(format='jsonl').splitlines()]
+        self.assertEqual([record['item_name'] for record in records], ['Apple', 'Pear'])
+        self.assertEqual(records[1]['quantity'], 2)
+
+    def test_export_filters(self):
+        """Test that the item and inclusive date range filters are applied."""
+        records = [json.loads(line) for line in self.export(format='jsonl', item=self.pear.pk).splitlines()]
+        self.assertEqual([record['id'] for record in records], [self.new_order.pk])
+        records = [json.loads(line) for line in self.export(format='jsonl', end='2024-02-01').splitlines()]
+        self.assertEqual(len(records), 2)
+        records = [json.loads(line) for line in self.export(format='jsonl', start='2024-01-11').splitlines()]
+        self.assertEqual([record['id'] for record in records], [self.new_order.pk])
+
+    def test_export_rejects_bad_parameters(self):
+        """Test that unknown formats and invalid dates are rejected."""
+        self.assertEqual(self.client.get(reverse('export_orders'), {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export_orders'), {'start': 'yesterday'}).status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse('export_orders'), {'start': '2024-02-02', 'end': '2024-02-01'}).status_code, 400
+        )
+
+    def test_export_regular_user(self):
+        """Test that a regular user cannot export the order log."""
+        get_user_model().objects.create_user(username='regularuser', password='password')
+        self.client.login(username='regularuser', password='password')
+        response = self.client.get(reverse('export_orders'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('login'), response.url)
+
+    def measure_export(self):
+        """Stream a CSV export, returning (bytes produced, peak traced memory)."""
+        response = self.client.get(reverse('export_orders'), {'format': 'csv'})
+        tracemalloc.start()
+        try:
+            total_bytes = sum(len(chunk) for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return total_bytes, peak
+
+    def test_export_memory_stays_flat(self):
+        """Test that exporting four times as many orders does not need more memory."""
+        Order.objects.bulk_create([Order(item=self.apple, quantity=i % 9 + 1) for i in range(15000)], batch_size=5000)
+        small_bytes, small_peak = self.measure_export()
+        Order.objects.bulk_create([Order(item=self.apple, quantity=i % 9 + 1) for i in range(45000)], batch_size=5000)
+        large_bytes, large_peak = self.measure_export()
+
+        self.assertGreater(large_bytes, small_bytes * 3.5)
+        self.assertLess(large_peak, small_peak * 1.5)
+        # Far less than the export itself is ever held at once
+        self.assertLess(large_peak, large_bytes / 2)
@@ -30,6 +30,19 @@ class OrderFormTests(TestCase):
         form = OrderForm(data=form_data)
         self.assertFalse(form.is_valid())
 
+    def test_order_form_rejects_non_positive_quantity(self):
+        """Test that the OrderForm rejects zero and negative quantities."""
+        for quantity in (0, -5):
+            form = OrderForm(data={'item': self.item.id, 'quantity': quantity})
+            self.assertFalse(form.is_valid())
+            self.assertIn('quantity', form.errors)
+
+    def test_order_form_does_not_render_the_catalog(self):
+        """Test that the item field renders as a text input, not a <select> of every item."""
+        html = str(OrderForm()['item'])
+        self.assertNotIn('<select', html)
+        self.assertNotIn('Test Item', html)
+
 class UpdateStockFormTests(TestCase):
     def test_update_stock_form_valid(self):
         """Test that the UpdateStockForm is valid."""
@@ -0,0 +1,135 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import (
+    HoldNotActive, InsufficientStock, Item, Order, StockHold, Warehouse, WarehouseStock,
+)
+from inventory.services import create_bulk_order
+
+
+class StockHoldTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=10, description="Fruit")
+        self.warehouse = Warehouse.objects.get()
+
+    def available(self):
+        return WarehouseStock.objects.available(self.item.pk, 1).count()
+
+    def test_hold_reduces_available_but_not_on_hand_stock(self):
+        """Test that held stock stays on hand but cannot be ordered or held again."""
+        hold = StockHold.objects.place(self.item.pk, 8)
+        self.assertEqual(hold.warehouse, self.warehouse)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 10)
+
+        with self.assertRaises(InsufficientStock):
+            Order.objects.create(item=self.item, quantity=3)
+        with self.assertRaises(InsufficientStock):
+            StockHold.objects.place(self.item.pk, 3)
+        with self.assertRaises(InsufficientStock):
+            create_bulk_order([(self.item.pk, 3)])
+        Order.objects.create(item=self.item, quantity=2)
+        self.assertEqual(self.available(), 0)
+
+    def test_expired_hold_no_longer_counts(self):
+        """Test that a hold stops holding stock once it expires, before the sweeper has run."""
+        hold = StockHold.objects.place(self.item.pk, 8, ttl=60)
+        StockHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        Order.objects.create(item=self.item, quantity=10)
+        with self.assertRaises(HoldNotActive):
+            hold.confirm()
+
+    def test_confirm_turns_the_hold_into_an_order(self):
+        """Test that confirming a hold orders its stock from its warehouse, once."""
+        hold = StockHold.objects.place(self.item.pk, 8)
+        order = hold.confirm()
+        self.assertEqual((order.item, order.warehouse, order.quantity), (self.item, self.warehouse, 8))
+        hold.refresh_from_db()
+        self.assertEqual((hold.status, hold.order), (StockHold.CONFIRMED, order))
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 2)
+        with self.assertRaises(HoldNotActive):
+            hold.confirm()
+
+    def test_cancel_releases_the_stock(self):
+        """Test that a cancelled hold gives its stock back and cannot be confirmed."""
+        hold = StockHold.objects.place(self.item.pk, 8)
+        self.assertTrue(hold.cancel())
+        self.assertFalse(hold.cancel())
+        Order.objects.create(item=self.item, quantity=10)
+        with self.assertRaises(HoldNotActive):
+            hold.confirm()
+
+    def test_availability_is_one_query(self):
+        """Test that availability over many holds is a single query."""
+        for _ in range(9):
+            StockHold.objects.place(self.item.pk, 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.available(), 1)
+
+    def test_availability_in_aliased_queries(self):
+        """Test that holds are counted when availability runs as a subquery or in a joined UPDATE."""
+        StockHold.objects.place(self.item.pk, 8)
+        for quantity, expected in [(3, 0), (2, 1)]:
+            available = WarehouseStock.objects.available(self.item.pk, quantity)
+            self.assertEqual(Item.objects.filter(pk__in=available.values('item_id')).count(), expected)
+            # Filtering on the warehouse's name joins, so the UPDATE selects its rows in a subquery
+            joined = available.filter(warehouse__name=self.warehouse.name)
+            self.assertEqual(joined.update(quantity=F('quantity') - quantity), expected)
+
+    def test_sweeper_expires_stale_holds_in_batches(self):
+        """Test that the sweeper marks only the holds past their expiry, batch by batch."""
+        stale = [StockHold.objects.place(self.item.pk, 1, ttl=0) for _ in range(5)]
+        live = StockHold.objects.place(self.item.pk, 1)
+        out = StringIO()
+        call_command('expire_holds', '--batch-size', '2', stdout=out)
+        self.assertIn("Expired 5 holds.", out.getvalue())
+        self.assertEqual(
+            set(StockHold.objects.filter(status=StockHold.EXPIRED).values_list('pk', flat=True)),
+            {hold.pk for hold in stale},
+        )
+        live.refresh_from_db()
+        self.assertEqual(live.status, StockHold.ACTIVE)
+
+
+class StockHoldApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.login(username='buyer', password='password')
+        self.item = Item.objects.create(name="Apple", quantity=10, description="Fruit")
+
+    def post(self, name, data=None, **kwargs):
+        return self.client.post(reverse(name, kwargs=kwargs), json.dumps(data or {}), content_type='application/json')
+
+    def test_hold_then_confirm(self):
+        """Test that a hold placed over the API can be confirmed into an order."""
+        response = self.post('api_hold_create', {'item': self.item.pk, 'quantity': 4})
+        self.assertEqual(response.status_code, 201)
+        hold = response.json()
+        self.assertEqual((hold['item_id'], hold['quantity'], hold['status']), (self.item.pk, 4, 'active'))
+
+        self.assertEqual(self.post('api_hold_create', {'item': self.item.pk, 'quantity': 7}).status_code, 409)
+        response = self.post('api_hold_confirm', pk=hold['id'])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['id'], Order.objects.get().pk)
+        self.assertEqual(self.post('api_hold_confirm', pk=hold['id']).status_code, 409)
+
+    def test_hold_then_cancel(self):
+        """Test that a hold can be cancelled once, and only by the user who placed it."""
+        hold = self.post('api_hold_create', {'item': self.item.pk, 'quantity': 4}).json()
+        other = get_user_model().objects.create_user(username='other', password='password')
+        self.client.force_login(other)
+        self.assertEqual(self.post('api_hold_cancel', pk=hold['id']).status_code, 404)
+
+        self.client.force_login(self.user)
+        response = self.post('api_hold_cancel', pk=hold['id'])
+        self.assertEqual(response.json()['status'], 'cancelled')
+        self.assertEqual(self.post('api_hold_cancel', pk=hold['id']).status_code, 409)
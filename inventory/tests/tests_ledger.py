@@ -0,0 +1,118 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import Item, Order, StockMovement, StockSnapshot
+from inventory.services import create_bulk_order
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def ledger_total(self, item):
+        return item.movements.aggregate(total=Sum('change'))['total']
+
+    def test_every_write_path_records_a_movement(self):
+        """Test that creation, orders, bulk orders and manual edits all land in the ledger."""
+        order = Order.objects.create(item=self.item, quantity=5)
+        create_bulk_order([(self.item.pk, 2)])
+        self.item.refresh_from_db()
+        self.item.quantity = 30
+        self.item.save()
+        self.item.quantity = 25
+        self.item.save()
+
+        movements = list(self.item.movements.order_by('pk').values_list('kind', 'change'))
+        self.assertEqual(movements, [
+            (StockMovement.RESTOCK, 20),
+            (StockMovement.ORDER, -5),
+            (StockMovement.ORDER, -2),
+            (StockMovement.RESTOCK, 17),
+            (StockMovement.CORRECTION, -5),
+        ])
+        self.assertEqual(self.item.movements.filter(kind=StockMovement.ORDER).first().order, order)
+        self.assertEqual(self.ledger_total(self.item), 25)
+
+    def test_update_stock_view_records_the_difference(self):
+        """Test that the stock form records the change it makes, not the new total."""
+        get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.login(username='admin', password='password')
+        self.client.post(reverse('update_stock', args=[self.item.pk]), {'quantity': 12})
+        self.assertEqual(self.item.movements.latest('pk').change, -8)
+        self.assertEqual(self.ledger_total(self.item), 12)
+
+    def test_saving_other_fields_records_nothing(self):
+        """Test that a save that leaves the quantity alone adds no movement."""
+        self.item.name = "Green Apple"
+        self.item.save()
+        self.item.save(update_fields=['name'])
+        self.assertEqual(self.item.movements.count(), 1)
+
+    def test_bulk_created_items_open_their_ledger(self):
+        """Test that bulk-created items get an opening movement."""
+        items = Item.objects.bulk_create([Item(name=f"Bulk {i}", quantity=i, description="Bulk") for i in range(4)])
+        self.assertEqual([self.ledger_total(item) for item in items], [None, 1, 2, 3])
+
+    def test_movements_are_immutable(self):
+        """Test that a recorded movement cannot be saved again."""
+        movement = self.item.movements.get()
+        movement.change = 99
+        with self.assertRaises(ValueError):
+            movement.save()
+
+    def test_stock_at_replays_from_the_latest_snapshot(self):
+        """Test that point-in-time stock uses one snapshot lookup plus the movements since."""
+        start = timezone.now()
+        Order.objects.create(item=self.item, quantity=5)
+        call_command('snapshot_stock', stdout=StringIO())
+        after_snapshot = timezone.now()
+        Order.objects.create(item=self.item, quantity=3)
+
+        self.assertEqual(self.item.stock_at(start), 20)
+        self.assertEqual(self.item.stock_at(after_snapshot), 15)
+        with self.assertNumQueries(2):  # Latest snapshot, then the sum of the movements after it
+            self.assertEqual(self.item.stock_at(timezone.now()), 12)
+        self.assertEqual(self.item.stock_at(start - timedelta(days=1)), 0)
+
+    def test_snapshot_command(self):
+        """Test that every item gets a snapshot covering its movements so far."""
+        other = Item.objects.create(name="Pear", quantity=4, description="Fruit")
+        out = StringIO()
+        call_command('snapshot_stock', '--batch-size', '1', stdout=out)
+        self.assertIn("Snapshotted 2 items", out.getvalue())
+        snapshot = StockSnapshot.objects.get(item=other)
+        self.assertEqual(snapshot.quantity, 4)
+        self.assertEqual(snapshot.last_movement_id, other.movements.get().pk)
+
+
+class RebuildStockCommandTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+        Order.objects.create(item=self.item, quantity=5)
+
+    def test_matching_ledger(self):
+        """Test that a consistent ledger passes the check."""
+        out = StringIO()
+        call_command('rebuild_stock', stdout=out)
+        self.assertIn("Checked 1 items. Found 0 mismatches.", out.getvalue())
+
+    def test_drift_is_reported_and_fixed(self):
+        """Test that a quantity written around the ledger is reported, and rebuilt with --fix."""
+        Item.objects.filter(pk=self.item.pk).update(quantity=99)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_stock', stdout=out)
+        self.assertIn("Apple (#%d): quantity 99, ledger 15" % self.item.pk, out.getvalue())
+
+        call_command('rebuild_stock', '--fix', stdout=StringIO())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 15)
+        call_command('rebuild_stock', stdout=StringIO())
@@ -0,0 +1,66 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from inventory import middleware
+from inventory.models import Item
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        middleware.view_stats.clear()
+        self.addCleanup(middleware.view_stats.clear)
+        self.user = get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.login(username='admin', password='password')
+        Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def test_off_by_default(self):
+        """Test that without the setting there is no header and nothing is recorded."""
+        response = self.client.get(reverse('inventory_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(middleware.view_stats, {})
+
+    @override_settings(INVENTORY_REQUEST_TIMING=True)
+    def test_server_timing_header(self):
+        """Test that a timed view reports its query count, DB, template and total time."""
+        response = self.client.get(reverse('inventory_list'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;desc="\d+ queries";dur=[\d.]+, template;dur=[\d.]+, total;dur=[\d.]+$')
+        stats = middleware.view_stats['inventory_list']
+        self.assertEqual(stats['requests'], 1)
+        self.assertIn(f'desc="{stats["queries"]} queries"', timing)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['template_ms'], 0)
+
+    @override_settings(INVENTORY_REQUEST_TIMING=True)
+    def test_stats_endpoint_aggregates_per_view(self):
+        """Test that the stats endpoint reports averages and a latency histogram per view."""
+        for _ in range(3):
+            self.client.get(reverse('inventory_list'))
+        self.client.get(reverse('order_log'))
+
+        views = self.client.get(reverse('api_request_stats')).json()['views']
+        self.assertEqual(views['inventory_list']['requests'], 3)
+        self.assertEqual(views['order_log']['requests'], 1)
+        self.assertEqual(sum(bucket['count'] for bucket in views['inventory_list']['latency_ms']), 3)
+        self.assertIsNone(views['inventory_list']['latency_ms'][-1]['le'])
+
+    @override_settings(INVENTORY_REQUEST_TIMING=True)
+    async def test_async_views_are_timed_without_leaving_async(self):
+        """Test that under ASGI the middleware stays async and still times the async API views."""
+        async def get_response(request):
+            pass
+
+        self.assertTrue(iscoroutinefunction(middleware.RequestTimingMiddleware(get_response)))
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('api_item_list'))
+        self.assertRegex(response['Server-Timing'], r'^db;desc="[1-9]\d* queries"')
+        self.assertEqual(middleware.view_stats['api_item_list']['requests'], 1)
+
+    def test_stats_endpoint_requires_staff(self):
+        """Test that regular users are redirected away from the stats endpoint."""
+        get_user_model().objects.create_user(username='viewer', password='password')
+        self.client.login(username='viewer', password='password')
+        response = self.client.get(reverse('api_request_stats'))
+        self.assertEqual(response.status_code, 302)
@@ -1,11 +1,13 @@
+import threading
 import unittest
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 
-from inventory.models import Item, Order
-from unittest.mock import patch
+from inventory.models import Item, LowStockAlert, Order, WarehouseStock
+from inventory.views import LOW_STOCK_BANNER_SIZE
 from django.contrib.auth import get_user_model
 
 class ItemModelTests(TestCase):
@@ -50,16 +52,84 @@ class OrderModelTests(TestCase):
         with self.assertRaises(ValueError):
             order.save()
 
-    @patch('inventory.models.logger')
-    def test_low_stock_alert(self, mock_logger):
-        """Test that a low stock alert is logged when stock is below 15."""
-        order = Order.objects.create(item=self.item, quantity=6)  # 20 - 6 = 14
-        mock_logger.info.assert_called_with("Alert: Stock for 'Test Item' is below 15!")
+    def test_low_stock_alert(self):
+        """Test that a low stock alert is queued when stock is below 15."""
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(item=self.item, quantity=6)  # 20 - 5 (setUp) - 6 = 9
+        alert = LowStockAlert.objects.get()
+        self.assertEqual((alert.item, alert.quantity, alert.status), (self.item, 9, LowStockAlert.PENDING))
 
     def test_order_update_stock(self):
         """Test that the stock is updated correctly when an order is created."""
         order = Order.objects.create(item=self.item, quantity=10)
-        self.assertEqual(self.item.quantity, 10)
+        self.assertEqual(self.item.quantity, 5)  # 20 - 5 (setUp) - 10
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 5)
+
+    def test_order_insufficient_stock_leaves_stock_untouched(self):
+        """Test that a rejected order neither deducts stock nor creates a row."""
+        with self.assertRaises(ValueError):
+            Order.objects.create(item=self.item, quantity=16)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 15)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_order_resave_does_not_deduct_again(self):
+        """Test that saving an existing order does not deduct the stock a second time."""
+        self.order.save()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 15)
+
+    def test_order_uses_single_conditional_update(self):
+        """Test that an order costs a location lookup, two conditional UPDATEs, the order INSERT and its ledger INSERT."""
+        # SAVEPOINT, SELECT locations, UPDATE location, UPDATE item, INSERT order, INSERT movement, RELEASE SAVEPOINT
+        with self.assertNumQueries(7):
+            Order.objects.create(item=self.item, quantity=1)
+
+    def test_order_with_stale_item_checks_database_stock(self):
+        """Test that the stock check uses the database row, not a stale in-memory copy."""
+        stale_item = Item.objects.get(pk=self.item.pk)
+        Item.objects.filter(pk=self.item.pk).update(quantity=3)
+        WarehouseStock.objects.filter(item=self.item).update(quantity=3)
+        with self.assertRaises(ValueError):
+            Order.objects.create(item=stale_item, quantity=5)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 3)
+
+
+class OrderConcurrencyTests(TransactionTestCase):
+    def test_concurrent_orders_never_oversell(self):
+        """Test that many threads ordering the same item never take more than the stock."""
+        item = Item.objects.create(name="Hot Item", quantity=50, description="Contended item")
+        workers = 16
+        orders_per_worker = 10
+        successes = []
+        failures = []
+        barrier = threading.Barrier(workers)
+
+        def place_orders():
+            try:
+                barrier.wait()
+                for _ in range(orders_per_worker):
+                    try:
+                        Order.objects.create(item=Item.objects.get(pk=item.pk), quantity=1)
+                        successes.append(1)
+                    except ValueError:
+                        failures.append(1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=place_orders) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        item.refresh_from_db()
+        self.assertEqual(len(successes), 50)
+        self.assertEqual(len(failures), workers * orders_per_worker - 50)
+        self.assertEqual(item.quantity, 0)
+        self.assertEqual(Order.objects.filter(item=item).count(), 50)
 
 class InventoryItemIntegrationTests(TestCase):
     def setUp(self):
@@ -98,3 +168,43 @@ class IntegrationTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Test Item")
 
+
+class LowStockTests(TestCase):
+    def setUp(self):
+        self.bolts = Item.objects.create(name="Bolts", quantity=90, description="Bolts", reorder_threshold=100)
+        self.nuts = Item.objects.create(name="Nuts", quantity=10, description="Nuts", reorder_threshold=5)
+        self.screws = Item.objects.create(name="Screws", quantity=14, description="Screws")
+
+    def test_low_stock_uses_each_items_threshold(self):
+        """Test that low_stock() compares each item against its own reorder threshold."""
+        self.assertEqual(set(Item.objects.low_stock()), {self.bolts, self.screws})
+        self.assertTrue(self.bolts.check_low_stock())
+        self.assertFalse(self.nuts.check_low_stock())
+
+    def test_low_stock_index_exists(self):
+        """Test that the partial low-stock index is created."""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Item._meta.db_table)
+        self.assertIn('item_low_stock_idx', constraints)
+
+    def test_inventory_list_uses_low_stock_rule(self):
+        """Test that the list banner and row highlighting follow the per-item threshold."""
+        get_user_model().objects.create_user(username='viewer', password='password')
+        self.client.login(username='viewer', password='password')
+        response = self.client.get(reverse('inventory_list'))
+        self.assertEqual(response.context['low_stock'].items, [self.screws, self.bolts])
+        self.assertContains(response, "Bolts (90 left)")
+        self.assertNotContains(response, "Nuts (10 left)")
+
+    def test_inventory_list_banner_is_bounded(self):
+        """Test that the banner lists only the lowest items and reports how many are low in all."""
+        Item.objects.bulk_create(
+            Item(name=f"Washer {n}", quantity=n, description="Washer", reorder_threshold=100) for n in range(LOW_STOCK_BANNER_SIZE)
+        )
+        get_user_model().objects.create_user(username='viewer', password='password')
+        self.client.login(username='viewer', password='password')
+        response = self.client.get(reverse('inventory_list'))
+        self.assertEqual(len(response.context['low_stock'].items), LOW_STOCK_BANNER_SIZE)
+        self.assertContains(response, f"(the lowest {LOW_STOCK_BANNER_SIZE} of {LOW_STOCK_BANNER_SIZE + 2})")
+        self.assertContains(response, "Washer 0 (0 left)")
+        self.assertNotContains(response, "Bolts (90 left)")
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import InsufficientStock, Item, Order, StockHold
+from inventory.services import create_bulk_order
+
+
+class OrderCounterTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=50, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=50, description="Fruit")
+
+    def counters(self, item):
+        item.refresh_from_db()
+        return item.ordered_units, item.order_count, item.last_ordered_at
+
+    def test_orders_move_the_counters(self):
+        """Test that each order adds its units, one to the count, and its time as the last order."""
+        Order.objects.create(item=self.item, quantity=3)
+        order = Order.objects.create(item=self.item, quantity=4)
+        self.assertEqual(self.counters(self.item), (7, 2, order.created_at))
+        self.assertEqual(self.counters(self.pear), (0, 0, None))
+
+        with self.assertRaises(InsufficientStock):
+            Order.objects.create(item=self.item, quantity=100)
+        self.assertEqual(self.counters(self.item), (7, 2, order.created_at))
+
+    def test_every_order_path_counts(self):
+        """Test that bulk orders and confirmed holds move the counters too, a line per order."""
+        orders = create_bulk_order([(self.item.pk, 2), (self.pear.pk, 1), (self.item.pk, 5)])
+        self.assertEqual(self.counters(self.item), (7, 2, orders[0].created_at))
+        self.assertEqual(self.counters(self.pear), (1, 1, orders[0].created_at))
+
+        order = StockHold.objects.place(self.pear.pk, 4).confirm()
+        self.assertEqual(self.counters(self.pear), (5, 2, order.created_at))
+
+    def test_rebuild_flags_and_fixes_drift(self):
+        """Test that the rebuild command reports drifted counters and, with --fix, rewrites them."""
+        Order.objects.create(item=self.item, quantity=3)
+        order = Order.objects.create(item=self.pear, quantity=2)
+        Item.objects.filter(pk=self.item.pk).update(ordered_units=99)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_order_counters', stdout=out)
+        self.assertIn("Apple", out.getvalue())
+        self.assertNotIn("Pear", out.getvalue())
+
+        out = StringIO()
+        call_command('rebuild_order_counters', '--fix', '--batch-size', '1', stdout=out)
+        self.assertIn("Checked 2 items. Fixed 1 drifted.", out.getvalue())
+        self.assertEqual(self.counters(self.item)[:2], (3, 1))
+        self.assertEqual(self.counters(self.pear), (2, 1, order.created_at))
+        call_command('rebuild_order_counters', stdout=StringIO())
+
+
+class OrderCounterViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.force_login(self.user)
+        self.item = Item.objects.create(name="Apple", quantity=50, description="Fruit")
+        Order.objects.create(item=self.item, quantity=6)
+
+    def test_api_serves_counters_on_request(self):
+        """Test that the item API adds the counters when asked for them, and leaves them out by default."""
+        response = self.client.get(reverse('api_item_list'), {'fields': 'id,ordered_units,order_count'})
+        self.assertEqual(response.json()['results'], [{'id': self.item.pk, 'ordered_units': 6, 'order_count': 1}])
+        response = self.client.get(reverse('api_item_detail', args=[self.item.pk]))
+        self.assertNotIn('ordered_units', response.json())
+
+    def test_inventory_list_shows_ordered_units(self):
+        """Test that the inventory list shows how many units of each item were ordered."""
+        response = self.client.get(reverse('inventory_list'))
+        self.assertContains(response, "<td>6</td>", html=True)
@@ -0,0 +1,89 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from inventory.models import Item, LowStockAlert, Order, QueuedOrder, Warehouse
+
+
+@override_settings(INVENTORY_ORDER_QUEUE=True)
+class OrderQueueTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.force_login(self.user)
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def post_order(self, quantity, **extra):
+        return self.client.post(
+            reverse('api_order_create'), json.dumps({'item': self.item.pk, 'quantity': quantity, **extra}),
+            content_type='application/json',
+        )
+
+    def process(self, *args):
+        out = StringIO()
+        call_command('process_orders', *args, stdout=out)
+        return out.getvalue()
+
+    def test_api_acknowledges_then_reports_the_placed_order(self):
+        """Test that a queued order is acknowledged at once, and its status shows the order once placed."""
+        response = self.post_order(3)
+        self.assertEqual(response.status_code, 202)
+        queued = response.json()
+        self.assertEqual((queued['status'], queued['order']), ('queued', None))
+        self.assertFalse(Order.objects.exists())
+
+        self.assertIn("Placed 1 orders, 0 rejected.", self.process())
+        status = self.client.get(response['Location']).json()
+        order = Order.objects.get()
+        self.assertEqual(status['status'], 'placed')
+        self.assertEqual(status['order']['id'], order.pk)
+        self.assertEqual(order.warehouse, Warehouse.objects.get())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 17)
+
+    def test_orders_without_stock_are_rejected_alone(self):
+        """Test that an order the stock no longer covers is rejected without holding up the rest of its batch."""
+        first, second, third = [self.post_order(quantity).json()['id'] for quantity in (8, 10, 5)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIn("Placed 2 orders, 1 rejected.", self.process())
+        statuses = dict(QueuedOrder.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            statuses, {first: QueuedOrder.PLACED, second: QueuedOrder.PLACED, third: QueuedOrder.REJECTED},
+        )
+        self.assertEqual(QueuedOrder.objects.get(pk=third).error, "Not enough stock to fulfill the order.")
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 2)
+        # Placed orders raise low-stock alerts as direct ones do, once per item
+        self.assertEqual(LowStockAlert.objects.filter(item=self.item).count(), 1)
+
+    def test_worker_drains_in_batches(self):
+        """Test that the worker places everything queued, a batch at a time, in the order it was accepted."""
+        queued = [self.post_order(1).json()['id'] for _ in range(5)]
+        self.assertIn("Placed 5 orders, 0 rejected.", self.process('--batch-size', '2'))
+        self.assertEqual(
+            list(QueuedOrder.objects.order_by('order__pk').values_list('pk', flat=True)), queued,
+        )
+        self.assertIn("Placed 0 orders, 0 rejected.", self.process())
+
+    def test_order_form_queues_the_order(self):
+        """Test that the order page accepts into the queue and the status is only shown to its user."""
+        response = self.client.post(reverse('create_order'), {'item': self.item.pk, 'quantity': 2}, follow=True)
+        self.assertRedirects(response, reverse('inventory_list'))
+        queued = QueuedOrder.objects.get()
+        self.assertContains(response, f"Order received as #{queued.pk}")
+        self.assertEqual((queued.user, queued.status), (self.user, QueuedOrder.QUEUED))
+
+        # The queue leaves the inventory version alone, so the list must not revalidate the acknowledgement away
+        etag = self.client.get(reverse('inventory_list'))['ETag']
+        self.client.post(reverse('create_order'), {'item': self.item.pk, 'quantity': 1})
+        response = self.client.get(reverse('inventory_list'), headers={'If-None-Match': etag})
+        self.assertContains(response, f"Order received as #{QueuedOrder.objects.latest('pk').pk}")
+        response = self.client.get(reverse('inventory_list'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        other = get_user_model().objects.create_user(username='other', password='password')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('api_queued_order', args=[queued.pk])).status_code, 404)
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import Item, Order, WarehouseStock
+
+
+class CreateOrderQueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.login(username='buyer', password='password')
+        Item.objects.bulk_create([Item(name=f"Filler {i}", quantity=50, description="Filler") for i in range(100)])
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def test_get_does_not_load_the_catalog(self):
+        """Test that the order form renders without querying items."""
+        # Session, user and the short list of warehouses
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('create_order'))
+        self.assertNotContains(response, "Filler 1")
+
+    def test_post_checks_stock_once(self):
+        """Test that placing an order costs one item lookup and one conditional UPDATE."""
+        # Session, user, item snapshot, then SAVEPOINT, SELECT locations, UPDATE location, UPDATE item,
+        # INSERT order, INSERT movement, RELEASE SAVEPOINT in Order.save
+        with self.assertNumQueries(10):
+            response = self.client.post(reverse('create_order'), {'item': self.item.pk, 'quantity': 5})
+        self.assertRedirects(response, reverse('inventory_list'), fetch_redirect_response=False)
+        # The order dropped the snapshot, so the next one looks the item up again, and no more
+        with self.assertNumQueries(10):
+            self.client.post(reverse('create_order'), {'item': self.item.pk, 'quantity': 2})
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 13)
+
+    def test_post_lost_race_is_a_form_error(self):
+        """Test that stock taken after validation is reported on the form, not as a crash."""
+        self.client.get(reverse('inventory_list'))  # Caches the item snapshot
+        # Bypasses invalidation, like a concurrent order
+        Item.objects.filter(pk=self.item.pk).update(quantity=2)
+        WarehouseStock.objects.filter(item=self.item).update(quantity=2)
+        response = self.client.post(reverse('create_order'), {'item': self.item.pk, 'quantity': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'quantity', 'Quantity exceeds stock.')
+        self.assertEqual(Order.objects.count(), 0)
+
+
+class ItemLookupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.login(username='buyer', password='password')
+        Item.objects.bulk_create([Item(name=f"Bolt {i:03d}", quantity=i, description="Bolt") for i in range(60)])
+        self.nut = Item.objects.create(name="Nut", quantity=9, description="Nut")
+
+    def test_lookup_by_name_prefix_is_bounded(self):
+        """Test that a name prefix returns at most a page of matches, in name order."""
+        results = self.client.get(reverse('item_lookup'), {'q': 'bolt'}).json()['results']
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[0], {'id': results[0]['id'], 'name': "Bolt 000", 'quantity': 0})
+
+    def test_lookup_by_id(self):
+        """Test that a number looks the item up by id."""
+        results = self.client.get(reverse('item_lookup'), {'q': str(self.nut.pk)}).json()['results']
+        self.assertEqual(results, [{'id': self.nut.pk, 'name': "Nut", 'quantity': 9}])
+
+    def test_lookup_without_query(self):
+        """Test that an empty query returns nothing rather than the catalog."""
+        with self.assertNumQueries(2):  # Session and user only
+            results = self.client.get(reverse('item_lookup')).json()['results']
+        self.assertEqual(results, [])
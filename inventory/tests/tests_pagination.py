@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from inventory.models import Item, Order
+from inventory.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        # Duplicate names and quantities make sure ties are broken by id
+        Item.objects.bulk_create(
+            [Item(name=f"Item {i % 7:02d}", quantity=i % 5, description="Paged") for i in range(30)]
+        )
+
+    def walk(self, field, descending):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Item.objects.all(), field, descending, cursor, per_page=4)
+            pages.append(rows)
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        """Test that walking every page returns each row exactly once, in sort order."""
+        for field, descending in [('name', False), ('name', True), ('quantity', False), ('quantity', True)]:
+            rows = [row for page in self.walk(field, descending) for row in page]
+            expected = list(Item.objects.order_by(*([f'-{field}', '-pk'] if descending else [field, 'pk'])))
+            self.assertEqual(rows, expected)
+
+    def test_deep_pages_do_not_use_offset(self):
+        """Test that a later page is located with WHERE, not OFFSET."""
+        _, cursor = keyset_page(Item.objects.all(), 'name', cursor=None, per_page=10)
+        with CaptureQueriesContext(connection) as queries:
+            keyset_page(Item.objects.all(), 'name', cursor=cursor, per_page=10)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('OFFSET', queries[0]['sql'].upper())
+
+    def test_cursor_round_trip_and_malformed_cursor(self):
+        """Test that cursors decode to what was encoded and garbage is ignored."""
+        self.assertEqual(decode_cursor(encode_cursor("Widget", 12)), ("Widget", 12))
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+        self.assertIsNone(decode_cursor(""))
+
+    def test_cursor_value_the_field_cannot_hold_starts_over(self):
+        """Test that a cursor whose value does not fit the sort field, e.g. from another sort, gives the first page."""
+        for field, value in [('name', None), ('quantity', "abc"), ('quantity', [1])]:
+            rows, _ = keyset_page(Item.objects.all(), field, cursor=encode_cursor(value, 1), per_page=4)
+            self.assertEqual(rows, list(Item.objects.order_by(field, 'pk')[:4]))
+
+
+class InventoryListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='viewer', password='password')
+        self.client.login(username='viewer', password='password')
+        Item.objects.bulk_create(
+            [Item(name=f"Widget {i:03d}", quantity=100 + i, description="Widget") for i in range(60)]
+            + [Item(name="Gadget", quantity=500, description="Gadget")]
+        )
+
+    def test_inventory_list_is_paginated(self):
+        """Test that the list shows one page and links to the next one."""
+        response = self.client.get(reverse('inventory_list'))
+        self.assertEqual(len(response.context['page'].items), 50)
+        self.assertIsNotNone(response.context['page'].next_cursor)
+
+        response = self.client.get(reverse('inventory_list'), {'after': response.context['page'].next_cursor})
+        self.assertEqual(len(response.context['page'].items), 11)
+        self.assertIsNone(response.context['page'].next_cursor)
+
+    def test_inventory_list_search(self):
+        """Test that the name search narrows the list."""
+        response = self.client.get(reverse('inventory_list'), {'q': 'gadg'})
+        self.assertEqual([item['name'] for item in response.context['page'].items], ["Gadget"])
+
+    def test_inventory_list_sort(self):
+        """Test that the list can be sorted by quantity, and unknown sorts fall back to name."""
+        response = self.client.get(reverse('inventory_list'), {'sort': '-quantity'})
+        self.assertEqual(response.context['page'].items[0]['name'], "Gadget")
+        response = self.client.get(reverse('inventory_list'), {'sort': 'description'})
+        self.assertEqual(response.context['sort'], 'name')
+        self.assertEqual(response.context['page'].items[0]['name'], "Gadget")
+
+
+class OrderLogPaginationTests(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.login(username='admin', password='password')
+        self.apple = Item.objects.create(name="Apple", quantity=1000, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=1000, description="Fruit")
+        Order.objects.bulk_create(
+            [Order(item=self.apple if i % 2 else self.pear, quantity=1) for i in range(70)]
+        )
+        # Spread the orders over 70 days, one per day, the highest id being the newest
+        for order in Order.objects.all():
+            Order.objects.filter(pk=order.pk).update(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=order.pk))
+
+    def test_order_log_is_paginated_newest_first(self):
+        """Test that the log shows the newest page first and the next page continues where it left off."""
+        response = self.client.get(reverse('order_log'))
+        first_page = response.context['orders']
+        self.assertEqual(len(first_page), 50)
+        self.assertEqual(first_page[0], Order.objects.latest('created_at'))
+
+        response = self.client.get(reverse('order_log'), {'after': response.context['next_cursor']})
+        second_page = response.context['orders']
+        self.assertEqual(len(second_page), 20)
+        self.assertLess(second_page[0].created_at, first_page[-1].created_at)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_order_log_filters(self):
+        """Test that the log can be narrowed by item and date range."""
+        response = self.client.get(reverse('order_log'), {'item': self.apple.pk})
+        self.assertTrue(all(order.item_id == self.apple.pk for order in response.context['orders']))
+        self.assertEqual(len(response.context['orders']), 35)
+
+        first = Order.objects.earliest('created_at').created_at.date()
+        response = self.client.get(reverse('order_log'), {'start': first, 'end': first + timedelta(days=2)})
+        self.assertEqual(len(response.context['orders']), 3)
+
+    def test_order_log_query_count_is_bounded(self):
+        """Test that rendering a page costs the same number of queries however long the log is."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('order_log'))
+        Order.objects.bulk_create([Order(item=self.apple, quantity=1) for _ in range(200)])
+        with self.assertNumQueries(len(queries)):
+            self.client.get(reverse('order_log'))
+
+    def test_order_log_ignores_a_cursor_that_is_not_a_date(self):
+        """Test that a cursor without a date in it gives the first page instead of an error."""
+        first_page = self.client.get(reverse('order_log')).context['orders']
+        for value in ["notadate", 5]:
+            response = self.client.get(reverse('order_log'), {'after': encode_cursor(value, 1)})
+            self.assertEqual(list(response.context['orders']), list(first_page))
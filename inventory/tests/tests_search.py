@@ -0,0 +1,81 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import Item
+from inventory.search import search_item_ids
+
+
+class ItemSearchTests(TestCase):
+    def setUp(self):
+        self.bolt = Item.objects.create(name="Hex Bolt M8", quantity=10, description="Zinc plated steel")
+        self.nut = Item.objects.create(name="Hex Nut M8", quantity=10, description="Fits the hex bolt")
+        self.washer = Item.objects.create(name="Washer", quantity=10, description="Stainless steel")
+
+    def test_matches_name_and_description(self):
+        """Test that every word must match, in the name or the description."""
+        self.assertEqual(search_item_ids("steel", 10), [self.washer.pk, self.bolt.pk])
+        self.assertEqual(search_item_ids("hex steel", 10), [self.bolt.pk])
+        self.assertEqual(search_item_ids("copper", 10), [])
+
+    def test_name_matches_rank_first(self):
+        """Test that an item named after the search ranks above one that only mentions it."""
+        self.assertEqual(search_item_ids("bolt", 10), [self.bolt.pk, self.nut.pk])
+
+    def test_prefix_matching_for_typeahead(self):
+        """Test that partial words match as prefixes, accents and case aside."""
+        self.assertEqual(search_item_ids("was", 10), [self.washer.pk])
+        self.assertEqual(search_item_ids("STAINLE", 10), [self.washer.pk])
+        Item.objects.create(name="Crème", quantity=1, description="Dairy")
+        self.assertEqual(len(search_item_ids("creme", 10)), 1)
+
+    def test_results_are_bounded(self):
+        """Test that no more than the limit is returned."""
+        self.assertEqual(len(search_item_ids("m8", 1)), 1)
+
+    def test_search_syntax_is_treated_as_text(self):
+        """Test that quotes and operators in a search are not parsed as query syntax."""
+        for query in ['"', 'bolt OR nut', 'NOT', '*', 'hex AND (', "name:washer"]:
+            search_item_ids(query, 10)
+        self.assertEqual(search_item_ids('"', 10), [])
+
+    def test_index_follows_changes(self):
+        """Test that renames, bulk inserts, raw updates and deletes are reflected in the results."""
+        self.washer.name = "Spring Washer"
+        self.washer.save()
+        self.assertEqual(search_item_ids("spring", 10), [self.washer.pk])
+        Item.objects.filter(pk=self.bolt.pk).update(description="Galvanised")
+        self.assertEqual(search_item_ids("zinc", 10), [])
+        plug, = Item.objects.bulk_create([Item(name="Wall Plug", quantity=5, description="Nylon")])
+        self.assertEqual(search_item_ids("nylon", 10), [plug.pk])
+        self.nut.delete()
+        self.assertEqual(search_item_ids("nut", 10), [])
+
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "Only SQLite keeps the index in step with triggers.")
+    def test_dropped_triggers_are_restored_after_migrate(self):
+        """Test that a search trigger dropped by a table rebuild is back after migrate, with the missed rows."""
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER inventory_item_fts_insert')
+        screw = Item.objects.create(name="Wood screw", quantity=10, description="Brass")
+        self.assertEqual(search_item_ids("screw", 10), [])
+        emit_post_migrate_signal(0, False, connection.alias)
+        self.assertEqual(search_item_ids("screw", 10), [screw.pk])
+        Item.objects.create(name="Machine screw", quantity=10, description="Steel")
+        self.assertEqual(len(search_item_ids("screw", 10)), 2)
+
+
+class ItemLookupSearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.login(username='buyer', password='password')
+        self.item = Item.objects.create(name="Gate Valve", quantity=4, description="Brass, threaded")
+
+    def test_lookup_searches_descriptions(self):
+        """Test that the order form picker finds items by a word of their description."""
+        response = self.client.get(reverse('item_lookup'), {'q': 'bra'})
+        self.assertEqual(response.json()['results'], [{'id': self.item.pk, 'name': "Gate Valve", 'quantity': 4}])
@@ -0,0 +1,132 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from inventory.models import InsufficientStock, Item, Order
+from inventory.services import BULK_ORDER_CHUNK, create_bulk_order
+from inventory.views import BULK_ORDER_MAX_LINES
+
+
+class BulkOrderServiceTests(TestCase):
+    def setUp(self):
+        self.apple = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+        self.pear = Item.objects.create(name="Pear", quantity=5, description="Fruit")
+
+    def test_bulk_order_creates_every_line(self):
+        """Test that each line becomes an order and the stock is deducted."""
+        orders = create_bulk_order([(self.apple.pk, 3), (self.pear.pk, 5), (self.apple.pk, 2)])
+        self.assertEqual(len(orders), 3)
+        self.assertEqual(Order.objects.count(), 3)
+        self.apple.refresh_from_db()
+        self.pear.refresh_from_db()
+        self.assertEqual(self.apple.quantity, 15)
+        self.assertEqual(self.pear.quantity, 0)
+
+    def test_bulk_order_rolls_back_when_one_line_is_short(self):
+        """Test that a single short line rejects the whole batch."""
+        with self.assertRaises(InsufficientStock):
+            create_bulk_order([(self.apple.pk, 3), (self.pear.pk, 6)])
+        self.apple.refresh_from_db()
+        self.assertEqual(self.apple.quantity, 20)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_bulk_order_merges_lines_for_the_same_item(self):
+        """Test that repeated lines are checked against the stock together."""
+        with self.assertRaises(InsufficientStock):
+            create_bulk_order([(self.pear.pk, 3), (self.pear.pk, 3)])
+        self.pear.refresh_from_db()
+        self.assertEqual(self.pear.quantity, 5)
+
+    def test_bulk_order_rejects_unknown_items_and_bad_quantities(self):
+        """Test that malformed lines raise ValueError without touching stock."""
+        with self.assertRaises(ValueError):
+            create_bulk_order([(self.apple.pk, 1), (999999, 1)])
+        with self.assertRaises(ValueError):
+            create_bulk_order([(self.apple.pk, 0)])
+        with self.assertRaises(ValueError):
+            create_bulk_order([])
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_bulk_order_rejects_fractional_and_boolean_values(self):
+        """Test that floats, bools and strings are rejected instead of being coerced to ints."""
+        for line in [(self.apple.pk, 2.5), (self.apple.pk, True), (float(self.apple.pk), 1), (str(self.apple.pk), 1)]:
+            with self.subTest(line=line), self.assertRaises(ValueError):
+                create_bulk_order([line])
+        self.apple.refresh_from_db()
+        self.assertEqual(self.apple.quantity, 20)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_bulk_order_statement_count_does_not_grow_with_lines(self):
+        """Test that 1 line and 100 lines cost the same number of queries."""
+        items = Item.objects.bulk_create(
+            [Item(name=f"Bulk {i}", quantity=100, description="Bulk") for i in range(100)]
+        )
+        # SAVEPOINT, SELECT items and locations FOR UPDATE, UPDATE locations, UPDATE items, INSERT orders,
+        # INSERT movements, RELEASE SAVEPOINT
+        with self.assertNumQueries(8):
+            create_bulk_order([(items[0].pk, 1)])
+        with self.assertNumQueries(8):
+            create_bulk_order([(item.pk, 1) for item in items])
+        self.assertEqual(Order.objects.count(), 101)
+
+    def test_large_bulk_order_is_split_into_bounded_updates(self):
+        """Test that past BULK_ORDER_CHUNK items the stock UPDATEs are split, each naming its table's column."""
+        items = Item.objects.bulk_create(
+            [Item(name=f"Bulk {i}", quantity=100, description="Bulk") for i in range(BULK_ORDER_CHUNK * 2 + 1)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            create_bulk_order([(item.pk, 2) for item in items])
+        for table in ('inventory_warehousestock', 'inventory_item'):
+            updates = [query['sql'] for query in queries if query['sql'].startswith(f'UPDATE "{table}"')]
+            self.assertEqual(len(updates), 3)
+            self.assertTrue(all(f'CASE "{table}"."id"' in update for update in updates))
+        self.assertEqual(set(Item.objects.filter(description="Bulk").values_list('quantity', flat=True)), {98})
+
+
+class BulkOrderViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.login(username='buyer', password='password')
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def post_lines(self, lines):
+        return self.client.post(reverse('bulk_create_order'), data=json.dumps({'lines': lines}),
+                                content_type='application/json')
+
+    def test_bulk_order_view_creates_orders(self):
+        """Test that a valid batch returns the created order ids."""
+        response = self.post_lines([{'item': self.item.pk, 'quantity': 4}, {'item': self.item.pk, 'quantity': 1}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['orders']), 2)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 15)
+
+    def test_bulk_order_view_insufficient_stock(self):
+        """Test that a short batch is rejected with a conflict."""
+        response = self.post_lines([{'item': self.item.pk, 'quantity': 21}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_bulk_order_view_malformed_body(self):
+        """Test that a malformed body is rejected."""
+        response = self.client.post(reverse('bulk_create_order'), data='not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.post_lines([{'item': self.item.pk, 'quantity': 'many'}])
+        self.assertEqual(response.status_code, 400)
+        response = self.post_lines([{'item': self.item.pk, 'quantity': 1.5}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_order_view_caps_the_number_of_lines(self):
+        """Test that a batch over BULK_ORDER_MAX_LINES is rejected before anything is ordered."""
+        response = self.post_lines([{'item': self.item.pk, 'quantity': 1}] * (BULK_ORDER_MAX_LINES + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_bulk_order_view_requires_post(self):
+        """Test that the endpoint only accepts POST."""
+        response = self.client.get(reverse('bulk_create_order'))
+        self.assertEqual(response.status_code, 405)
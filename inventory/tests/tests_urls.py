@@ -1,6 +1,7 @@
 from django.test import SimpleTestCase
 from django.urls import reverse, resolve
-from inventory.views import inventory_list, add_item, create_order, order_log, update_stock
+from inventory import api
+from inventory.views import inventory_list, add_item, create_order, bulk_create_order, item_lookup, order_log, export_orders, update_stock
 
 class URLTests(SimpleTestCase):
 
@@ -19,12 +20,40 @@ class URLTests(SimpleTestCase):
         url = reverse('create_order')
         self.assertEqual(resolve(url).func, create_order)
 
+    def test_bulk_create_order_url(self):
+        """Test that the bulk create order URL resolves to the correct view"""
+        url = reverse('bulk_create_order')
+        self.assertEqual(resolve(url).func, bulk_create_order)
+
+    def test_item_lookup_url(self):
+        """Test that the item lookup URL resolves to the correct view"""
+        url = reverse('item_lookup')
+        self.assertEqual(resolve(url).func, item_lookup)
+
     def test_order_log_url(self):
         """Test that the order log URL resolves to the correct view"""
         url = reverse('order_log')
         self.assertEqual(resolve(url).func, order_log)
 
+    def test_export_orders_url(self):
+        """Test that the export orders URL resolves to the correct view"""
+        url = reverse('export_orders')
+        self.assertEqual(resolve(url).func, export_orders)
+
     def test_update_stock_url(self):
         """Test that the update stock URL resolves to the correct view"""
         url = reverse('update_stock', kwargs={'pk': 1})
         self.assertEqual(resolve(url).func, update_stock)
+
+    def test_api_urls(self):
+        """Test that the JSON read URLs resolve to the async API views"""
+        self.assertEqual(resolve(reverse('api_item_list')).func, api.item_list)
+        self.assertEqual(resolve(reverse('api_low_stock')).func, api.low_stock_summary)
+        self.assertEqual(resolve(reverse('api_item_detail', kwargs={'pk': 1})).func, api.item_detail)
+        self.assertEqual(resolve(reverse('api_order_list')).func, api.order_list)
+        self.assertEqual(resolve(reverse('api_order_create')).func, api.order_create)
+
+    def test_report_urls(self):
+        """Test that the report and stats URLs resolve to their API views"""
+        self.assertEqual(resolve(reverse('api_sales_report')).func, api.sales_report)
+        self.assertEqual(resolve(reverse('api_request_stats')).func, api.request_stats)
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from inventory.models import Item, Order, StaleEdit, StockHold
+from inventory.services import create_bulk_order
+
+
+class ItemVersionTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def test_save_bumps_the_version(self):
+        """Test that every save moves the version on, in memory and in the row."""
+        self.item.quantity = 25
+        self.item.save()
+        self.assertEqual(self.item.version, 2)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.quantity, self.item.version), (25, 2))
+
+    def test_stale_save_is_rejected(self):
+        """Test that saving a copy read before another write fails and leaves the row alone."""
+        stale = Item.objects.get(pk=self.item.pk)
+        Order.objects.create(item=self.item, quantity=5)
+        stale.quantity = 30
+        with self.assertRaises(StaleEdit):
+            stale.save()
+        stale.name = "Green Apple"
+        with self.assertRaises(StaleEdit):
+            stale.save(update_fields=['name'])
+        self.assertEqual(stale.version, 1)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.name, self.item.quantity), ("Apple", 15))
+
+    def test_every_stock_write_bumps_the_version(self):
+        """Test that orders and bulk orders make earlier reads stale."""
+        Order.objects.create(item=self.item, quantity=1)
+        create_bulk_order([(self.item.pk, 1)])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.version, 3)
+
+    def test_ordered_item_can_still_be_saved(self):
+        """Test that the item given to an order, a hold or a bulk order stays in step with its row and saves cleanly."""
+        fields = ['quantity', 'version', 'ordered_units', 'order_count', 'last_ordered_at']
+
+        def assertInStep(item):
+            fresh = Item.objects.get(pk=item.pk)
+            self.assertEqual([getattr(item, field) for field in fields], [getattr(fresh, field) for field in fields])
+            item.name = "Green apple"
+            item.save()
+
+        Order.objects.create(item=self.item, quantity=2)
+        assertInStep(self.item)
+        hold = StockHold.objects.select_related('item').get(pk=StockHold.objects.place(self.item.pk, 3).pk)
+        hold.confirm()
+        assertInStep(hold.item)
+        orders = create_bulk_order([(self.item.pk, 1), (self.item.pk, 4)])
+        assertInStep(orders[0].item)
+        self.assertEqual(Item.objects.get(pk=self.item.pk).order_count, 4)
+
+    def test_update_sends_only_the_named_columns(self):
+        """Test that a save with update_fields writes those columns and the version, checked against the old one."""
+        self.item.quantity = 21
+        with CaptureQueriesContext(connection) as queries:
+            self.item.save(update_fields=['quantity'])
+        update, = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "inventory_item"')]
+        self.assertIn('"quantity" = 21', update)
+        self.assertIn('"version" = 2', update)
+        self.assertNotIn('"name"', update)
+        self.assertIn('"version" = 1', update.split('WHERE')[1])
+
+
+class StaleEditViewTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(username='admin', password='password')
+        self.client.force_login(self.admin)
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+
+    def test_update_stock_form_carries_the_version(self):
+        """Test that the stock form is rendered with the version it was read at."""
+        response = self.client.get(reverse('update_stock', args=[self.item.pk]))
+        self.assertContains(response, '<input type="hidden" name="version" value="1"', html=False)
+
+    def test_stale_stock_update_is_a_conflict(self):
+        """Test that an edit posted after an order is refused with a 409, keeping the order's decrement."""
+        Order.objects.create(item=self.item, quantity=5)
+        response = self.client.post(reverse('update_stock', args=[self.item.pk]), {'quantity': 40, 'version': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, "It is now 15", status_code=409)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 15)
+
+        response = self.client.post(reverse('update_stock', args=[self.item.pk]), {'quantity': 40, 'version': 2})
+        self.assertRedirects(response, reverse('inventory_list'), fetch_redirect_response=False)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.quantity, self.item.version), (40, 3))
+
+    def test_stale_admin_edit_is_refused(self):
+        """Test that an admin edit posted after an order is sent back with an error instead of saved."""
+        Order.objects.create(item=self.item, quantity=5)
+        url = reverse('admin:inventory_item_change', args=[self.item.pk])
+        response = self.client.post(url, {
+            'name': "Green Apple", 'quantity': 20, 'description': "Fruit", 'reorder_threshold': 15, 'version': 1,
+            'stock_levels-TOTAL_FORMS': 0, 'stock_levels-INITIAL_FORMS': 0,
+        }, follow=True)
+        self.assertContains(response, "changed by someone else")
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.name, self.item.quantity), ("Apple", 15))
@@ -0,0 +1,160 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import ProtectedError, Sum, Value
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.forms import OrderForm
+from inventory.models import InsufficientStock, Item, Order, StockMovement, Warehouse, WarehouseStock
+from inventory.services import create_bulk_order
+
+
+class WarehouseStockTests(TestCase):
+    def setUp(self):
+        self.near = Warehouse.objects.create(name="Near", priority=0)
+        self.far = Warehouse.objects.create(name="Far", priority=10)
+        self.item = Item.objects.create(name="Apple", quantity=20, description="Fruit")
+        WarehouseStock.objects.create(item=self.item, warehouse=self.far, quantity=30)
+        Item.objects.filter(pk=self.item.pk).update(quantity=50)
+
+    def stock(self, warehouse, item=None):
+        return WarehouseStock.objects.get(item=item or self.item, warehouse=warehouse).quantity
+
+    def assertTotalsAddUp(self):
+        for item in Item.objects.annotate(located=Sum('stock_levels__quantity')):
+            self.assertEqual(item.quantity, item.located or 0)
+
+    def test_new_items_are_stocked_at_the_nearest_warehouse(self):
+        """Test that created and bulk-created items get a row at the default warehouse holding their stock."""
+        self.assertEqual(self.stock(self.near), 20)
+        pear, plum = Item.objects.bulk_create([
+            Item(name="Pear", quantity=7, description="Fruit"),
+            Item(name="Plum", quantity=0, description="Fruit"),
+        ])
+        self.assertEqual(self.stock(self.near, pear), 7)
+        self.assertFalse(plum.stock_levels.exists())
+        self.assertTotalsAddUp()
+
+    def test_order_draws_from_the_nearest_warehouse_with_stock(self):
+        """Test that an order is filled from the nearest location that has the whole quantity."""
+        order = Order.objects.create(item=self.item, quantity=15)
+        self.assertEqual(order.warehouse, self.near)
+        order = Order.objects.create(item=self.item, quantity=10)  # Near only has 5 left
+        self.assertEqual(order.warehouse, self.far)
+        self.assertEqual((self.stock(self.near), self.stock(self.far)), (5, 20))
+        self.assertTotalsAddUp()
+
+    def test_order_from_a_chosen_warehouse(self):
+        """Test that an order naming a warehouse only draws from it."""
+        order = Order.objects.create(item=self.item, warehouse=self.far, quantity=3)
+        self.assertEqual((self.stock(self.near), self.stock(self.far)), (20, 27))
+        with self.assertRaises(InsufficientStock):
+            Order.objects.create(item=self.item, warehouse=self.near, quantity=21)
+        self.assertEqual(Order.objects.get(), order)
+        self.assertTotalsAddUp()
+
+    def test_order_is_not_split_across_warehouses(self):
+        """Test that an order no single location can fill is refused, even if the total would cover it."""
+        with self.assertRaises(InsufficientStock):
+            Order.objects.create(item=self.item, quantity=40)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 50)
+
+    def test_orders_are_validated_against_one_warehouse(self):
+        """Test that the order form and API accept what one location holds, and explain a larger order."""
+        form = OrderForm(data={'item': self.item.pk, 'quantity': 40})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['quantity'], [
+            "Orders are filled from a single warehouse; at most 30 can be ordered at once.",
+        ])
+        self.assertTrue(OrderForm(data={'item': self.item.pk, 'quantity': 30}).is_valid())
+
+        user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('api_order_create'), {'item': self.item.pk, 'quantity': 40}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post(
+            reverse('api_order_create'), {'item': self.item.pk, 'quantity': 30}, content_type='application/json',
+        )
+        self.assertEqual(response.json()['warehouse_id'], self.far.pk)
+
+    def test_stock_changes_move_the_locations(self):
+        """Test that restocks land at the nearest warehouse and reductions drain the nearest first."""
+        self.item.refresh_from_db()
+        self.item.quantity = 60
+        self.item.save()
+        self.assertEqual((self.stock(self.near), self.stock(self.far)), (30, 30))
+        self.item.quantity = 25
+        self.item.save()
+        self.assertEqual((self.stock(self.near), self.stock(self.far)), (0, 25))
+        self.assertTotalsAddUp()
+
+    def test_bulk_order_picks_a_warehouse_per_item(self):
+        """Test that a bulk order fills each item from the nearest location holding its merged quantity."""
+        pear = Item.objects.create(name="Pear", quantity=10, description="Fruit")
+        orders = create_bulk_order([(self.item.pk, 15), (pear.pk, 4), (self.item.pk, 10)])
+        self.assertEqual([order.warehouse_id for order in orders], [self.far.pk, self.near.pk, self.far.pk])
+        self.assertEqual((self.stock(self.near), self.stock(self.far), self.stock(self.near, pear)), (20, 5, 6))
+        self.assertTotalsAddUp()
+
+    def test_import_sets_one_warehouse(self):
+        """Test that an import sets the named warehouse's quantity and moves the item total with it."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'stock.csv'
+            path.write_text(f"id,quantity,name\n{self.item.pk},12,\n7000,4,Plum\n")
+            call_command('import_stock', str(path), '--warehouse', "Far", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual((self.stock(self.near), self.stock(self.far)), (20, 12))
+        self.assertEqual(self.stock(self.far, Item.objects.get(pk=7000)), 4)
+        self.assertEqual(self.item.movements.order_by('-pk').first().change, -18)
+        self.assertTotalsAddUp()
+
+    def test_new_locations_take_the_item_threshold(self):
+        """Test that every path opening a location copies the item's reorder threshold into it."""
+        created = Item.objects.create(name="Pear", quantity=5, description="Fruit", reorder_threshold=100)
+        bulk, = Item.objects.bulk_create([Item(name="Plum", quantity=5, description="Fruit", reorder_threshold=100)])
+        restocked = Item.objects.create(name="Fig", quantity=0, description="Fruit", reorder_threshold=100)
+        restocked.quantity = 5
+        restocked.save()
+        set_in_bulk = Item.objects.create(name="Kiwi", quantity=0, description="Fruit", reorder_threshold=100)
+        Item.objects.filter(pk=set_in_bulk.pk).set_stock(Value(5))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'stock.csv'
+            path.write_text(f"id,quantity,name\n{created.pk},3,\n")
+            call_command('import_stock', str(path), '--warehouse', "Far", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(
+            set(WarehouseStock.objects.filter(item__reorder_threshold=100).values_list('reorder_threshold', flat=True)),
+            {100},
+        )
+        self.assertEqual(WarehouseStock.objects.filter(item__reorder_threshold=100).count(), 5)
+
+    def test_warehouse_holding_stock_cannot_be_deleted(self):
+        """Test that a warehouse with stock rows is protected, so the item totals never count vanished stock."""
+        with self.assertRaises(ProtectedError):
+            self.far.delete()
+        self.assertTotalsAddUp()
+
+    def test_low_stock_per_warehouse(self):
+        """Test that the low-stock endpoint lists only the items below their threshold at that warehouse."""
+        user = get_user_model().objects.create_user(username='buyer', password='password')
+        self.client.force_login(user)
+        pear = Item.objects.create(name="Pear", quantity=3, description="Fruit")
+        WarehouseStock.objects.filter(item=self.item, warehouse=self.far).update(quantity=2)
+
+        response = self.client.get(reverse('api_warehouse_low_stock', args=[self.near.pk]))
+        self.assertEqual(response.json(), {'count': 1, 'results': [
+            {'item_id': pear.pk, 'quantity': 3, 'reorder_threshold': 15, 'name': "Pear"},
+        ]})
+        response = self.client.get(reverse('api_warehouse_low_stock', args=[self.far.pk]))
+        self.assertEqual([row['item_id'] for row in response.json()['results']], [self.item.pk])
+
+    def test_ledger_still_matches_the_total(self):
+        """Test that orders from any warehouse are recorded against the item total."""
+        Order.objects.create(item=self.item, warehouse=self.far, quantity=5)
+        StockMovement.objects.create(item=self.item, kind=StockMovement.CORRECTION, change=30)  # The far stock
+        call_command('rebuild_stock', stdout=StringIO())
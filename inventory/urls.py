@@ -1,10 +1,25 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.inventory_list, name='inventory_list'),
     path('add-item/', views.add_item, name='add_item'),
     path('create-order/', views.create_order, name='create_order'),
+    path('create-order/bulk/', views.bulk_create_order, name='bulk_create_order'),
+    path('items/lookup/', views.item_lookup, name='item_lookup'),
     path('order-log/', views.order_log, name='order_log'),
+    path('order-log/export/', views.export_orders, name='export_orders'),
     path('update-stock/<int:pk>/', views.update_stock, name='update_stock'),
+    path('api/items/', api.item_list, name='api_item_list'),
+    path('api/items/low-stock/', api.low_stock_summary, name='api_low_stock'),
+    path('api/items/<int:pk>/', api.item_detail, name='api_item_detail'),
+    path('api/orders/', api.order_list, name='api_order_list'),
+    path('api/orders/new/', api.order_create, name='api_order_create'),
+    path('api/orders/queued/<int:pk>/', api.queued_order, name='api_queued_order'),
+    path('api/holds/', api.hold_create, name='api_hold_create'),
+    path('api/holds/<int:pk>/confirm/', api.hold_confirm, name='api_hold_confirm'),
+    path('api/holds/<int:pk>/cancel/', api.hold_cancel, name='api_hold_cancel'),
+    path('api/warehouses/<int:pk>/low-stock/', api.warehouse_low_stock, name='api_warehouse_low_stock'),
+    path('api/reports/sales/', api.sales_report, name='api_sales_report'),
+    path('api/stats/requests/', api.request_stats, name='api_request_stats'),
 ]
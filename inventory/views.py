@@ -1,19 +1,123 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from .models import Item, Order
-from .forms import ItemForm, OrderForm, UpdateStockForm
+from django.http import JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.utils.functional import cached_property
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from .models import InsufficientStock, Item, Order, QueuedOrder, StaleEdit
+from .cache import get_item_snapshots, inventory_version
+from .exports import order_export_rows, stream_csv, stream_jsonl
+from .forms import ItemForm, OrderForm, OrderFilterForm, UpdateStockForm
+from .pagination import keyset_page
+from .search import search_item_ids
+from .services import create_bulk_order
 
 # Helper function to check if a user is admin
 def is_admin(user):
     return user.is_staff
 
+# Sort options offered on the inventory list, mapped to (field, descending)
+INVENTORY_SORTS = {
+    'name': ('name', False),
+    '-name': ('name', True),
+    'quantity': ('quantity', False),
+    '-quantity': ('quantity', True),
+}
+ITEMS_PER_PAGE = 50
+ORDERS_PER_PAGE = 50
+LOW_STOCK_BANNER_SIZE = 20
+BULK_ORDER_MAX_LINES = 500
+
+class InventoryPage:
+    """One page of the inventory list, only read from the database if the template asks for it."""
+
+    def __init__(self, query, sort, cursor):
+        self.query = query
+        self.sort = sort
+        self.cursor = cursor
+
+    @cached_property
+    def _rows(self):
+        field, descending = INVENTORY_SORTS[self.sort]
+        # Only the sort key is read from the table, which the (field, id) index covers
+        keys = Item.objects.only(field)
+        if self.query:
+            keys = keys.filter(name__icontains=self.query)
+        # Keyset pagination, so deep pages never scan past the rows they skip
+        keys, next_cursor = keyset_page(keys, field, descending, self.cursor, ITEMS_PER_PAGE)
+        # The rows themselves come from the item snapshot cache
+        snapshots = get_item_snapshots([key.pk for key in keys])
+        return [snapshots[key.pk] for key in keys if key.pk in snapshots], next_cursor
+
+    @property
+    def items(self):
+        return self._rows[0]
+
+    @property
+    def next_cursor(self):
+        return self._rows[1]
+
+class LowStockBanner:
+    """The lowest low-stock items and how many there are in all, only read if the template asks for them."""
+
+    def __init__(self, size):
+        self.size = size
+
+    @cached_property
+    def items(self):
+        return list(Item.objects.low_stock().order_by('quantity', 'pk')[:self.size])
+
+    @cached_property
+    def count(self):
+        # A short banner already holds every low item, so only a full one needs counting
+        if len(self.items) < self.size:
+            return len(self.items)
+        return Item.objects.low_stock().count()
+
+# The inventory list only changes with the inventory version, so browsers can revalidate it cheaply.
+# The page also carries the session's CSRF token, so a new login or token gets a new ETag, and a page
+# with flash messages to show is never answered with 304.
+def inventory_list_etag(request):
+    if len(messages.get_messages(request)):
+        return None
+    get_token(request)  # Settle the CSRF secret the page will carry before hashing it
+    key = (
+        f'{inventory_version()}:{request.user.pk}:{request.session.session_key}:'
+        f'{request.META.get("CSRF_COOKIE")}:{request.GET.urlencode()}'
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+def inventory_list_last_modified(request):
+    if len(messages.get_messages(request)):
+        return None
+    return datetime.fromtimestamp(inventory_version() / 1e9, tz=timezone.utc)
+
 # Inventory list view - accessible to all logged-in users
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=inventory_list_etag, last_modified_func=inventory_list_last_modified)
 def inventory_list(request):
-    items = Item.objects.all()
-    low_stock_items = items.filter(quantity__lt=15)  # Assuming you want items with quantity less than 15
-    return render(request, 'inventory/inventory_list.html', {'items': items, 'low_stock_items': low_stock_items})
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', 'name')
+    if sort not in INVENTORY_SORTS:
+        sort = 'name'
+
+    # The table and the low-stock banner are cached fragments, keyed on the inventory version
+    return render(request, 'inventory/inventory_list.html', {
+        'page': InventoryPage(query, sort, request.GET.get('after')),
+        'low_stock': LowStockBanner(LOW_STOCK_BANNER_SIZE),
+        'query': query,
+        'sort': sort,
+        'version': inventory_version(),
+        'fragment_timeout': settings.INVENTORY_FRAGMENT_TIMEOUT,
+    })
 
 # View for admins to add new items
 @login_required
@@ -39,23 +143,61 @@ def create_order(request):
             item = form.cleaned_data['item']
             quantity = form.cleaned_data['quantity']
 
-            # Check if there is enough stock
-            if item.quantity < quantity:
-                messages.error(request, "Quantity exceeds stock.")
-                return redirect('create_order')
+            if settings.INVENTORY_ORDER_QUEUE:
+                # Accept the order into the queue; the process_orders worker places it shortly
+                queued = QueuedOrder.objects.create(
+                    item=item, quantity=quantity, warehouse=form.cleaned_data['warehouse'], user=request.user,
+                )
+                messages.success(request, f"Order received as #{queued.pk}; it will be placed shortly.")
+                return redirect('inventory_list')
 
-            # Create the order and deduct the stock
-            order = Order(item=item, quantity=quantity)
-            order.save()
-            item.save()
-
-            messages.success(request, "Order created successfully!")
-            return redirect('inventory_list')
+            # Create the order and deduct the stock; Order.save's conditional UPDATE is the stock check
+            order = Order(item=item, quantity=quantity, warehouse=form.cleaned_data['warehouse'])
+            try:
+                order.save()
+            except InsufficientStock:
+                form.add_error('quantity', "Quantity exceeds stock.")
+            else:
+                messages.success(request, "Order created successfully!")
+                return redirect('inventory_list')
     else:
         form = OrderForm()
 
     return render(request, 'inventory/create_order.html', {'form': form})
 
+ITEM_LOOKUP_LIMIT = 20
+
+# Item picker for the order form - an item by id, or a bounded, ranked full-text search of names and descriptions
+@login_required
+def item_lookup(request):
+    query = request.GET.get('q', '').strip()
+    if query.isdigit():
+        return JsonResponse({'results': list(Item.objects.filter(pk=int(query)).values('id', 'name', 'quantity'))})
+    ids = search_item_ids(query, ITEM_LOOKUP_LIMIT)
+    items = Item.objects.only('name', 'quantity').in_bulk(ids) if ids else {}
+    results = [{'id': pk, 'name': items[pk].name, 'quantity': items[pk].quantity} for pk in ids if pk in items]
+    return JsonResponse({'results': results})
+
+# View for users to order many items at once, e.g. {"lines": [{"item": 1, "quantity": 3}, ...]}
+@login_required
+@require_POST
+def bulk_create_order(request):
+    try:
+        payload = json.loads(request.body)
+        lines = [(line['item'], line['quantity']) for line in payload['lines']]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': "Expected a JSON body with a list of item/quantity lines."}, status=400)
+    if len(lines) > BULK_ORDER_MAX_LINES:
+        return JsonResponse({'error': f"At most {BULK_ORDER_MAX_LINES} lines can be ordered at once."}, status=400)
+
+    try:
+        orders = create_bulk_order(lines)
+    except InsufficientStock as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+    except (ValueError, TypeError) as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return JsonResponse({'orders': [order.pk for order in orders]}, status=201)
 
 # View for admins to update stock
 @login_required
@@ -65,7 +207,14 @@ def update_stock(request, pk):
     if request.method == "POST":
         form = UpdateStockForm(request.POST, instance=item)
         if form.is_valid():
-            form.save()
+            try:
+                form.save(commit=False).save(update_fields=['quantity'])
+            except StaleEdit:
+                # An order or another edit landed since the form was loaded; show the current stock instead
+                item = get_object_or_404(Item, pk=pk)
+                form = UpdateStockForm(instance=item)
+                return render(request, 'inventory/update_stock.html',
+                              {'form': form, 'item': item, 'conflict': True}, status=409)
             return redirect('inventory_list')
     else:
         form = UpdateStockForm(instance=item)
@@ -75,5 +224,33 @@ def update_stock(request, pk):
 @login_required
 @user_passes_test(is_admin)  # Restrict to admins only
 def order_log(request):
-    orders = Order.objects.select_related('item').order_by('-created_at')  # Latest first
-    return render(request, 'inventory/order_log.html', {'orders': orders})
+    orders = Order.objects.select_related('item')
+    form = OrderFilterForm(request.GET)
+    if form.is_valid():
+        orders = form.filter(orders)
+    # Latest first, one page at a time, located by keyset rather than OFFSET
+    orders, next_cursor = keyset_page(orders, 'created_at', True, request.GET.get('after'), ORDERS_PER_PAGE)
+    return render(request, 'inventory/order_log.html', {'orders': orders, 'form': form, 'next_cursor': next_cursor})
+
+# Export formats for the order log, mapped to (row streamer, content type, file extension)
+ORDER_EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson', 'jsonl'),
+}
+
+# View for admins to download the order log, streamed so memory stays flat however many orders there are
+@login_required
+@user_passes_test(is_admin)  # Restrict to admins only
+def export_orders(request):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ORDER_EXPORT_FORMATS:
+        return JsonResponse({'error': f"Unknown export format '{export_format}'."}, status=400)
+    form = OrderFilterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    stream, content_type, extension = ORDER_EXPORT_FORMATS[export_format]
+    rows = order_export_rows(form.filter(Order.objects.all()))
+    response = StreamingHttpResponse(stream(rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="orders.{extension}"'
+    return response